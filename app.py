@@ -0,0 +1,1981 @@
+"""Interface graphique de SQLRift (customtkinter), lancée par main.py."""
+import customtkinter as ctk
+import os
+import random
+import sys
+import threading
+import time
+from tkinter import filedialog, messagebox, ttk
+import tkinter as tk
+
+import core  # état de la base active : core.current_conn, ... (réassignés à chaque changement)
+from core import (
+    DB_EXECUTOR, DEFAULT_PROFILE, PRAGMA_PROFILES, QUERY_HISTORY, ROW_HEIGHT, ResultWindow,
+    TABLE_HEADER, TableWindow, WORKSPACE, advise_indexes, attach_database, backup_database,
+    build_index, close_database, create_table, drawio_preview, drop_table, dump_database,
+    execute_sql, export_result, export_table, generate_sql_schema, get_file_profile,
+    get_profile, get_table_info, get_tables, import_csv, insert_row, insert_rows,
+    is_read_only_sql, load_database, logged_queries, parse_tsv, restore_database,
+    schema_canvas_data, set_profile, shard_query, switch_database, write_drawio,
+)
+
+# ─── TRACE DE DÉMARRAGE ───────────────────────────────────────────────────
+_startup = None  # [(étape, instant)] quand la trace est demandée (voir run)
+
+def startup_mark(step):
+    if _startup is not None:
+        _startup.append((step, time.perf_counter()))
+
+def _print_startup_trace():
+    t0 = prev = _startup[0][1]
+    print("SQLRift — démarrage :", file=sys.stderr)
+    for step, t in _startup[1:]:
+        print(f"  {(t - t0) * 1000:7.1f} ms  (+{(t - prev) * 1000:6.1f})  {step}", file=sys.stderr)
+        prev = t
+
+
+# ─── PALETTE ──────────────────────────────────────────────────────────────
+COLORS = {
+    "bg":           "#0a0a0f",
+    "bg2":          "#0f0f1a",
+    "bg3":          "#141428",
+    "panel":        "#0d0d1f",
+    "border":       "#1a1a3a",
+    "border_glow":  "#2a2a6a",
+    "cyan":         "#00f5ff",
+    "magenta":      "#ff00aa",
+    "green":        "#00ff88",
+    "yellow":       "#ffee00",
+    "red":          "#ff2255",
+    "text":         "#c8d8ff",
+    "text_dim":     "#4a5080",
+    "text_bright":  "#e8f0ff",
+    "accent1":      "#7b2fff",
+    "accent2":      "#ff6b35",
+    "glow":         "#00f5ff22",
+}
+
+ctk.set_appearance_mode("dark")
+ctk.set_default_color_theme("blue")
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# WIDGETS CUSTOM
+# ═══════════════════════════════════════════════════════════════════════════
+
+def run_in_background(widget, fn, *args, on_done=None, on_error=None, read=False, **kwargs):
+    """Exécute `fn` sur le thread DB (ou un thread de lecture si `read`) ;
+    `on_done(result)` / `on_error(exc)` sont rappelés dans le thread Tk via after()."""
+    submit = DB_EXECUTOR.submit_read if read else DB_EXECUTOR.submit
+    future = submit(fn, *args, **kwargs)
+
+    def _poll():
+        if not widget.winfo_exists():
+            return
+        if not future.done():
+            widget.after(25, _poll)
+            return
+        if future.cancelled():
+            return
+        exc = future.exception()
+        if exc is None:
+            if on_done:
+                on_done(future.result())
+        elif on_error:
+            on_error(exc)
+        else:
+            messagebox.showerror("Erreur", str(exc))
+
+    widget.after(25, _poll)
+    return future
+
+
+def run_with_progress(widget, status, fn, *args, read=False, on_done=None, unit="ligne(s)", **kwargs):
+    """Tâche longue (export, dump, ...) : `fn` reçoit `progress(n, total)` et
+    renvoie (ok, msg, ...). Avancement et message final dans la StatusBar.
+    `unit` : "ligne(s)", ou "Mo" si `n` compte des octets."""
+    state = {"done": 0, "total": None, "running": True}
+    started = time.perf_counter()
+
+    def _progress(done, total=None):
+        state["done"], state["total"] = done, total
+
+    def _tick():
+        if not state["running"]:
+            return
+        done, total = state["done"], state["total"]
+        rate = done / max(time.perf_counter() - started, 1e-6)
+        if unit == "Mo":
+            status.set_msg(f"… {done / 1e6:,.1f} Mo · {rate / 1e6:,.1f} Mo/s", True)
+        else:
+            status.set_msg(f"… {done:,} {unit} · {rate:,.0f}/s", True)
+        status.set_progress(done / total if total else 0)
+        widget.after(150, _tick)
+
+    def _finish(result):
+        state["running"] = False
+        status.set_progress(None)
+        status.set_msg(result[1], result[0])
+        if on_done:
+            on_done(result)
+
+    run_in_background(widget, fn, *args, progress=_progress, read=read, on_done=_finish,
+                      on_error=lambda e: _finish((False, str(e))), **kwargs)
+    _tick()
+
+
+def notify_database_changed(widget):
+    """Prévient tous les onglets que la base active a changé (ouverture,
+    changement ou fermeture dans l'espace de travail)."""
+    widget.winfo_toplevel().event_generate("<<DatabaseChanged>>")
+
+
+EXPORT_FILETYPES = [("CSV", "*.csv"), ("CSV gzip", "*.csv.gz"), ("JSON Lines", "*.jsonl"),
+                    ("JSON Lines gzip", "*.jsonl.gz"), ("JSON Lines xz", "*.jsonl.xz"),
+                    ("TSV", "*.tsv"), ("Tous", "*.*")]
+
+
+class FrameScheduler:
+    """Horloge d'animation unique, entièrement dans le thread Tk : un seul
+    after() à la fois pour tous les widgets animés. Chaque abonné
+    `callback(now)` renvoie l'instant (time.monotonic) de sa prochaine image,
+    ou None pour se désabonner ; les abonnés échus sont servis dans la même
+    image. Entre deux échéances l'horloge dort, et elle s'arrête tant que la
+    fenêtre est cachée ou n'a pas le focus (aucun réveil : CPU nul au repos)."""
+    MIN_FRAME_MS = 16
+    _instance = None
+
+    def __init__(self, root):
+        self._root = root
+        self._due = {}       # callback → prochaine échéance
+        self._on_pause = {}  # callback → remise à l'état de repos (facultative)
+        self._job = None
+        self._visible = True
+        self._focused = True
+        root.bind("<Map>", self._on_map, add="+")
+        root.bind("<Unmap>", self._on_map, add="+")
+        root.bind("<FocusIn>", self._on_focus, add="+")
+        root.bind("<FocusOut>", self._on_focus, add="+")
+
+    @classmethod
+    def of(cls, widget):
+        """Horloge de la fenêtre principale (créée au premier abonnement)."""
+        root = widget.nametowidget(".")
+        if cls._instance is None or cls._instance._root is not root:
+            cls._instance = cls(root)
+        return cls._instance
+
+    @property
+    def running(self):
+        return self._visible and self._focused
+
+    def subscribe(self, callback, at=None, on_pause=None):
+        self._due[callback] = time.monotonic() if at is None else at
+        if on_pause:
+            self._on_pause[callback] = on_pause
+        self._schedule()
+
+    def unsubscribe(self, callback):
+        self._due.pop(callback, None)
+        self._on_pause.pop(callback, None)
+        if not self._due:
+            self._cancel()
+
+    def _cancel(self):
+        if self._job is not None:
+            self._root.after_cancel(self._job)
+            self._job = None
+
+    def _schedule(self):
+        self._cancel()
+        if not self._due or not self.running:
+            return
+        delay = (min(self._due.values()) - time.monotonic()) * 1000
+        self._job = self._root.after(max(int(delay), self.MIN_FRAME_MS), self._frame)
+
+    def _frame(self):
+        self._job = None
+        now = time.monotonic()
+        for callback, at in list(self._due.items()):
+            if at > now:
+                continue
+            try:
+                nxt = callback(now)
+            except tk.TclError:  # widget détruit
+                nxt = None
+            if nxt is None:
+                self.unsubscribe(callback)
+            else:
+                self._due[callback] = nxt
+        self._schedule()
+
+    def _set_running(self, visible, focused):
+        was = self.running
+        self._visible, self._focused = visible, focused
+        if was and not self.running:
+            self._cancel()
+            for callback, reset in list(self._on_pause.items()):
+                try:
+                    self._due[callback] = reset(time.monotonic())
+                except tk.TclError:
+                    self.unsubscribe(callback)
+        elif self.running and not was:
+            self._schedule()
+
+    def _on_map(self, event):
+        if event.widget is self._root:
+            self._set_running(event.type == tk.EventType.Map, self._focused)
+
+    def _on_focus(self, event):
+        # Le focus qui passe d'un widget à l'autre (ou vers un dialogue) émet
+        # FocusOut puis FocusIn : on ne tranche qu'une fois l'événement traité.
+        self._root.after_idle(self._check_focus)
+
+    def _check_focus(self):
+        try:
+            focused = self._root.focus_get() is not None
+        except (KeyError, tk.TclError):  # focus sur un widget interne (menu déroulant)
+            focused = True
+        self._set_running(self._visible, focused)
+
+
+class GlitchLabel(ctk.CTkLabel):
+    """Label avec effet glitch animé (piloté par le FrameScheduler)."""
+    CHARS = "!@#$%^&*01█▓▒░<>{}[]"
+    BURST = 4          # images brouillées par salve
+    BURST_FRAME = 0.07  # s entre deux images d'une salve
+
+    def __init__(self, master, text, glitch=False, **kwargs):
+        kwargs.setdefault("font", ("Courier New", 12, "bold"))
+        kwargs.setdefault("text_color", COLORS["cyan"])
+        super().__init__(master, text=text, **kwargs)
+        self._orig_text = text
+        self._burst = 0
+        if glitch:
+            scheduler = FrameScheduler.of(self)
+            scheduler.subscribe(self._glitch_frame, time.monotonic() + self._pause(),
+                                on_pause=self._glitch_reset)
+            self.bind("<Destroy>", lambda e: scheduler.unsubscribe(self._glitch_frame), add="+")
+
+    @staticmethod
+    def _pause():
+        return 4 + random.random() * 6
+
+    def _glitch_frame(self, now):
+        if self._burst < self.BURST:
+            self._burst += 1
+            glitched = "".join(c if random.random() > 0.15 else random.choice(self.CHARS)
+                               for c in self._orig_text)
+            self.configure(text=glitched, text_color=COLORS["magenta"])
+            return now + self.BURST_FRAME
+        return self._glitch_reset(now)
+
+    def _glitch_reset(self, now):
+        """Texte d'origine et prochaine salve dans 4 à 10 s."""
+        if self._burst:
+            self._burst = 0
+            self.configure(text=self._orig_text, text_color=COLORS["cyan"])
+        return now + self._pause()
+
+
+class NeonButton(ctk.CTkButton):
+    def __init__(self, master, text, color="cyan", **kwargs):
+        c = COLORS.get(color, COLORS["cyan"])
+        kwargs.setdefault("font", ("Courier New", 11, "bold"))
+        kwargs.setdefault("fg_color", COLORS["bg3"])
+        kwargs.setdefault("hover_color", COLORS["bg2"])
+        kwargs.setdefault("border_width", 1)
+        kwargs.setdefault("border_color", c)
+        kwargs.setdefault("text_color", c)
+        kwargs.setdefault("corner_radius", 4)
+        kwargs.setdefault("height", 32)
+        super().__init__(master, text=text, **kwargs)
+
+
+class ScanlineFrame(ctk.CTkFrame):
+    """Frame avec bordure colorée style terminal."""
+    def __init__(self, master, border_color=None, **kwargs):
+        kwargs.setdefault("fg_color", COLORS["bg2"])
+        kwargs.setdefault("corner_radius", 6)
+        if border_color:
+            kwargs["border_width"] = 1
+            kwargs["border_color"] = border_color
+        super().__init__(master, **kwargs)
+
+
+class StatusBar(ctk.CTkFrame):
+    def __init__(self, master):
+        super().__init__(master, fg_color=COLORS["bg3"], height=28, corner_radius=0)
+        self.pack_propagate(False)
+        self._db_label = ctk.CTkLabel(self, text="● NO DB", font=("Courier New", 10),
+                                       text_color=COLORS["red"])
+        self._db_label.pack(side="left", padx=12)
+        self._msg_label = ctk.CTkLabel(self, text="", font=("Courier New", 10),
+                                        text_color=COLORS["text_dim"])
+        self._msg_label.pack(side="left", padx=6)
+        self._count_label = ctk.CTkLabel(self, text="", font=("Courier New", 10),
+                                          text_color=COLORS["text_dim"])
+        self._count_label.pack(side="right", padx=12)
+        self._profile_label = ctk.CTkLabel(self, text="", font=("Courier New", 10),
+                                            text_color=COLORS["accent1"])
+        self._profile_label.pack(side="right", padx=6)
+        self._progress = ctk.CTkProgressBar(self, width=140, height=8, progress_color=COLORS["cyan"],
+                                            fg_color=COLORS["bg2"])
+        self._progress_visible = False
+
+    def set_db(self, path):
+        name = os.path.basename(path) if path else "NO DB"
+        color = COLORS["green"] if path else COLORS["red"]
+        dot = "●" if path else "●"
+        self._db_label.configure(text=f"{dot} {name}", text_color=color)
+
+    def set_profile(self, name):
+        self._profile_label.configure(text=f"⚙ {name}" if name else "")
+
+    def set_msg(self, msg, ok=True):
+        self._msg_label.configure(text=msg,
+                                   text_color=COLORS["green"] if ok else COLORS["red"])
+
+    def set_count(self, txt):
+        self._count_label.configure(text=txt)
+
+    def set_progress(self, fraction):
+        """Barre de progression des tâches longues ; None la masque."""
+        if fraction is None:
+            if self._progress_visible:
+                self._progress.pack_forget()
+                self._progress_visible = False
+            return
+        if not self._progress_visible:
+            self._progress.pack(side="right", padx=6, before=self._profile_label)
+            self._progress_visible = True
+        self._progress.set(max(0.0, min(1.0, fraction)))
+
+
+class VirtualTreeview(ctk.CTkFrame):
+    """Treeview virtualisé : seules les lignes visibles existent comme items.
+    Les données viennent d'une source paginée (`columns`, `total`, `fetch(top, count)`)."""
+    def __init__(self, master, **kwargs):
+        kwargs.setdefault("fg_color", "transparent")
+        super().__init__(master, **kwargs)
+        self._source = None
+        self._top = 0
+        self._render_job = None
+        self._pending = None
+        self._dirty = False
+        self._tree = ttk.Treeview(self, style="Glitch.Treeview", show="headings")
+        self._vsb = ttk.Scrollbar(self, orient="vertical", command=self._on_yview)
+        hsb = ttk.Scrollbar(self, orient="horizontal", command=self._tree.xview)
+        self._tree.configure(xscrollcommand=hsb.set)
+        self._tree.grid(row=0, column=0, sticky="nsew")
+        self._vsb.grid(row=0, column=1, sticky="ns")
+        hsb.grid(row=1, column=0, sticky="ew")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+        self._tree.bind("<Configure>", lambda e: self._schedule_render())
+        self._tree.bind("<MouseWheel>", lambda e: self._scroll(-1 if e.delta > 0 else 1, "units"))
+        self._tree.bind("<Button-4>", lambda e: self._scroll(-1, "units"))
+        self._tree.bind("<Button-5>", lambda e: self._scroll(1, "units"))
+        self._tree.bind("<Prior>", lambda e: self._scroll(-1, "pages"))
+        self._tree.bind("<Next>", lambda e: self._scroll(1, "pages"))
+
+    def set_source(self, source, sample=None):
+        """`sample` : quelques lignes déjà lues, pour dimensionner les colonnes."""
+        self._source = source
+        self._top = 0
+        self._tree.delete(*self._tree.get_children())
+        self._tree["columns"] = source.columns
+        for c in source.columns:
+            self._tree.heading(c, text=c)
+            self._tree.column(c, width=max(80, len(c) * 9), stretch=True)
+        if sample:
+            self._fit_columns(source.columns, sample)
+        self._render()
+
+    def _fit_columns(self, columns, sample, max_chars=48):
+        # Police à chasse fixe : une seule mesure suffit pour toutes les colonnes.
+        import tkinter.font as tkfont  # seulement quand une grille se remplit
+        char = tkfont.Font(font=("Courier New", 10)).measure("0")
+        for i, c in enumerate(columns):
+            chars = max([len(c)] + [len(str(r[i])) for r in sample])
+            self._tree.column(c, width=min(chars, max_chars) * char + 16, stretch=False)
+
+    def clear(self):
+        self._source = None
+        self._tree["columns"] = []
+        self._tree.delete(*self._tree.get_children())
+        self._vsb.set(0, 1)
+
+    def _visible_rows(self):
+        rowheight = int(ttk.Style().lookup("Glitch.Treeview", "rowheight") or 22)
+        return max(1, (self._tree.winfo_height() - rowheight) // rowheight)
+
+    def _on_yview(self, action, value, unit=None):
+        if action == "moveto" and self._source:
+            self._top = int(float(value) * self._source.total)
+            self._schedule_render()
+        elif action == "scroll":
+            self._scroll(int(value), unit)
+
+    def _scroll(self, n, unit):
+        step = self._visible_rows() if unit == "pages" else 3
+        self._top += n * step
+        self._schedule_render()
+        return "break"
+
+    def _schedule_render(self):
+        # Coalesce les événements de scroll : un seul rendu par passage de la boucle Tk.
+        if self._render_job is None:
+            self._render_job = self.after_idle(self._render)
+
+    def _render(self):
+        self._render_job = None
+        if not self._source:
+            return
+        if self._pending is not None:
+            self._dirty = True
+            return
+        count = self._visible_rows()
+        source = self._source
+        # Lecture des pages sur le thread DB ; un seul fetch en vol à la fois.
+        self._pending = run_in_background(
+            self, source.fetch, self._top, count,
+            on_done=lambda rows: self._show(source, count, rows),
+            on_error=lambda e: self._show(source, count, []), read=True)
+
+    def _show(self, source, count, rows):
+        self._pending = None
+        if source is not self._source:
+            self._dirty = False
+            self._schedule_render()
+            return
+        if self._dirty:
+            self._dirty = False
+            self._schedule_render()
+        else:
+            self._top = source.top
+        items = self._tree.get_children()
+        for i, r in enumerate(rows):
+            if i < len(items):
+                self._tree.item(items[i], values=r)
+            else:
+                self._tree.insert("", "end", values=r)
+        if len(items) > len(rows):
+            self._tree.delete(*items[len(rows):])
+        total = max(source.total, 1)
+        self._vsb.set(source.top / total, min(1.0, (source.top + count) / total))
+
+
+class SchemaCanvas(ctk.CTkFrame):
+    """Schéma dessiné sur un tk.Canvas, avec déplacement et zoom.
+    Seuls les éléments proches de la zone visible sont créés (index spatial en
+    grille) ; le niveau de détail suit le zoom : blocs seuls, puis titres, puis
+    lignes de colonnes. Pendant un geste, les éléments existants sont déplacés
+    ou mis à l'échelle par le canvas ; le redessin complet attend la fin du geste."""
+    CELL = 2048          # côté d'une case de l'index spatial (unités du schéma)
+    TITLE_ZOOM = 0.25    # en dessous : blocs sans texte
+    ROWS_ZOOM = 0.6      # au-dessus : lignes de colonnes
+    MARGIN = 0.5         # marge dessinée autour de la vue (fraction de la vue)
+
+    def __init__(self, master, **kwargs):
+        kwargs.setdefault("fg_color", "transparent")
+        super().__init__(master, **kwargs)
+        self._canvas = tk.Canvas(self, bg=COLORS["bg2"], highlightthickness=0, bd=0)
+        self._canvas.pack(fill="both", expand=True)
+        self._tables = []
+        self._links = []
+        self._grid = {}
+        self._zoom = 1.0
+        self._offset = [0.0, 0.0]  # canvas = monde * zoom - offset
+        self._drawn = None         # zone du monde couverte par le dernier rendu
+        self._drag = None
+        self._render_job = None
+        c = self._canvas
+        c.bind("<Configure>", lambda e: self._schedule_render())
+        c.bind("<ButtonPress-1>", self._on_press)
+        c.bind("<B1-Motion>", self._on_drag)
+        c.bind("<ButtonRelease-1>", lambda e: self._after_gesture())
+        c.bind("<Double-1>", lambda e: self.fit())
+        c.bind("<MouseWheel>", lambda e: self._on_zoom(e, 1.15 if e.delta > 0 else 1 / 1.15))
+        c.bind("<Button-4>", lambda e: self._on_zoom(e, 1.15))
+        c.bind("<Button-5>", lambda e: self._on_zoom(e, 1 / 1.15))
+
+    def set_schema(self, tables, links):
+        self._tables = tables
+        self._links = links
+        self._grid = {}
+        for i, (_, x, y, w, h, _) in enumerate(tables):
+            for gx in range(int(x // self.CELL), int((x + w) // self.CELL) + 1):
+                for gy in range(int(y // self.CELL), int((y + h) // self.CELL) + 1):
+                    self._grid.setdefault((gx, gy), []).append(i)
+        self.fit()
+
+    def fit(self):
+        if not self._tables:
+            self._canvas.delete("all")
+            return
+        width = max(self._canvas.winfo_width(), 200)
+        height = max(self._canvas.winfo_height(), 200)
+        x1 = max(x + w for _, x, _, w, _, _ in self._tables)
+        y1 = max(y + h for _, _, y, _, h, _ in self._tables)
+        self._zoom = min(width / (x1 + 40), height / (y1 + 40), 1.5)
+        self._offset = [-20 * self._zoom, -20 * self._zoom]
+        self._render()
+
+    def _view(self):
+        """Zone du monde visible (x0, y0, x1, y1)."""
+        z, (ox, oy) = self._zoom, self._offset
+        return (ox / z, oy / z, (ox + self._canvas.winfo_width()) / z,
+                (oy + self._canvas.winfo_height()) / z)
+
+    def _on_press(self, event):
+        self._drag = (event.x, event.y)
+
+    def _on_drag(self, event):
+        if not self._drag:
+            return
+        dx, dy = event.x - self._drag[0], event.y - self._drag[1]
+        self._drag = (event.x, event.y)
+        self._canvas.move("all", dx, dy)
+        self._offset[0] -= dx
+        self._offset[1] -= dy
+        x0, y0, x1, y1 = self._view()
+        d = self._drawn
+        if d and (x0 < d[0] or y0 < d[1] or x1 > d[2] or y1 > d[3]):
+            self._schedule_render()
+
+    def _on_zoom(self, event, factor):
+        # canvas' = c + (canvas - c)·f  ⇒  zoom' = zoom·f, offset' = offset·f + c·(f - 1)
+        self._canvas.scale("all", event.x, event.y, factor, factor)
+        self._zoom *= factor
+        self._offset = [self._offset[0] * factor + event.x * (factor - 1),
+                        self._offset[1] * factor + event.y * (factor - 1)]
+        self._after_gesture(delay=120)
+        return "break"
+
+    def _after_gesture(self, delay=0):
+        self._drag = None
+        if self._render_job is not None:
+            self.after_cancel(self._render_job)
+        self._render_job = self.after(delay, self._render) if delay else self.after_idle(self._render)
+
+    def _schedule_render(self):
+        if self._render_job is None:
+            self._render_job = self.after_idle(self._render)
+
+    def _render(self):
+        self._render_job = None
+        c = self._canvas
+        c.delete("all")
+        if not self._tables:
+            return
+        x0, y0, x1, y1 = self._view()
+        mx, my = (x1 - x0) * self.MARGIN, (y1 - y0) * self.MARGIN
+        x0, y0, x1, y1 = x0 - mx, y0 - my, x1 + mx, y1 + my
+        self._drawn = (x0, y0, x1, y1)
+        visible = set()
+        for gx in range(int(x0 // self.CELL), int(x1 // self.CELL) + 1):
+            for gy in range(int(y0 // self.CELL), int(y1 // self.CELL) + 1):
+                visible.update(self._grid.get((gx, gy), ()))
+        z, (ox, oy) = self._zoom, self._offset
+        rows = z >= self.ROWS_ZOOM
+
+        def _anchor(i, row, toward):
+            _, x, y, w, _, _ = self._tables[i]
+            side = x + w if toward > x + w / 2 else x
+            dy = TABLE_HEADER + row * ROW_HEIGHT + ROW_HEIGHT / 2 if rows and row is not None else TABLE_HEADER / 2
+            return side * z - ox, (y + dy) * z - oy
+
+        for src, src_row, dst, dst_row in self._links:
+            _, sx, sy, sw, sh, _ = self._tables[src]
+            _, tx, ty, tw, th, _ = self._tables[dst]
+            if max(sx + sw, tx + tw) < x0 or min(sx, tx) > x1 or max(sy + sh, ty + th) < y0 or min(sy, ty) > y1:
+                continue
+            a = _anchor(src, src_row, tx + tw / 2)
+            b = _anchor(dst, dst_row, sx + sw / 2)
+            c.create_line(*a, *b, fill=COLORS["magenta"], arrow="last" if rows else None)
+
+        title_font = ("Courier New", max(6, int(13 * z)), "bold")
+        row_font = ("Courier New", max(6, int(11 * z)))
+        for i in visible:
+            name, x, y, w, h, labels = self._tables[i]
+            if x > x1 or x + w < x0 or y > y1 or y + h < y0:
+                continue
+            cx, cy = x * z - ox, y * z - oy
+            c.create_rectangle(cx, cy, cx + w * z, cy + h * z, fill=COLORS["panel"],
+                               outline=COLORS["cyan"])
+            if z < self.TITLE_ZOOM:
+                continue
+            c.create_line(cx, cy + TABLE_HEADER * z, cx + w * z, cy + TABLE_HEADER * z,
+                          fill=COLORS["cyan"])
+            c.create_text(cx + w * z / 2, cy + TABLE_HEADER * z / 2, text=name,
+                          fill=COLORS["cyan"], font=title_font, width=w * z)
+            if rows:
+                for r, label in enumerate(labels):
+                    c.create_text(cx + 6 * z, cy + (TABLE_HEADER + r * ROW_HEIGHT + ROW_HEIGHT / 2) * z,
+                                  text=label, anchor="w", fill=COLORS["text"], font=row_font)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ONGLET 1 — ÉDITEUR DE BASE DE DONNÉES
+# ═══════════════════════════════════════════════════════════════════════════
+
+class DatabaseEditorTab(ctk.CTkFrame):
+    def __init__(self, master, status_bar, **kwargs):
+        super().__init__(master, fg_color=COLORS["bg"], **kwargs)
+        self.status = status_bar
+        self._build()
+        self.winfo_toplevel().bind("<<DatabaseChanged>>", self._on_db_changed, add="+")
+
+    def _build(self):
+        # ── Toolbar ──
+        toolbar = ScanlineFrame(self, border_color=COLORS["border"])
+        toolbar.pack(fill="x", padx=10, pady=(10, 6))
+
+        GlitchLabel(toolbar, "// DATABASE MANAGER", glitch=True,
+                    font=("Courier New", 13, "bold")).pack(side="left", padx=12, pady=6)
+
+        NeonButton(toolbar, "◈ NOUVELLE DB", color="green",
+                   command=self._new_db, width=130).pack(side="right", padx=6, pady=6)
+        NeonButton(toolbar, "⬆ OUVRIR DB", color="cyan",
+                   command=self._open_db, width=120).pack(side="right", padx=0, pady=6)
+        NeonButton(toolbar, "⬇ IMPORT CSV", color="yellow",
+                   command=self._import_csv, width=120).pack(side="right", padx=6, pady=6)
+        NeonButton(toolbar, "⬇ RESTAURER", color="yellow",
+                   command=self._restore, width=110).pack(side="right", pady=6)
+        NeonButton(toolbar, "⬆ DUMP", color="yellow",
+                   command=self._dump, width=80).pack(side="right", padx=6, pady=6)
+        NeonButton(toolbar, "⧉ BACKUP", color="green",
+                   command=self._backup, width=90).pack(side="right", pady=6)
+        self._profile_menu = ctk.CTkOptionMenu(
+            toolbar, values=list(PRAGMA_PROFILES), command=self._set_profile,
+            font=("Courier New", 10), fg_color=COLORS["bg3"], button_color=COLORS["bg3"],
+            button_hover_color=COLORS["bg2"], text_color=COLORS["accent1"],
+            dropdown_fg_color=COLORS["bg3"], width=170)
+        self._profile_menu.set(DEFAULT_PROFILE)
+        self._profile_menu.pack(side="right", padx=6, pady=6)
+
+        # ── Corps principal ──
+        body = ctk.CTkFrame(self, fg_color="transparent")
+        body.pack(fill="both", expand=True, padx=10, pady=4)
+        body.columnconfigure(1, weight=1)
+        body.rowconfigure(0, weight=1)
+
+        # ── Panel gauche: tables ──
+        left = ScanlineFrame(body, border_color=COLORS["border_glow"])
+        left.grid(row=0, column=0, sticky="nsew", padx=(0, 6), pady=0)
+        left.configure(width=200)
+
+        ctk.CTkLabel(left, text="TABLES", font=("Courier New", 10, "bold"),
+                     text_color=COLORS["magenta"]).pack(pady=(8, 2), padx=8, anchor="w")
+
+        self._table_list = tk.Listbox(
+            left, bg=COLORS["bg2"], fg=COLORS["cyan"],
+            selectbackground=COLORS["accent1"], selectforeground="#fff",
+            font=("Courier New", 11), bd=0, highlightthickness=0,
+            relief="flat", activestyle="none"
+        )
+        self._table_list.pack(fill="both", expand=True, padx=6, pady=(0, 6))
+        self._table_list.bind("<<ListboxSelect>>", self._on_table_select)
+
+        btn_frame = ctk.CTkFrame(left, fg_color="transparent")
+        btn_frame.pack(fill="x", padx=6, pady=(0, 8))
+        NeonButton(btn_frame, "+ TABLE", color="cyan", command=self._show_create_table,
+                   width=88, height=28).pack(side="left")
+        NeonButton(btn_frame, "✕ DROP", color="red", command=self._drop_table,
+                   width=66, height=28).pack(side="right")
+
+        # ── Panel droit: contenu table ──
+        right = ScanlineFrame(body, border_color=COLORS["border_glow"])
+        right.grid(row=0, column=1, sticky="nsew")
+
+        # Header du panel droit
+        r_header = ctk.CTkFrame(right, fg_color="transparent")
+        r_header.pack(fill="x", padx=10, pady=(8, 4))
+        self._table_title = ctk.CTkLabel(r_header, text="SELECT A TABLE",
+                                          font=("Courier New", 12, "bold"),
+                                          text_color=COLORS["text_dim"])
+        self._table_title.pack(side="left")
+        NeonButton(r_header, "+ INSERT ROW", color="green",
+                   command=self._show_insert_row, width=120, height=26).pack(side="right")
+        NeonButton(r_header, "⬆ EXPORT", color="yellow",
+                   command=self._export_table, width=100, height=26).pack(side="right")
+        NeonButton(r_header, "⟳ REFRESH", color="cyan",
+                   command=self._refresh_table, width=100, height=26).pack(side="right", padx=6)
+
+        # Treeview
+        tree_frame = ctk.CTkFrame(right, fg_color="transparent")
+        tree_frame.pack(fill="both", expand=True, padx=10, pady=(0, 8))
+
+        style = ttk.Style()
+        style.theme_use("clam")
+        style.configure("Glitch.Treeview",
+                         background=COLORS["bg2"],
+                         foreground=COLORS["text"],
+                         fieldbackground=COLORS["bg2"],
+                         borderwidth=0,
+                         rowheight=22,
+                         font=("Courier New", 10))
+        style.configure("Glitch.Treeview.Heading",
+                         background=COLORS["bg3"],
+                         foreground=COLORS["cyan"],
+                         borderwidth=0,
+                         font=("Courier New", 10, "bold"))
+        style.map("Glitch.Treeview",
+                  background=[("selected", COLORS["accent1"])],
+                  foreground=[("selected", "#fff")])
+
+        self._view = VirtualTreeview(tree_frame)
+        self._view.pack(fill="both", expand=True)
+
+    # ── Actions ──
+    def _new_db(self):
+        path = filedialog.asksaveasfilename(
+            title="Créer une base de données",
+            defaultextension=".db",
+            filetypes=[("SQLite DB", "*.db"), ("Tous", "*.*")]
+        )
+        if not path:
+            return
+        self._load_db(path, f"Nouvelle DB créée : {os.path.basename(path)}")
+
+    def _load_db(self, path, msg):
+        def _done(_):
+            self.status.set_msg(msg)
+            notify_database_changed(self)
+        # Base déjà ouverte : on y revient telle quelle. Sinon profil mémorisé
+        # pour ce fichier, ou celui choisi dans le menu.
+        profile = None if path in WORKSPACE else get_file_profile(path) or self._profile_menu.get()
+        run_in_background(self, load_database, path, profile, on_done=_done)
+
+    def _on_db_changed(self, event=None):
+        self.status.set_db(core.current_db_path)
+        if core.current_pool:
+            self._show_profile(get_profile())
+        self._refresh_tables()
+        # Chaque base garde sa table sélectionnée.
+        if core.selected_table:
+            self._table_title.configure(text=f"▸ {core.selected_table}", text_color=COLORS["cyan"])
+            self._load_table(core.selected_table)
+        else:
+            self._table_title.configure(text="SELECT A TABLE", text_color=COLORS["text_dim"])
+            self._view.clear()
+
+    def _show_profile(self, name):
+        self._profile_menu.set(name)
+        self.status.set_profile(name)
+
+    def _set_profile(self, name):
+        if not core.current_pool:
+            self.status.set_profile(name)
+            return
+        def _done(result):
+            ok, msg = result
+            self.status.set_msg(msg, ok)
+            self._show_profile(get_profile())
+        run_in_background(self, set_profile, name, on_done=_done)
+
+    def _open_db(self):
+        path = filedialog.askopenfilename(
+            title="Ouvrir une base de données",
+            filetypes=[("SQLite DB", "*.db *.sqlite *.sqlite3"), ("Tous", "*.*")]
+        )
+        if not path:
+            return
+        self._load_db(path, f"DB chargée : {os.path.basename(path)}")
+
+    def _refresh_tables(self):
+        def _fill(tables):
+            self._table_list.delete(0, "end")
+            for t in tables:
+                self._table_list.insert("end", f"  {t}")
+            self.status.set_count(f"{len(tables)} table(s)")
+        run_in_background(self, get_tables, on_done=_fill, read=True)
+
+    def _on_table_select(self, event=None):
+        sel = self._table_list.curselection()
+        if not sel:
+            return
+        core.selected_table = self._table_list.get(sel[0]).strip()
+        self._table_title.configure(text=f"▸ {core.selected_table}", text_color=COLORS["cyan"])
+        self._load_table(core.selected_table)
+
+    def _load_table(self, name):
+        def _show(source):
+            self._view.set_source(source)
+            self.status.set_count(f"~{source.total} ligne(s)")
+        run_in_background(self, TableWindow, name, on_done=_show, read=True)
+
+    def _refresh_table(self):
+        if core.selected_table:
+            self._load_table(core.selected_table)
+        self._refresh_tables()
+
+    def _drop_table(self):
+        if not core.selected_table:
+            messagebox.showwarning("Attention", "Sélectionne une table d'abord.")
+            return
+        if messagebox.askyesno("Confirmer", f"Supprimer la table '{core.selected_table}' ?"):
+            def _done(result):
+                ok, msg = result
+                self.status.set_msg(msg, ok)
+                self._refresh_tables()
+                self._view.clear()
+            run_in_background(self, drop_table, core.selected_table, on_done=_done)
+
+    def _show_create_table(self):
+        CreateTableDialog(self, on_done=self._refresh_tables)
+
+    def _export_table(self):
+        if not core.selected_table:
+            messagebox.showwarning("Attention", "Sélectionne une table d'abord.")
+            return
+        path = filedialog.asksaveasfilename(
+            title=f"Exporter {core.selected_table}",
+            initialfile=f"{core.selected_table}.csv",
+            defaultextension=".csv",
+            filetypes=EXPORT_FILETYPES
+        )
+        if path:
+            run_with_progress(self, self.status, export_table, core.selected_table, path, read=True)
+
+    def _import_csv(self):
+        if not core.current_conn:
+            messagebox.showwarning("Attention", "Ouvre une base de données d'abord.")
+            return
+        path = filedialog.askopenfilename(
+            title="Importer un CSV",
+            filetypes=[("CSV", "*.csv *.tsv *.txt"), ("Tous", "*.*")]
+        )
+        if path:
+            ImportCSVDialog(self, path, self.status, on_done=self._refresh_tables)
+
+    def _dump(self):
+        if not core.current_conn:
+            messagebox.showwarning("Attention", "Ouvre une base de données d'abord.")
+            return
+        name = os.path.splitext(os.path.basename(core.current_db_path or "database"))[0]
+        path = filedialog.asksaveasfilename(
+            title="Dump SQL (schéma + données)",
+            initialfile=f"{name}.sql",
+            defaultextension=".sql",
+            filetypes=[("SQL", "*.sql"), ("SQL gzip", "*.sql.gz"), ("SQL xz", "*.sql.xz"), ("Tous", "*.*")]
+        )
+        if path:
+            run_with_progress(self, self.status, dump_database, path, read=True)
+
+    def _backup(self):
+        if not core.current_conn:
+            messagebox.showwarning("Attention", "Ouvre une base de données d'abord.")
+            return
+        name = os.path.splitext(os.path.basename(core.current_db_path or "database"))[0]
+        path = filedialog.asksaveasfilename(
+            title="Sauvegarde à chaud",
+            initialfile=f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.db",
+            defaultextension=".db",
+            filetypes=[("SQLite DB", "*.db *.sqlite *.sqlite3"), ("Tous", "*.*")]
+        )
+        if path:
+            # Thread de lecture : la base reste utilisable (et modifiable) pendant la copie.
+            run_with_progress(self, self.status, backup_database, path, read=True, unit="Mo")
+
+    def _restore(self):
+        if not core.current_conn:
+            messagebox.showwarning("Attention", "Ouvre (ou crée) la base cible d'abord.")
+            return
+        path = filedialog.askopenfilename(
+            title="Restaurer un dump SQL",
+            filetypes=[("SQL", "*.sql *.sql.gz *.sql.xz"), ("Tous", "*.*")]
+        )
+        if path and messagebox.askyesno(
+                "Restaurer", f"Exécuter {os.path.basename(path)} dans "
+                             f"{os.path.basename(core.current_db_path)} ?"):
+            run_with_progress(self, self.status, restore_database, path,
+                              on_done=lambda _: self._refresh_tables())
+
+    def _show_insert_row(self):
+        if not core.selected_table:
+            messagebox.showwarning("Attention", "Sélectionne une table d'abord.")
+            return
+        InsertRowDialog(self, table_name=core.selected_table, on_done=lambda: self._load_table(core.selected_table))
+
+
+# ─── Dialogue Créer Table ──────────────────────────────────────────────────
+class CreateTableDialog(ctk.CTkToplevel):
+    def __init__(self, master, on_done=None):
+        super().__init__(master)
+        self.on_done = on_done
+        self.title("Créer une Table")
+        self.geometry("560x520")
+        self.configure(fg_color=COLORS["bg"])
+        self.resizable(False, False)
+        self._col_rows = []
+        self._build()
+        self.lift()
+        self.focus_force()
+
+    def _build(self):
+        GlitchLabel(self, "// CREATE TABLE", font=("Courier New", 14, "bold"),
+                    text_color=COLORS["magenta"]).pack(pady=(16, 4))
+
+        name_f = ctk.CTkFrame(self, fg_color="transparent")
+        name_f.pack(fill="x", padx=20, pady=(4, 8))
+        ctk.CTkLabel(name_f, text="Nom de la table :", font=("Courier New", 11),
+                     text_color=COLORS["text"]).pack(side="left")
+        self._name_entry = ctk.CTkEntry(name_f, font=("Courier New", 11),
+                                         fg_color=COLORS["bg3"], border_color=COLORS["cyan"],
+                                         text_color=COLORS["cyan"], width=220)
+        self._name_entry.pack(side="left", padx=10)
+
+        # En-tête colonnes
+        header = ctk.CTkFrame(self, fg_color=COLORS["bg3"])
+        header.pack(fill="x", padx=20)
+        for txt, w in [("Nom", 120), ("Type", 90), ("PK", 30), ("NN", 30), ("Default", 90)]:
+            ctk.CTkLabel(header, text=txt, font=("Courier New", 9, "bold"),
+                         text_color=COLORS["cyan"], width=w).pack(side="left", padx=3, pady=4)
+
+        self._cols_frame = ctk.CTkScrollableFrame(self, fg_color=COLORS["bg2"],
+                                                   border_width=1, border_color=COLORS["border_glow"],
+                                                   height=240)
+        self._cols_frame.pack(fill="x", padx=20, pady=4)
+
+        self._add_column()  # Une colonne par défaut
+
+        btn_row = ctk.CTkFrame(self, fg_color="transparent")
+        btn_row.pack(fill="x", padx=20, pady=4)
+        NeonButton(btn_row, "+ COLONNE", color="cyan", command=self._add_column, width=110).pack(side="left")
+        NeonButton(btn_row, "- COLONNE", color="red", command=self._remove_column, width=110).pack(side="left", padx=8)
+
+        NeonButton(self, "▶ CRÉER LA TABLE", color="green",
+                   command=self._create, width=200).pack(pady=(8, 16))
+
+    TYPES = ["INTEGER", "TEXT", "REAL", "BLOB", "NUMERIC", "BOOLEAN", "DATE", "DATETIME"]
+
+    def _add_column(self):
+        row = ctk.CTkFrame(self._cols_frame, fg_color="transparent")
+        row.pack(fill="x", pady=2)
+        name_e = ctk.CTkEntry(row, width=120, font=("Courier New", 10),
+                               fg_color=COLORS["bg3"], border_color=COLORS["border_glow"],
+                               text_color=COLORS["text"])
+        name_e.pack(side="left", padx=3)
+        type_cb = ctk.CTkComboBox(row, values=self.TYPES, width=90, font=("Courier New", 10),
+                                   fg_color=COLORS["bg3"], border_color=COLORS["border_glow"],
+                                   text_color=COLORS["text"], button_color=COLORS["bg3"],
+                                   dropdown_fg_color=COLORS["bg3"])
+        type_cb.set("TEXT")
+        type_cb.pack(side="left", padx=3)
+        pk_var = tk.BooleanVar()
+        pk_cb = ctk.CTkCheckBox(row, text="", variable=pk_var, width=30,
+                                 checkbox_width=16, checkbox_height=16,
+                                 fg_color=COLORS["accent1"], border_color=COLORS["cyan"])
+        pk_cb.pack(side="left", padx=3)
+        nn_var = tk.BooleanVar()
+        nn_cb = ctk.CTkCheckBox(row, text="", variable=nn_var, width=30,
+                                 checkbox_width=16, checkbox_height=16,
+                                 fg_color=COLORS["accent1"], border_color=COLORS["cyan"])
+        nn_cb.pack(side="left", padx=3)
+        default_e = ctk.CTkEntry(row, width=90, font=("Courier New", 10),
+                                  fg_color=COLORS["bg3"], border_color=COLORS["border_glow"],
+                                  text_color=COLORS["text"])
+        default_e.pack(side="left", padx=3)
+        self._col_rows.append((name_e, type_cb, pk_var, nn_var, default_e))
+
+    def _remove_column(self):
+        if len(self._col_rows) > 1:
+            *rest, last = self._col_rows
+            last[0].master.destroy()
+            self._col_rows = rest
+
+    def _create(self):
+        name = self._name_entry.get().strip()
+        if not name:
+            messagebox.showerror("Erreur", "Le nom de la table est requis.", parent=self)
+            return
+        cols = []
+        for name_e, type_cb, pk_v, nn_v, def_e in self._col_rows:
+            cn = name_e.get().strip()
+            if not cn:
+                continue
+            cols.append((cn, type_cb.get(), pk_v.get(), nn_v.get(), def_e.get()))
+        if not cols:
+            messagebox.showerror("Erreur", "Au moins une colonne est requise.", parent=self)
+            return
+        def _done(result):
+            ok, msg = result
+            if ok:
+                if self.on_done:
+                    self.on_done()
+                self.destroy()
+            else:
+                messagebox.showerror("Erreur SQL", msg, parent=self)
+        run_in_background(self, create_table, name, cols, on_done=_done)
+
+
+# ─── Dialogue Insérer Ligne ───────────────────────────────────────────────
+class InsertRowDialog(ctk.CTkToplevel):
+    def __init__(self, master, table_name, on_done=None):
+        super().__init__(master)
+        self.table_name = table_name
+        self.on_done = on_done
+        self.title(f"INSERT INTO {table_name}")
+        self.geometry("520x520")
+        self.configure(fg_color=COLORS["bg"])
+        self.resizable(False, False)
+        self._fields = {}
+        self._columns = []
+        self._progress = None
+        self._build()
+        self.lift()
+        self.focus_force()
+
+    def _build(self):
+        GlitchLabel(self, f"// INSERT INTO {self.table_name}",
+                    font=("Courier New", 12, "bold"), text_color=COLORS["magenta"]).pack(pady=(16, 4))
+        tabs = ctk.CTkTabview(self, fg_color=COLORS["bg"], segmented_button_fg_color=COLORS["bg3"],
+                              segmented_button_selected_color=COLORS["accent1"],
+                              text_color=COLORS["text_bright"])
+        tabs.pack(fill="both", expand=True, padx=14, pady=(0, 10))
+        single = tabs.add("UNE LIGNE")
+        bulk = tabs.add("EN MASSE")
+
+        form = ctk.CTkScrollableFrame(single, fg_color=COLORS["bg2"],
+                                       border_width=1, border_color=COLORS["border_glow"],
+                                       height=300)
+        form.pack(fill="x", padx=6, pady=4)
+        NeonButton(single, "▶ INSERT", color="green", command=self._insert, width=160).pack(pady=12)
+
+        # ── Saisie en masse : lignes collées depuis un tableur (TSV) ──
+        self._bulk_hint = ctk.CTkLabel(bulk, text="Colle des lignes séparées par tabulations "
+                                       "(1re ligne = en-tête optionnel).",
+                                       font=("Courier New", 9), text_color=COLORS["text_dim"])
+        self._bulk_hint.pack(anchor="w", padx=6)
+        self._bulk_text = tk.Text(
+            bulk, bg=COLORS["bg2"], fg=COLORS["cyan"], insertbackground=COLORS["cyan"],
+            selectbackground=COLORS["accent1"], font=("Courier New", 10), bd=0, padx=8, pady=6,
+            relief="flat", highlightthickness=0, wrap="none", height=12, undo=True
+        )
+        self._bulk_text.pack(fill="both", expand=True, padx=6, pady=4)
+        bulk_row = ctk.CTkFrame(bulk, fg_color="transparent")
+        bulk_row.pack(fill="x", padx=6, pady=(0, 6))
+        NeonButton(bulk_row, "▶ INSERT EN MASSE", color="green",
+                   command=self._insert_bulk, width=170).pack(side="left")
+        self._bulk_status = ctk.CTkLabel(bulk_row, text="", font=("Courier New", 10),
+                                         text_color=COLORS["text_dim"], anchor="w")
+        self._bulk_status.pack(side="left", padx=10)
+        run_in_background(self, get_table_info, self.table_name,
+                          on_done=lambda info: self._build_fields(form, info), read=True)
+
+    def _build_fields(self, form, info):
+        self._columns = [col[1] for col in info]
+        self._bulk_hint.configure(text=self._bulk_hint.cget("text") + "\n"
+                                  + "\t".join(self._columns))
+        for col in info:
+            _, cname, ctype, _, dflt, pk = col
+            row = ctk.CTkFrame(form, fg_color="transparent")
+            row.pack(fill="x", pady=4)
+            label_txt = f"{cname} [{ctype}]"
+            if pk:
+                label_txt += " 🔑"
+            ctk.CTkLabel(row, text=label_txt, font=("Courier New", 10),
+                         text_color=COLORS["text"], width=160, anchor="w").pack(side="left", padx=6)
+            entry = ctk.CTkEntry(row, font=("Courier New", 10),
+                                  fg_color=COLORS["bg3"], border_color=COLORS["border_glow"],
+                                  text_color=COLORS["cyan"], width=200,
+                                  placeholder_text=str(dflt) if dflt else "")
+            entry.pack(side="left")
+            self._fields[cname] = entry
+
+    def _insert(self):
+        data = {k: v.get() for k, v in self._fields.items() if v.get().strip()}
+        def _done(result):
+            ok, msg = result
+            if ok:
+                if self.on_done:
+                    self.on_done()
+                self.destroy()
+            else:
+                messagebox.showerror("Erreur", msg, parent=self)
+        run_in_background(self, insert_row, self.table_name, data, on_done=_done)
+
+    def _insert_bulk(self):
+        if self._progress is not None:
+            return
+        columns, rows = parse_tsv(self._bulk_text.get("1.0", "end"), self._columns)
+        if not rows:
+            self._bulk_status.configure(text="Aucune ligne.", text_color=COLORS["yellow"])
+            return
+        self._progress = (0, len(rows))
+        started = time.perf_counter()
+
+        def _progress(done, total):
+            self._progress = (done, total)
+
+        def _tick():
+            if self._progress is None:
+                return
+            done, total = self._progress
+            rate = done / max(time.perf_counter() - started, 1e-6)
+            self._bulk_status.configure(text=f"{done}/{total} · {rate:,.0f} lignes/s",
+                                        text_color=COLORS["yellow"])
+            self.after(100, _tick)
+
+        def _done(result):
+            self._progress = None
+            ok, msg, errors = result
+            self._bulk_status.configure(text=msg, text_color=COLORS["green"] if ok else COLORS["red"])
+            if self.on_done:
+                self.on_done()
+            if ok:
+                self.destroy()
+                return
+            # Rapport ligne par ligne des rejets (n° de ligne de données, hors en-tête).
+            report = "\n".join(f"ligne {i} : {err}" for i, err in errors[:200])
+            if len(errors) > 200:
+                report += f"\n... ({len(errors) - 200} autres)"
+            messagebox.showerror("Lignes rejetées", report, parent=self)
+
+        run_in_background(self, insert_rows, self.table_name, columns, rows,
+                          progress=_progress, on_done=_done)
+        _tick()
+
+
+# ─── Dialogue Import CSV ──────────────────────────────────────────────────
+class ImportCSVDialog(ctk.CTkToplevel):
+    def __init__(self, master, path, status_bar, on_done=None):
+        super().__init__(master)
+        self.path = path
+        self.status = status_bar
+        self.on_done = on_done
+        self.title("Importer un CSV")
+        self.geometry("480x240")
+        self.configure(fg_color=COLORS["bg"])
+        self.resizable(False, False)
+        self._cancel = threading.Event()
+        self._progress = None
+        self._build()
+        self.lift()
+        self.focus_force()
+
+    def _build(self):
+        GlitchLabel(self, "// IMPORT CSV", font=("Courier New", 14, "bold"),
+                    text_color=COLORS["magenta"]).pack(pady=(16, 4))
+        ctk.CTkLabel(self, text=os.path.basename(self.path), font=("Courier New", 10),
+                     text_color=COLORS["text_dim"]).pack()
+        name_f = ctk.CTkFrame(self, fg_color="transparent")
+        name_f.pack(fill="x", padx=20, pady=8)
+        ctk.CTkLabel(name_f, text="Table cible :", font=("Courier New", 11),
+                     text_color=COLORS["text"]).pack(side="left")
+        self._name_entry = ctk.CTkEntry(name_f, font=("Courier New", 11),
+                                         fg_color=COLORS["bg3"], border_color=COLORS["cyan"],
+                                         text_color=COLORS["cyan"], width=240)
+        self._name_entry.insert(0, os.path.splitext(os.path.basename(self.path))[0])
+        self._name_entry.pack(side="left", padx=10)
+        self._info = ctk.CTkLabel(self, text="Table existante : ajout. Sinon : création (types inférés).",
+                                  font=("Courier New", 10), text_color=COLORS["text_dim"])
+        self._info.pack(pady=4)
+        btn_row = ctk.CTkFrame(self, fg_color="transparent")
+        btn_row.pack(pady=10)
+        self._start_btn = NeonButton(btn_row, "▶ IMPORTER", color="green", command=self._start, width=140)
+        self._start_btn.pack(side="left", padx=6)
+        NeonButton(btn_row, "■ ANNULER", color="red", command=self._cancel_import,
+                   width=120).pack(side="left", padx=6)
+
+    def _start(self):
+        name = self._name_entry.get().strip()
+        if not name or self._progress is not None:
+            return
+        self._progress = (0, 0, 1, 0.0)
+        self._start_btn.configure(state="disabled")
+
+        def _progress(rows, read, total, rate):
+            self._progress = (rows, read, total, rate)
+
+        run_in_background(self, import_csv, self.path, name, progress=_progress,
+                          cancel=self._cancel, on_done=self._done)
+        self._tick()
+
+    def _tick(self):
+        if self._progress is None:
+            return
+        rows, read, total, rate = self._progress
+        self._info.configure(text=f"{rows:,} lignes · {rate:,.0f} lignes/s · {read * 100 // max(total, 1)}%",
+                             text_color=COLORS["yellow"])
+        self.status.set_progress(read / max(total, 1))
+        self.after(150, self._tick)
+
+    def _cancel_import(self):
+        if self._progress is None:
+            self.destroy()
+        else:
+            self._cancel.set()
+
+    def _done(self, result):
+        self._progress = None
+        self.status.set_progress(None)
+        ok, msg, _ = result
+        self.status.set_msg(msg, ok)
+        if self.on_done:
+            self.on_done()
+        if ok:
+            self.destroy()
+        else:
+            self._info.configure(text=msg, text_color=COLORS["red"])
+            self._start_btn.configure(state="normal")
+            self._cancel.clear()
+
+
+class IndexAdvisorDialog(ctk.CTkToplevel):
+    """Propositions d'index tirées de l'historique des requêtes ; création à la
+    demande avec mesure avant / après."""
+
+    def __init__(self, master, status_bar):
+        super().__init__(master)
+        self.status = status_bar
+        self._proposals = []
+        self.title("Conseiller d'index")
+        self.geometry("820x420")
+        self.configure(fg_color=COLORS["bg"])
+        self._build()
+        self.lift()
+        self.focus_force()
+        self._refresh()
+
+    def _build(self):
+        GlitchLabel(self, "// INDEX ADVISOR", font=("Courier New", 14, "bold"),
+                    text_color=COLORS["magenta"]).pack(pady=(16, 4))
+        self._info = ctk.CTkLabel(self, text="Analyse des requêtes...", font=("Courier New", 10),
+                                  text_color=COLORS["text_dim"])
+        self._info.pack()
+        frame = ctk.CTkFrame(self, fg_color=COLORS["bg3"])
+        frame.pack(fill="both", expand=True, padx=14, pady=8)
+        self._tree = ttk.Treeview(frame, style="Glitch.Treeview", show="headings",
+                                  columns=("gain", "count", "sql"))
+        for col, text, width in (("gain", "GAIN ×", 70), ("count", "REQ.", 50), ("sql", "INDEX", 640)):
+            self._tree.heading(col, text=text)
+            self._tree.column(col, width=width, stretch=col == "sql")
+        self._tree.pack(fill="both", expand=True)
+        self._tree.bind("<<TreeviewSelect>>", self._on_select)
+        self._query = ctk.CTkLabel(self, text="", font=("Courier New", 10), wraplength=780,
+                                   justify="left", text_color=COLORS["text_dim"])
+        self._query.pack(padx=14, anchor="w")
+        btn_row = ctk.CTkFrame(self, fg_color="transparent")
+        btn_row.pack(pady=10)
+        NeonButton(btn_row, "◈ CRÉER L'INDEX", color="green", command=self._build_index,
+                   width=150).pack(side="left", padx=6)
+        NeonButton(btn_row, "⟳ ANALYSER", color="cyan", command=self._refresh,
+                   width=120).pack(side="left", padx=6)
+
+    def _refresh(self):
+        run_in_background(self, advise_indexes, on_done=self._show, read=True)
+
+    def _show(self, proposals):
+        self._proposals = proposals
+        self._tree.delete(*self._tree.get_children())
+        for i, p in enumerate(proposals):
+            self._tree.insert("", "end", iid=str(i), values=(
+                f"{p['estimated_gain']:.1f}", p["count"], p["sql"]))
+        n = len(logged_queries())
+        self._info.configure(text=f"{len(proposals)} proposition(s) pour {n} requête(s) historisée(s).")
+
+    def _selected(self):
+        sel = self._tree.selection()
+        return self._proposals[int(sel[0])] if sel else None
+
+    def _on_select(self, _event=None):
+        p = self._selected()
+        if p:
+            self._query.configure(text=" ".join(p["queries"][0].split())[:300])
+
+    def _build_index(self):
+        p = self._selected()
+        if not p:
+            return
+
+        def _done(result):
+            ok, msg, _, _ = result
+            self.status.set_msg(msg, ok)
+            self._info.configure(text=msg, text_color=COLORS["green"] if ok else COLORS["red"])
+            if ok:
+                self._refresh()
+
+        self._info.configure(text="Création de l'index...", text_color=COLORS["yellow"])
+        run_in_background(self, build_index, p, on_done=_done)
+
+
+class QueryHistoryDialog(ctk.CTkToplevel):
+    """Historique des scripts exécutés ; double-clic pour recharger dans l'éditeur."""
+
+    def __init__(self, master, on_pick):
+        super().__init__(master)
+        self.on_pick = on_pick
+        self._rows = []
+        self._search_job = None
+        self._search_seq = 0  # seule la dernière recherche lancée est affichée
+        self.title("Historique SQL")
+        self.geometry("860x440")
+        self.configure(fg_color=COLORS["bg"])
+        self._build()
+        self.lift()
+        self.focus_force()
+        self._refresh()
+
+    def _build(self):
+        GlitchLabel(self, "// HISTORIQUE", font=("Courier New", 14, "bold"),
+                    text_color=COLORS["magenta"]).pack(pady=(16, 4))
+        search_f = ctk.CTkFrame(self, fg_color="transparent")
+        search_f.pack(fill="x", padx=14, pady=4)
+        ctk.CTkLabel(search_f, text="Recherche :", font=("Courier New", 11),
+                     text_color=COLORS["text"]).pack(side="left")
+        self._search = ctk.CTkEntry(search_f, font=("Courier New", 11), fg_color=COLORS["bg3"],
+                                    border_color=COLORS["cyan"], text_color=COLORS["cyan"], width=320)
+        self._search.pack(side="left", padx=10)
+        self._search.bind("<KeyRelease>", lambda _e: self._schedule_refresh())
+        frame = ctk.CTkFrame(self, fg_color=COLORS["bg3"])
+        frame.pack(fill="both", expand=True, padx=14, pady=8)
+        self._tree = ttk.Treeview(frame, style="Glitch.Treeview", show="headings",
+                                  columns=("ts", "db", "elapsed", "rows", "sql"))
+        for col, text, width in (("ts", "DATE", 130), ("db", "BASE", 110), ("elapsed", "DURÉE", 80),
+                                 ("rows", "LIGNES", 60), ("sql", "SQL", 460)):
+            self._tree.heading(col, text=text)
+            self._tree.column(col, width=width, stretch=col == "sql")
+        self._tree.tag_configure("error", foreground=COLORS["red"])
+        self._tree.tag_configure("cached", foreground=COLORS["cyan"])
+        self._tree.pack(fill="both", expand=True)
+        self._tree.bind("<Double-1>", lambda _e: self._pick())
+        btn_row = ctk.CTkFrame(self, fg_color="transparent")
+        btn_row.pack(pady=10)
+        NeonButton(btn_row, "↵ CHARGER", color="green", command=self._pick,
+                   width=120).pack(side="left", padx=6)
+        NeonButton(btn_row, "✗ EFFACER", color="red", command=self._clear,
+                   width=120).pack(side="left", padx=6)
+
+    def _schedule_refresh(self):
+        # Frappe continue : une seule recherche, 150 ms après la dernière touche.
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(150, self._refresh)
+
+    def _refresh(self):
+        # history.db est lu sur un thread de lecture, jamais sur le thread Tk.
+        self._search_job = None
+        self._search_seq += 1
+        seq = self._search_seq
+        run_in_background(self, QUERY_HISTORY.search, self._search.get(),
+                          on_done=lambda found: self._show(seq, found), read=True)
+
+    def _show(self, seq, found):
+        if seq != self._search_seq:
+            return
+        self._rows = found
+        self._tree.delete(*self._tree.get_children())
+        for i, (_, ts, db, sql, _, elapsed, rows, cached, error) in enumerate(self._rows):
+            duration = "cache" if cached else f"{elapsed * 1000:.1f}ms"
+            self._tree.insert("", "end", iid=str(i), values=(
+                time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts)),
+                os.path.basename(db or ""), duration, rows if not error else "✗",
+                " ".join(sql.split())[:120]),
+                tags=("error",) if error else ("cached",) if cached else ())
+
+    def _pick(self):
+        sel = self._tree.selection()
+        if sel:
+            self.on_pick(self._rows[int(sel[0])][3])
+            self.destroy()
+
+    def destroy(self):
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+            self._search_job = None
+        super().destroy()
+
+    def _clear(self):
+        if messagebox.askyesno("Historique", "Effacer tout l'historique SQL ?"):
+            run_in_background(self, QUERY_HISTORY.clear, on_done=lambda _: self._refresh())
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ONGLET 2 — GÉNÉRATEUR SQL
+# ═══════════════════════════════════════════════════════════════════════════
+
+class SQLGeneratorTab(ctk.CTkFrame):
+    MAX_RESULT_TABS = 20  # au-delà, les résultats restent listés dans MESSAGES
+
+    def __init__(self, master, status_bar, **kwargs):
+        super().__init__(master, fg_color=COLORS["bg"], **kwargs)
+        self.status = status_bar
+        self._build()
+
+    def _build(self):
+        # ── Toolbar ──
+        toolbar = ScanlineFrame(self, border_color=COLORS["border"])
+        toolbar.pack(fill="x", padx=10, pady=(10, 6))
+        GlitchLabel(toolbar, "// SQL GENERATOR", glitch=False,
+                    font=("Courier New", 13, "bold")).pack(side="left", padx=12, pady=6)
+        NeonButton(toolbar, "⬆ EXPORTER .SQL", color="yellow",
+                   command=self._export, width=140).pack(side="right", padx=6, pady=6)
+        NeonButton(toolbar, "⬆ RÉSULTAT", color="yellow",
+                   command=self._export_result, width=110).pack(side="right", pady=6)
+        NeonButton(toolbar, "▶ EXÉCUTER", color="green",
+                   command=self._execute, width=110).pack(side="right", pady=6)
+        NeonButton(toolbar, "⫶ SHARDS", color="green",
+                   command=self._execute_shards, width=100).pack(side="right", padx=(6, 0), pady=6)
+        NeonButton(toolbar, "■ ANNULER", color="red",
+                   command=self._cancel, width=100).pack(side="right", padx=6, pady=6)
+        NeonButton(toolbar, "⟳ SCHEMA", color="cyan",
+                   command=self._gen_schema, width=100).pack(side="right", pady=6)
+        NeonButton(toolbar, "◷ HISTORIQUE", color="cyan",
+                   command=lambda: QueryHistoryDialog(self, self._load_sql), width=120
+                   ).pack(side="right", pady=6)
+        NeonButton(toolbar, "◎ INDEX", color="magenta",
+                   command=lambda: IndexAdvisorDialog(self, self.status), width=90
+                   ).pack(side="right", padx=6, pady=6)
+        self._run_label = ctk.CTkLabel(toolbar, text="", font=("Courier New", 10),
+                                       text_color=COLORS["text_dim"])
+        self._run_label.pack(side="left", padx=6)
+        self._batch_var = tk.BooleanVar(value=False)
+        self._savepoint_var = tk.BooleanVar(value=False)
+        self._profile_var = tk.BooleanVar(value=False)
+        for text, var in (("PROFILE", self._profile_var), ("SAVEPOINTS", self._savepoint_var),
+                          ("BATCH", self._batch_var)):
+            ctk.CTkCheckBox(toolbar, text=text, variable=var, font=("Courier New", 10),
+                            text_color=COLORS["text_dim"], checkbox_width=16, checkbox_height=16,
+                            fg_color=COLORS["accent1"], border_color=COLORS["cyan"]
+                            ).pack(side="right", padx=4, pady=6)
+        self._running = None
+        self._fetched = 0
+        self._results = []
+
+        # ── Zone éditeur ──
+        paned = ctk.CTkFrame(self, fg_color="transparent")
+        paned.pack(fill="both", expand=True, padx=10, pady=4)
+        paned.rowconfigure(0, weight=2)
+        paned.rowconfigure(1, weight=1)
+        paned.columnconfigure(0, weight=1)
+
+        # Éditeur SQL
+        editor_frame = ScanlineFrame(paned, border_color=COLORS["border_glow"])
+        editor_frame.grid(row=0, column=0, sticky="nsew", pady=(0, 6))
+        ctk.CTkLabel(editor_frame, text="SQL EDITOR", font=("Courier New", 9, "bold"),
+                     text_color=COLORS["magenta"]).pack(anchor="w", padx=10, pady=(6, 0))
+        self._sql_text = tk.Text(
+            editor_frame, bg=COLORS["bg2"], fg=COLORS["cyan"],
+            insertbackground=COLORS["cyan"], selectbackground=COLORS["accent1"],
+            font=("Courier New", 12), bd=0, padx=12, pady=8,
+            relief="flat", highlightthickness=0, wrap="none",
+            undo=True
+        )
+        self._sql_text.pack(fill="both", expand=True, padx=8, pady=(0, 8))
+        self._sql_text.insert("1.0", "-- Écris ou génère du SQL ici\n\n")
+
+        # Résultats
+        result_frame = ScanlineFrame(paned, border_color=COLORS["border"])
+        result_frame.grid(row=1, column=0, sticky="nsew")
+        ctk.CTkLabel(result_frame, text="OUTPUT", font=("Courier New", 9, "bold"),
+                     text_color=COLORS["magenta"]).pack(anchor="w", padx=10, pady=(6, 0))
+        # Un onglet MESSAGES, puis une grille virtualisée par jeu de résultats.
+        self._result_tabs = ctk.CTkTabview(
+            result_frame, fg_color=COLORS["bg3"], segmented_button_fg_color=COLORS["bg3"],
+            segmented_button_selected_color=COLORS["accent1"], text_color=COLORS["text_bright"],
+            height=160)
+        self._result_tabs.pack(side="left", fill="both", expand=True, padx=8, pady=(0, 8))
+        self._grid_tabs = []
+        self._result_text = tk.Text(
+            self._result_tabs.add("MESSAGES"), bg=COLORS["bg3"], fg=COLORS["green"],
+            insertbackground=COLORS["green"],
+            font=("Courier New", 10), bd=0, padx=10, pady=6,
+            relief="flat", highlightthickness=0, state="disabled", height=6
+        )
+        self._result_text.pack(fill="both", expand=True)
+
+        # Plan d'exécution (mode PROFILE) : une entrée par instruction, le plan en enfants.
+        self._plan_frame = ctk.CTkFrame(result_frame, fg_color="transparent", width=460)
+        self._plan_tree = ttk.Treeview(self._plan_frame, style="Glitch.Treeview",
+                                       columns=("wall", "first", "rows", "steps"))
+        for col, text, width in (("#0", "PLAN", 220), ("wall", "TOTAL", 70), ("first", "1re LIGNE", 70),
+                                 ("rows", "LIGNES", 60), ("steps", "VM", 70)):
+            self._plan_tree.heading(col, text=text)
+            self._plan_tree.column(col, width=width, stretch=col == "#0")
+        self._plan_tree.tag_configure("scan", foreground=COLORS["red"])
+        self._plan_tree.tag_configure("temp", foreground=COLORS["yellow"])
+        self._plan_tree.tag_configure("stmt", foreground=COLORS["cyan"])
+        self._plan_tree.pack(fill="both", expand=True)
+
+    def _show_profile(self, results):
+        tree = self._plan_tree
+        tree.delete(*tree.get_children())
+        profiled = [r for r in results if r.profile]
+        if not profiled:
+            self._plan_frame.pack_forget()
+            return
+        self._plan_frame.pack(side="right", fill="both", padx=(0, 8), pady=(0, 8))
+
+        def _add(parent, nodes):
+            for node in nodes:
+                text = node["detail"] + {"scan": "  ⚠ FULL SCAN", "temp": "  ⚠ TEMP B-TREE"}.get(node["flag"], "")
+                item = tree.insert(parent, "end", text=text, open=True, tags=(node["flag"] or "",))
+                _add(item, node["children"])
+
+        for r in profiled:
+            p = r.profile
+            first = f"{p['first_row'] * 1000:.1f}ms" if p["first_row"] is not None else "—"
+            flagged = self._plan_flags(p["plan"])
+            item = tree.insert("", "end", text=" ".join(r.sql.split())[:60], open=bool(flagged),
+                               values=(f"{r.elapsed * 1000:.1f}ms", first, p["rows"], f"{p['vm_steps']:,}"),
+                               tags=("stmt",))
+            _add(item, p["plan"])
+
+    @staticmethod
+    def _plan_flags(nodes):
+        stack, flags = list(nodes), set()
+        while stack:
+            node = stack.pop()
+            if node["flag"]:
+                flags.add(node["flag"])
+            stack.extend(node["children"])
+        return flags
+
+    def _write_result(self, txt, color=None):
+        self._result_text.configure(state="normal")
+        self._result_text.delete("1.0", "end")
+        self._result_text.insert("1.0", txt)
+        if color:
+            self._result_text.configure(fg=color)
+        self._result_text.configure(state="disabled")
+        self._result_tabs.set("MESSAGES")
+
+    def _gen_schema(self):
+        run_in_background(self, lambda: (generate_sql_schema(), len(get_tables())),
+                          on_done=self._show_schema, read=True)
+
+    def _show_schema(self, result):
+        sql, n_tables = result
+        if not sql:
+            self._write_result("⚠ Aucune base de données ouverte.", COLORS["yellow"])
+            return
+        self._sql_text.delete("1.0", "end")
+        self._sql_text.insert("1.0", sql)
+        self._write_result(f"✓ Schéma de {n_tables} table(s) généré.", COLORS["green"])
+        self.status.set_msg("Schéma SQL généré.")
+
+    def _load_sql(self, sql):
+        self._sql_text.delete("1.0", "end")
+        self._sql_text.insert("1.0", sql)
+        self.status.set_msg("Requête rechargée depuis l'historique.")
+
+    def _execute(self):
+        sql = self._sql_text.get("1.0", "end").strip()
+        if not sql or self._running:
+            return
+        self._fetched = 0
+        self._running = time.perf_counter()
+        self._write_result("… exécution en cours", COLORS["text_dim"])
+
+        def _progress(n):
+            # Appelé depuis le worker : simple affectation, l'UI la lit dans _tick.
+            self._fetched = n
+
+        options = {"batch": self._batch_var.get(),
+                   "savepoints": self._batch_var.get() and self._savepoint_var.get(),
+                   "profile": self._profile_var.get()}
+        self._submit(sql, _progress, options, read=is_read_only_sql(sql))
+        self._tick()
+
+    def _execute_shards(self):
+        sql = self._sql_text.get("1.0", "end").strip()
+        if not sql or self._running:
+            return
+        paths = filedialog.askopenfilenames(
+            title="Shards : fichiers de même schéma",
+            filetypes=[("SQLite DB", "*.db *.sqlite *.sqlite3"), ("Tous", "*.*")]
+        )
+        if not paths:
+            return
+        self._fetched = 0
+        self._running = time.perf_counter()
+        self._write_result(f"… {len(paths)} shard(s) en cours", COLORS["text_dim"])
+
+        def _progress(n):
+            self._fetched = n
+
+        run_in_background(self, shard_query, list(paths), sql, progress=_progress,
+                          on_done=self._show_results,
+                          on_error=lambda e: self._show_results((False, str(e), [])), read=True)
+        self._tick()
+
+    def _submit(self, sql, progress, options, read):
+        def _done(result):
+            ok, msg, _ = result
+            if read and not ok and "readonly" in msg:
+                # Lecture seule mal devinée : on rejoue sur la connexion d'écriture.
+                self._submit(sql, progress, options, read=False)
+                return
+            self._show_results(result)
+        # Les scripts en lecture seule tournent sur un lecteur WAL, en parallèle des écritures.
+        run_in_background(self, execute_sql, sql, progress=progress, **options, on_done=_done,
+                          on_error=lambda e: self._show_results((False, str(e), [])), read=read)
+
+    def _tick(self):
+        if not self._running:
+            return
+        elapsed = time.perf_counter() - self._running
+        self._run_label.configure(text=f"⏱ {elapsed:.1f}s · {self._fetched} ligne(s)",
+                                  text_color=COLORS["yellow"])
+        self.after(100, self._tick)
+
+    def _cancel(self):
+        if self._running:
+            DB_EXECUTOR.cancel()
+
+    def _show_results(self, result):
+        elapsed = time.perf_counter() - self._running
+        self._running = None
+        self._run_label.configure(text=f"⏱ {elapsed:.2f}s · {self._fetched} ligne(s)",
+                                  text_color=COLORS["text_dim"])
+        ok, msg, results = result
+        if not ok:
+            self._write_result(f"✗ ERREUR : {msg}", COLORS["red"])
+            self.status.set_msg(msg, False)
+            return
+        for name in self._grid_tabs:
+            self._result_tabs.delete(name)
+        self._grid_tabs = []
+        for _, stream in self._results:
+            if stream:
+                DB_EXECUTOR.submit(stream.close)
+        self._results = results
+        self._show_profile(results)
+        output = [f"✓ {msg}", ""]
+        for i, (cols, rows) in enumerate(results):
+            if cols:
+                n = f"{rows.fetched}" if rows.exhausted else f"{rows.fetched}+"
+                origin = ", cache" if results[i].cached else ""
+                output.append(f"--- Résultat {i+1} ({n} ligne(s){origin}) : {' '.join(results[i].sql.split())[:60]}")
+                if len(self._grid_tabs) < self.MAX_RESULT_TABS:
+                    self._add_grid(f"R{i + 1}", rows)
+        failed = [r for r in results if r.error]
+        if failed:
+            output += ["", f"--- {len(failed)} instruction(s) annulée(s) ---"]
+            output += [f"  ✗ {r.sql[:60]!r} : {r.error}" for r in failed[:20]]
+        if len(results) > 1:
+            output += ["", "--- Instructions les plus lentes ---"]
+            for r in sorted(results, key=lambda r: r.elapsed, reverse=True)[:10]:
+                output.append(f"  {r.elapsed * 1000:9.2f} ms  {' '.join(r.sql.split())[:80]}")
+        self._write_result("\n".join(output), COLORS["green"])
+        if self._grid_tabs:
+            self._result_tabs.set(self._grid_tabs[0])
+        self.status.set_msg(f"SQL exécuté : {msg}")
+
+    def _add_grid(self, name, stream):
+        view = VirtualTreeview(self._result_tabs.add(name))
+        view.pack(fill="both", expand=True)
+        # Le dimensionnement ne lit que les lignes déjà reçues : pas d'accès au
+        # curseur depuis le thread Tk, la grille tire la suite en arrière-plan.
+        view.set_source(ResultWindow(stream), sample=stream.rows(0, min(200, stream.fetched)))
+        self._grid_tabs.append(name)
+
+    def _export_result(self):
+        streams = [r.rows for r in self._results if r.columns]
+        if not streams:
+            self.status.set_msg("Aucun résultat à exporter.", False)
+            return
+        path = filedialog.asksaveasfilename(
+            title="Exporter le résultat",
+            defaultextension=".csv",
+            filetypes=EXPORT_FILETYPES
+        )
+        if path:
+            # Même flux que l'affichage : les lignes déjà lues puis la suite du curseur.
+            # Réservé ici : une nouvelle exécution ne le ferme pas tant que l'export tourne.
+            run_with_progress(self, self.status, export_result, streams[-1].retain(), path, read=True)
+
+    def _export(self):
+        sql = self._sql_text.get("1.0", "end")
+        path = filedialog.asksaveasfilename(
+            title="Exporter le SQL",
+            defaultextension=".sql",
+            filetypes=[("SQL File", "*.sql"), ("Tous", "*.*")]
+        )
+        if not path:
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(sql)
+        self.status.set_msg(f"SQL exporté → {os.path.basename(path)}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ONGLET 3 — VISUALISATION UML / DRAWIO
+# ═══════════════════════════════════════════════════════════════════════════
+
+class DrawioTab(ctk.CTkFrame):
+    def __init__(self, master, status_bar, **kwargs):
+        super().__init__(master, fg_color=COLORS["bg"], **kwargs)
+        self.status = status_bar
+        self._generated = False
+        self._build()
+        self.winfo_toplevel().bind("<<DatabaseChanged>>", self._on_db_changed, add="+")
+
+    def _build(self):
+        toolbar = ScanlineFrame(self, border_color=COLORS["border"])
+        toolbar.pack(fill="x", padx=10, pady=(10, 6))
+        GlitchLabel(toolbar, "// UML DRAWIO GENERATOR", glitch=False,
+                    font=("Courier New", 13, "bold")).pack(side="left", padx=12, pady=6)
+        NeonButton(toolbar, "⬆ EXPORTER .DRAWIO", color="yellow",
+                   command=self._export, width=160).pack(side="right", padx=6, pady=6)
+        NeonButton(toolbar, "⟳ GÉNÉRER", color="magenta",
+                   command=self._generate, width=130).pack(side="right", pady=6)
+        self._layout_menu = ctk.CTkOptionMenu(
+            toolbar, values=["auto", "layered", "force"], font=("Courier New", 10),
+            fg_color=COLORS["bg3"], button_color=COLORS["bg3"], button_hover_color=COLORS["bg2"],
+            text_color=COLORS["accent1"], dropdown_fg_color=COLORS["bg3"], width=110)
+        self._layout_menu.set("auto")
+        self._layout_menu.pack(side="right", padx=6, pady=6)
+
+        # Info
+        info = ScanlineFrame(self, border_color=COLORS["border"])
+        info.pack(fill="x", padx=10, pady=(0, 6))
+        ctk.CTkLabel(info, text="  ℹ  Génère un fichier .drawio prêt à ouvrir dans draw.io / diagrams.net — visualisation UML de ton schéma.",
+                     font=("Courier New", 10), text_color=COLORS["text_dim"]).pack(anchor="w", padx=4, pady=6)
+
+        # Aperçu : schéma dessiné (canvas) ou début du XML
+        views = ctk.CTkTabview(self, fg_color=COLORS["bg"], segmented_button_fg_color=COLORS["bg3"],
+                               segmented_button_selected_color=COLORS["accent1"],
+                               text_color=COLORS["text_bright"])
+        views.pack(fill="both", expand=True, padx=10, pady=4)
+        canvas_frame = ScanlineFrame(views.add("SCHÉMA"), border_color=COLORS["border_glow"])
+        canvas_frame.pack(fill="both", expand=True)
+        ctk.CTkLabel(canvas_frame, text="molette : zoom · glisser : déplacer · double-clic : tout afficher",
+                     font=("Courier New", 9), text_color=COLORS["text_dim"]).pack(anchor="w", padx=10, pady=(6, 0))
+        self._canvas = SchemaCanvas(canvas_frame)
+        self._canvas.pack(fill="both", expand=True, padx=8, pady=(0, 8))
+        preview_frame = ScanlineFrame(views.add("XML"), border_color=COLORS["border_glow"])
+        preview_frame.pack(fill="both", expand=True)
+        ctk.CTkLabel(preview_frame, text="APERÇU XML", font=("Courier New", 9, "bold"),
+                     text_color=COLORS["magenta"]).pack(anchor="w", padx=10, pady=(6, 0))
+        self._xml_text = tk.Text(
+            preview_frame, bg=COLORS["bg2"], fg=COLORS["accent2"],
+            insertbackground=COLORS["cyan"],
+            font=("Courier New", 10), bd=0, padx=10, pady=8,
+            relief="flat", highlightthickness=0
+        )
+        self._xml_text.pack(fill="both", expand=True, padx=8, pady=(0, 8))
+        self._xml_text.insert("1.0", "-- Clique sur GÉNÉRER pour prévisualiser --")
+
+    def _on_db_changed(self, event=None):
+        # Aperçu déjà affiché : on suit la base active (mise en page en cache par base).
+        if self._generated:
+            self._generate()
+
+    def _generate(self):
+        self._generated = True
+        layout = self._layout_menu.get()
+        # La mise en page est calculée une fois puis servie par SCHEMA_CACHE aux deux vues.
+        run_in_background(self, schema_canvas_data, layout,
+                          on_done=lambda data: self._canvas.set_schema(*data), read=True)
+        run_in_background(self, drawio_preview, layout, on_done=self._show_xml, read=True)
+
+    def _show_xml(self, result):
+        head, truncated, n_tables = result
+        self._xml_text.delete("1.0", "end")
+        if not head:
+            self._xml_text.insert("1.0", "⚠ Aucune base de données ouverte ou aucune table.")
+            return
+        self._xml_text.insert("1.0", head)
+        if truncated:
+            self._xml_text.insert("end", f"\n\n… aperçu tronqué ({n_tables} table(s)) — "
+                                         "l'export écrit le document complet.")
+        self.status.set_msg(f"Drawio XML généré pour {n_tables} table(s).")
+
+    def _export(self):
+        if not core.current_conn:
+            self.status.set_msg("Aucune base de données ouverte.", False)
+            return
+        default_name = os.path.splitext(os.path.basename(core.current_db_path or "schema"))[0]
+        path = filedialog.asksaveasfilename(
+            title="Exporter .drawio",
+            initialfile=f"{default_name}.drawio",
+            defaultextension=".drawio",
+            filetypes=[("Drawio File", "*.drawio"), ("XML", "*.xml"), ("Tous", "*.*")]
+        )
+        if path:
+            # Écriture en flux depuis le thread de lecture : ni document en mémoire, ni gel de l'aperçu.
+            run_with_progress(self, self.status, write_drawio, path, self._layout_menu.get(), read=True)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# NAVIGATION TABS CUSTOM (style onglets navigateur)
+# ═══════════════════════════════════════════════════════════════════════════
+
+class TabBar(ctk.CTkFrame):
+    def __init__(self, master, tabs, on_change, **kwargs):
+        super().__init__(master, fg_color=COLORS["bg3"], height=40, corner_radius=0, **kwargs)
+        self.pack_propagate(False)
+        self._buttons = []
+        self._active = 0
+        self._on_change = on_change
+
+        # Logo
+        ctk.CTkLabel(self, text="  ⬡ SQLRIFT  ", font=("Courier New", 12, "bold"),
+                     text_color=COLORS["accent1"]).pack(side="left", padx=(8, 16))
+
+        for i, (icon, label) in enumerate(tabs):
+            btn = ctk.CTkButton(
+                self, text=f"{icon}  {label}",
+                font=("Courier New", 11, "bold"),
+                fg_color=COLORS["bg"] if i == 0 else "transparent",
+                hover_color=COLORS["bg2"],
+                text_color=COLORS["cyan"] if i == 0 else COLORS["text_dim"],
+                border_width=0, corner_radius=0, height=40,
+                command=lambda idx=i: self._switch(idx)
+            )
+            btn.pack(side="left")
+            self._buttons.append(btn)
+
+        # Separator
+        ctk.CTkFrame(self, fg_color=COLORS["cyan"], width=2).pack(side="left", fill="y", padx=4)
+        # Right spacer
+        ctk.CTkLabel(self, text="", fg_color="transparent").pack(side="right", fill="x", expand=True)
+        # Version
+        ctk.CTkLabel(self, text="v1.0 ALPHA  ",
+                     font=("Courier New", 9), text_color=COLORS["text_dim"]).pack(side="right")
+
+    def _switch(self, idx):
+        for i, btn in enumerate(self._buttons):
+            if i == idx:
+                btn.configure(fg_color=COLORS["bg"], text_color=COLORS["cyan"])
+            else:
+                btn.configure(fg_color="transparent", text_color=COLORS["text_dim"])
+        self._active = idx
+        self._on_change(idx)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# APPLICATION PRINCIPALE
+# ═══════════════════════════════════════════════════════════════════════════
+
+class SQLRiftApp(ctk.CTk):
+    TABS = [
+        ("◈", "DATABASE EDITOR"),
+        ("◇", "SQL GENERATOR"),
+        ("◆", "UML / DRAWIO"),
+    ]
+
+    def __init__(self):
+        super().__init__()
+        startup_mark("fenêtre Tk")
+        self.title("SQLRIFT — Database Manager")
+        self.geometry("1100x720")
+        self.minsize(800, 560)
+        self.configure(fg_color=COLORS["bg"])
+        self._build()
+
+    def _build(self):
+        # Status bar
+        self._status = StatusBar(self)
+        self._status.pack(side="bottom", fill="x")
+
+        # Separator
+        ctk.CTkFrame(self, fg_color=COLORS["border_glow"], height=1).pack(side="bottom", fill="x")
+
+        # Tab bar
+        self._tabbar = TabBar(self, self.TABS, on_change=self._switch_tab)
+        self._tabbar.pack(side="top", fill="x")
+
+        # Espace de travail : bases ouvertes, la base active est suivie par tous les onglets
+        NeonButton(self._tabbar, "✕", color="red", command=self._close_db,
+                   width=30, height=28).pack(side="right", padx=(4, 8))
+        NeonButton(self._tabbar, "⊕ ATTACH", color="cyan", command=self._attach_db,
+                   width=90, height=28).pack(side="right", padx=4)
+        self._db_menu = ctk.CTkOptionMenu(
+            self._tabbar, values=["NO DB"], command=self._switch_db,
+            font=("Courier New", 10), fg_color=COLORS["bg3"], button_color=COLORS["bg3"],
+            button_hover_color=COLORS["bg2"], text_color=COLORS["green"],
+            dropdown_fg_color=COLORS["bg3"], width=170, height=28)
+        self._db_menu.set("NO DB")
+        self._db_labels = {}  # libellé du menu → clé de WORKSPACE
+        self._db_menu.pack(side="right", padx=4)
+        self.bind("<<DatabaseChanged>>", self._on_db_changed, add="+")
+
+        # Separator under tabs
+        ctk.CTkFrame(self, fg_color=COLORS["cyan"], height=1).pack(fill="x")
+
+        # Content frame
+        self._content = ctk.CTkFrame(self, fg_color=COLORS["bg"])
+        self._content.pack(fill="both", expand=True)
+
+        startup_mark("barre d'onglets et barre d'état")
+
+        # Onglets construits au premier affichage : seul l'éditeur l'est au lancement.
+        self._tab_classes = [DatabaseEditorTab, SQLGeneratorTab, DrawioTab]
+        self._tabs = [None] * len(self._tab_classes)
+        self._current = 0
+        self._tab(0).pack(fill="both", expand=True)
+        startup_mark("onglet DATABASE EDITOR")
+
+    def _tab(self, idx):
+        if self._tabs[idx] is None:
+            later = any(self._tabs)  # construit après le démarrage, au premier affichage
+            started = time.perf_counter()
+            self._tabs[idx] = self._tab_classes[idx](self._content, self._status)
+            if _startup is not None and later:
+                print(f"  onglet {self.TABS[idx][1]} construit en "
+                      f"{(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+        return self._tabs[idx]
+
+    def _switch_tab(self, idx):
+        self._tabs[self._current].pack_forget()
+        self._current = idx
+        self._tab(idx).pack(fill="both", expand=True)
+
+    # ── Espace de travail ──
+    def _on_db_changed(self, event=None):
+        labels = self._db_labels = WORKSPACE.labels()
+        self._db_menu.configure(values=list(labels) or ["NO DB"])
+        active = [label for label, key in labels.items()
+                  if core.current_db_path and key == WORKSPACE.key(core.current_db_path)]
+        self._db_menu.set(active[0] if active else "NO DB")
+
+    def _switch_db(self, label):
+        key = self._db_labels.get(label)
+        if not key:
+            return
+        # Via le thread d'écriture : les écritures en cours finissent sur l'ancienne base.
+        run_in_background(self, switch_database, key, on_done=lambda _: notify_database_changed(self))
+
+    def _close_db(self):
+        if not core.current_conn:
+            return
+        def _done(result):
+            ok, msg = result
+            self._status.set_msg(msg, ok)
+            notify_database_changed(self)
+        run_in_background(self, close_database, on_done=_done)
+
+    def _attach_db(self):
+        if not core.current_conn:
+            messagebox.showwarning("Attention", "Ouvre une base de données d'abord.")
+            return
+        path = filedialog.askopenfilename(
+            title="Attacher une base (requêtes croisées : alias.table)",
+            filetypes=[("SQLite DB", "*.db *.sqlite *.sqlite3"), ("Tous", "*.*")]
+        )
+        if not path:
+            return
+        def _done(result):
+            ok, msg, _ = result
+            self._status.set_msg(msg, ok)
+        run_in_background(self, attach_database, path, on_done=_done)
+
+
+# ─── LANCEMENT ────────────────────────────────────────────────────────────
+def run(started=None, trace=False):
+    """Ouvre la fenêtre principale. Avec `trace` (main.py --trace-startup) ou
+    SQLRIFT_TRACE_STARTUP=1, la durée de chaque étape du démarrage est écrite
+    sur stderr, jusqu'au premier passage à vide de la boucle d'événements."""
+    global _startup
+    if trace or os.environ.get("SQLRIFT_TRACE_STARTUP"):
+        _startup = [("lancement", started or time.perf_counter())]
+        startup_mark("imports (customtkinter, core, app)")
+    window = SQLRiftApp()
+    if _startup is not None:
+        window.after_idle(lambda: (startup_mark("interactive"), _print_startup_trace()))
+    window.mainloop()
@@ -0,0 +1,9 @@
+"""Bancs d'essai reproductibles de la couche base de données (core.py).
+
+    python3 -m bench.generate synth.db --tables 40 --rows 10000 --fks 2
+    python3 -m bench.run --tiers small,medium -o bench-HEAD.json
+    python3 -m bench.compare bench-main.json bench-HEAD.json
+
+Les bases synthétiques sont déterministes (graine fixe) et mises en cache :
+deux commits mesurés avec les mêmes paliers travaillent sur des fichiers
+identiques, et bench.compare signale les régressions entre leurs résultats."""
@@ -0,0 +1,74 @@
+"""Compare deux résultats de bench.run et signale les régressions.
+
+    python3 -m bench.compare bench-main.json bench-HEAD.json --threshold 0.10
+
+Code de sortie 1 si un banc est plus lent de plus de `threshold` (relatif) et
+de `min-delta` ms (absolu, pour ignorer le bruit des mesures très courtes)."""
+import argparse
+import json
+import sys
+
+STATS = ("median_ms", "min_ms", "mean_ms")
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def compare(old, new, stat="median_ms", threshold=0.10, min_delta=0.1):
+    """[(palier, banc, avant, après, ratio, verdict)] pour les bancs mesurés des
+    deux côtés, et les avertissements (machine, paramètres de palier, ...)."""
+    warnings = []
+    for key in ("python", "sqlite", "platform", "cpus"):
+        a, b = old["environment"].get(key), new["environment"].get(key)
+        if a != b:
+            warnings.append(f"{key} différent : {a} → {b}")
+    rows = []
+    for tier, after in new["tiers"].items():
+        before = old["tiers"].get(tier)
+        if before is None:
+            continue
+        if before["params"] != after["params"]:
+            warnings.append(f"palier {tier} : bases différentes, ignoré")
+            continue
+        for name, r in after["results"].items():
+            if name not in before["results"]:
+                continue
+            a, b = before["results"][name][stat], r[stat]
+            ratio = b / a if a else float("inf")
+            if ratio > 1 + threshold and b - a > min_delta:
+                verdict = "RÉGRESSION"
+            elif ratio < 1 / (1 + threshold) and a - b > min_delta:
+                verdict = "gain"
+            else:
+                verdict = ""
+            rows.append((tier, name, a, b, ratio, verdict))
+    return rows, warnings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m bench.compare",
+                                     description="Compare deux résultats de bench.run.")
+    parser.add_argument("old", help="résultats de référence (JSON)")
+    parser.add_argument("new", help="résultats à vérifier (JSON)")
+    parser.add_argument("--stat", choices=STATS, default="median_ms")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="ralentissement relatif toléré (défaut : 0.10 = 10 %%)")
+    parser.add_argument("--min-delta", type=float, default=0.1,
+                        help="écart absolu minimal en ms (défaut : 0.1)")
+    args = parser.parse_args(argv)
+    old, new = load(args.old), load(args.new)
+    rows, warnings = compare(old, new, args.stat, args.threshold, args.min_delta)
+    for w in warnings:
+        print(f"⚠ {w}", file=sys.stderr)
+    commits = [(r["environment"].get("commit") or "?")[:10] for r in (old, new)]
+    print(f"{'palier':>8}  {'banc':<22} {commits[0]:>12} {commits[1]:>12}   ratio")
+    for tier, name, a, b, ratio, verdict in rows:
+        print(f"{tier:>8}  {name:<22} {a:>12,.2f} {b:>12,.2f}   {ratio:5.2f}x  {verdict}")
+    regressions = sum(1 for r in rows if r[5] == "RÉGRESSION")
+    print(f"{len(rows)} banc(s) comparé(s), {regressions} régression(s).", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
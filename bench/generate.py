@@ -0,0 +1,148 @@
+"""Générateur de bases SQLite synthétiques pour les bancs d'essai.
+
+Tout est tiré d'un random.Random(seed) : mêmes paramètres, même graine,
+même contenu. Le générateur n'utilise que sqlite3, pas le code mesuré.
+
+    python3 -m bench.generate synth.db --tables 40 --columns 10 --rows 10000 --fks 2 --blob 64"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+
+GENERATOR_VERSION = 1  # à incrémenter si le contenu généré change (invalide le cache)
+
+# Paliers de taille : tables, colonnes (hors id et clés étrangères), lignes par
+# table, clés étrangères par table (au plus), octets par BLOB (0 : pas de BLOB).
+TIERS = {
+    "small":  {"tables": 8,   "columns": 6,  "rows": 1_000,  "fks": 1, "blob_bytes": 0},
+    "medium": {"tables": 40,  "columns": 10, "rows": 10_000, "fks": 2, "blob_bytes": 64},
+    "large":  {"tables": 200, "columns": 12, "rows": 2_500,  "fks": 3, "blob_bytes": 64},
+}
+
+_TYPES = ("INTEGER", "TEXT", "REAL", "TEXT", "NUMERIC", "INTEGER", "TEXT")
+_WORDS = ("alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel",
+          "india", "juliet", "kilo", "lima", "mike", "november", "oscar", "papa")
+_CHUNK = 5000
+
+
+def table_name(i):
+    return f"t{i:03d}"
+
+def schema_plan(tables, columns, fks, blob_bytes, rng):
+    """[(table, [(colonne, type)], [(colonne, table parente)])]. Le graphe des
+    clés étrangères est acyclique : une table ne référence que des tables
+    créées avant elle, choisies au hasard (jusqu'à `fks`)."""
+    plan = []
+    for i in range(tables):
+        cols = [(f"c{j:02d}", _TYPES[(i + j) % len(_TYPES)]) for j in range(columns)]
+        if blob_bytes:
+            cols.append(("payload", "BLOB"))
+        parents = sorted(rng.sample(range(i), min(fks, i)))
+        plan.append((table_name(i), cols, [(f"{table_name(p)}_id", table_name(p)) for p in parents]))
+    return plan
+
+def _value(col_type, rng, i):
+    if col_type == "INTEGER":
+        return rng.randrange(1_000_000)
+    if col_type == "REAL":
+        return round(rng.uniform(-1e4, 1e4), 4)
+    if col_type == "NUMERIC":  # dates ISO, l'affinité numérique les garde en texte
+        return f"20{rng.randrange(10, 30)}-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}"
+    if rng.random() < 0.05:
+        return None
+    return f"{rng.choice(_WORDS)} {rng.choice(_WORDS)} {i}"
+
+def generate_database(path, tables=8, columns=6, rows=1000, fks=1, blob_bytes=0, seed=0,
+                      progress=None):
+    """Crée `path` (remplacé s'il existe) : `tables` tables de `rows` lignes,
+    `columns` colonnes typées, jusqu'à `fks` clés étrangères indexées par table
+    et une colonne BLOB de `blob_bytes` octets si non nul.
+    `progress(lignes, total)`. Renvoie (ok, msg, octets du fichier)."""
+    if os.path.exists(path):
+        os.remove(path)
+    rng = random.Random(seed)
+    plan = schema_plan(tables, columns, fks, blob_bytes, rng)
+    total = tables * rows
+    started = time.perf_counter()
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode=OFF;")
+        conn.execute("PRAGMA synchronous=OFF;")
+        done = 0
+        for name, cols, refs in plan:
+            defs = ["id INTEGER PRIMARY KEY"]
+            defs += [f"{c} {t}" for c, t in cols]
+            defs += [f"{c} INTEGER REFERENCES {parent}(id)" for c, parent in refs]
+            conn.execute(f"CREATE TABLE {name} ({', '.join(defs)});")
+            for c, _ in refs:
+                conn.execute(f"CREATE INDEX idx_{name}_{c} ON {name}({c});")
+            names = ["id"] + [c for c, _ in cols] + [c for c, _ in refs]
+            sql = f"INSERT INTO {name} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))});"
+            for start in range(1, rows + 1, _CHUNK):
+                chunk = []
+                for i in range(start, min(start + _CHUNK, rows + 1)):
+                    row = [i]
+                    for _, t in cols:
+                        row.append(rng.randbytes(blob_bytes) if t == "BLOB" else _value(t, rng, i))
+                    row += [rng.randint(1, rows) for _ in refs]
+                    chunk.append(row)
+                conn.executemany(sql, chunk)
+                done += len(chunk)
+                if progress:
+                    progress(done, total)
+            conn.commit()
+        conn.execute("ANALYZE;")
+        conn.commit()
+    except sqlite3.Error as e:
+        return False, str(e), 0
+    finally:
+        conn.close()
+    size = os.path.getsize(path)
+    return (True, f"{tables} table(s), {total:,} ligne(s), {size / 1e6:,.1f} Mo "
+                  f"en {time.perf_counter() - started:.1f}s.", size)
+
+def tier_params(tier, seed=0):
+    return dict(TIERS[tier], seed=seed)
+
+def cached_database(params, cache_dir, label="synth", progress=None):
+    """Chemin d'une base générée avec `params`, créée au premier appel puis
+    réutilisée (nom dérivé des paramètres et de GENERATOR_VERSION)."""
+    key = json.dumps(dict(params, version=GENERATOR_VERSION), sort_keys=True)
+    digest = hashlib.sha1(key.encode()).hexdigest()[:12]
+    path = os.path.join(cache_dir, f"{label}-{digest}.db")
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = path + ".tmp"
+        ok, msg, _ = generate_database(tmp, progress=progress, **params)
+        if not ok:
+            raise sqlite3.Error(msg)
+        os.replace(tmp, path)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m bench.generate",
+                                     description="Génère une base SQLite synthétique.")
+    parser.add_argument("path", help="fichier .db à créer (remplacé s'il existe)")
+    parser.add_argument("--tier", choices=TIERS, help="valeurs par défaut d'un palier")
+    parser.add_argument("--tables", type=int)
+    parser.add_argument("--columns", type=int, help="colonnes par table (hors id et clés étrangères)")
+    parser.add_argument("--rows", type=int, help="lignes par table")
+    parser.add_argument("--fks", type=int, help="clés étrangères par table (au plus)")
+    parser.add_argument("--blob", type=int, dest="blob_bytes", help="octets par BLOB (0 : aucun)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    params = tier_params(args.tier or "small", args.seed)
+    params.update({k: v for k in ("tables", "columns", "rows", "fks", "blob_bytes")
+                   if (v := getattr(args, k)) is not None})
+    ok, msg, _ = generate_database(args.path, **params)
+    print(("" if ok else "✗ ") + msg, file=sys.stderr)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
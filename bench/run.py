@@ -0,0 +1,280 @@
+"""Banc d'essai de la couche base de données, par palier de taille.
+
+    python3 -m bench.run                              # small,medium → bench-<commit>.json
+    python3 -m bench.run --tiers large --repeat 3 -o large.json
+    python3 -m bench.run --only execute_sql,import_csv
+
+Chaque palier travaille sur une copie de sa base synthétique (bench.generate),
+dans un dossier temporaire qui tient aussi lieu de SETTINGS_DIR : réglages et
+historique de l'utilisateur ne sont pas touchés. La préparation (vidage des
+caches, fichiers d'entrée, ...) est faite hors chrono avant chaque mesure."""
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import core
+from bench.generate import TIERS, cached_database, tier_params
+
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "sqlrift-bench")
+DEFAULT_TIERS = ("small", "medium")
+IMPORT_TABLE = "bench_import"
+SPARSE_TABLE = "bench_sparse"
+
+# ═══════════════════════════════════════════════════════════════════════════
+# BANCS
+# ═══════════════════════════════════════════════════════════════════════════
+# Un banc reçoit le contexte du palier, fait sa préparation et renvoie la
+# fonction mesurée. Une fonction qui renvoie (False, msg, ...) fait échouer le banc.
+
+BENCHMARKS = {}
+
+def benchmark(name):
+    def _register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return _register
+
+def _cold():
+    core.SCHEMA_CACHE.clear()
+    core.RESULT_CACHE.clear()
+
+@benchmark("get_tables")
+def bench_get_tables(ctx):
+    _cold()
+    return core.get_tables
+
+@benchmark("get_tables_cached")
+def bench_get_tables_cached(ctx):
+    core.get_tables()
+    return core.get_tables
+
+@benchmark("get_table_info")
+def bench_get_table_info(ctx):
+    """Colonnes de toutes les tables, cache de schéma vide."""
+    _cold()
+    return lambda: [core.get_table_info(t) for t in ctx["tables"]]
+
+@benchmark("get_table_rows")
+def bench_get_table_rows(ctx):
+    _cold()
+    return lambda: core.get_table_rows(ctx["table"], limit=200)
+
+@benchmark("table_window_scroll")
+def bench_table_window_scroll(ctx):
+    """Remontée à la molette depuis 30 % d'une table aux rowid clairsemés (une
+    ligne sur deux supprimée), puis saut en fin de la plus grande table. Une
+    page vide ou un total faux en fin de table fait échouer le banc."""
+    conn, table = core.get_conn(), ctx["table"]
+    conn.execute(f"DROP TABLE IF EXISTS {SPARSE_TABLE};")
+    conn.execute(f"CREATE TABLE {SPARSE_TABLE} AS SELECT * FROM {table};")
+    conn.execute(f"DELETE FROM {SPARSE_TABLE} WHERE (rowid * 2654435761) % 1000 < 500;")
+    conn.commit()
+    rows = conn.execute(f"SELECT count(*) FROM {table};").fetchone()[0]
+    _cold()
+
+    def _scroll(count=40):
+        window = core.TableWindow(SPARSE_TABLE)
+        window.fetch(int(window.total * 0.3), count)
+        for _ in range(window.total):
+            if window.top == 0:
+                break
+            if not window.fetch(window.top - 3, count):
+                return False, f"Page vide en remontant (position {window.top})."
+        window = core.TableWindow(table)
+        window.fetch(10 ** 9, count)
+        if window.total != rows:
+            return False, f"Total en fin de table : {window.total} au lieu de {rows}."
+        return True, ""
+    return _scroll
+
+def _query(ctx):
+    child, parent, fk = ctx["table"], ctx["parent"], ctx["fk"]
+    return (f"SELECT p.id, count(*), sum(c.id) FROM {child} c JOIN {parent} p ON p.id = c.{fk} "
+            f"GROUP BY p.id ORDER BY count(*) DESC LIMIT 100;\n"
+            f"SELECT * FROM {child} WHERE id % 3 = 0;")
+
+def _run_sql(sql, cache):
+    ok, msg, results = core.execute_sql(sql, cache=cache)
+    if ok:
+        for r in results:
+            if r.columns:
+                r.rows.fetch_all()
+    return ok, msg
+
+@benchmark("execute_sql")
+def bench_execute_sql(ctx):
+    """Jointure agrégée puis lecture complète d'un tiers de la plus grande table."""
+    _cold()
+    sql = _query(ctx)
+    return lambda: _run_sql(sql, cache=False)
+
+@benchmark("execute_sql_cached")
+def bench_execute_sql_cached(ctx):
+    sql = _query(ctx)
+    _run_sql(sql, cache=True)
+    return lambda: _run_sql(sql, cache=True)
+
+@benchmark("generate_sql_schema")
+def bench_generate_sql_schema(ctx):
+    _cold()
+    return core.generate_sql_schema
+
+@benchmark("generate_drawio_xml")
+def bench_generate_drawio_xml(ctx):
+    _cold()
+    return core.generate_drawio_xml
+
+@benchmark("export_csv")
+def bench_export_csv(ctx):
+    return lambda: core.export_table(ctx["table"], os.path.join(ctx["workdir"], "export.csv"))
+
+@benchmark("export_jsonl_gz")
+def bench_export_jsonl_gz(ctx):
+    return lambda: core.export_table(ctx["table"], os.path.join(ctx["workdir"], "export.jsonl.gz"))
+
+@benchmark("import_csv")
+def bench_import_csv(ctx):
+    """Réimport de l'export CSV de la plus grande table dans une table neuve."""
+    path = os.path.join(ctx["workdir"], "export.csv")
+    if not os.path.exists(path):
+        core.export_table(ctx["table"], path)
+    core.drop_table(IMPORT_TABLE)
+    return lambda: core.import_csv(path, IMPORT_TABLE)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# MESURE
+# ═══════════════════════════════════════════════════════════════════════════
+
+def measure(bench, ctx, repeat=5, warmup=1):
+    """Temps (ms) de `repeat` exécutions après `warmup` tours non comptés."""
+    runs = []
+    for i in range(warmup + repeat):
+        fn = bench(ctx)
+        gc.collect()
+        started = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - started) * 1000
+        if isinstance(result, tuple) and result and result[0] is False:
+            raise RuntimeError(result[1])
+        if i >= warmup:
+            runs.append(round(elapsed, 4))
+    return {
+        "runs_ms": runs,
+        "min_ms": min(runs),
+        "median_ms": statistics.median(runs),
+        "mean_ms": round(statistics.fmean(runs), 4),
+        "stdev_ms": round(statistics.stdev(runs), 4) if len(runs) > 1 else 0.0,
+    }
+
+def _context(path, workdir):
+    core.load_database(path)
+    tables = core.get_tables()
+    # La dernière table créée a le plus de clés étrangères (graphe acyclique).
+    table = tables[-1]
+    fk, parent, _ = core.get_foreign_keys(table)[0]
+    return {"tables": tables, "table": table, "parent": parent, "fk": fk, "workdir": workdir}
+
+def run_tier(tier, names, repeat=5, warmup=1, seed=0, cache_dir=CACHE_DIR, log=None):
+    """Mesure les bancs `names` sur le palier `tier` ; {"params", "results"}."""
+    params = tier_params(tier, seed)
+    source = cached_database(params, cache_dir, label=tier)
+    workdir = tempfile.mkdtemp(prefix=f"sqlrift_bench_{tier}_")
+    path = os.path.join(workdir, "bench.db")
+    shutil.copyfile(source, path)
+    settings_dir, history_path = core.SETTINGS_DIR, core.QUERY_HISTORY.path
+    core.SETTINGS_DIR = workdir
+    core.QUERY_HISTORY.path = os.path.join(workdir, "history.db")
+    results = {}
+    try:
+        ctx = _context(path, workdir)
+        for name in names:
+            results[name] = measure(BENCHMARKS[name], ctx, repeat, warmup)
+            if log:
+                r = results[name]
+                log(f"{tier:>8}  {name:<22} {r['median_ms']:>11,.2f} ms  (min {r['min_ms']:,.2f}, ±{r['stdev_ms']:,.2f})")
+    finally:
+        while core.WORKSPACE.sessions:
+            core.close_database()
+        core.SETTINGS_DIR, core.QUERY_HISTORY.path = settings_dir, history_path
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {"params": params, "results": results}
+
+def _git(*args):
+    try:
+        out = subprocess.run(["git", *args], capture_output=True, text=True, timeout=10,
+                             cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    except OSError:
+        return None
+    return out.stdout.strip() if out.returncode == 0 else None
+
+def environment():
+    """Commit mesuré et machine : bench.compare avertit si elles diffèrent."""
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m bench.run",
+                                     description="Banc d'essai de core.py, résultats en JSON.")
+    parser.add_argument("--tiers", default=",".join(DEFAULT_TIERS),
+                        help=f"paliers séparés par des virgules parmi {', '.join(TIERS)}")
+    parser.add_argument("--only", help="bancs séparés par des virgules (tous par défaut)")
+    parser.add_argument("--repeat", type=int, default=5, help="mesures par banc (défaut : 5)")
+    parser.add_argument("--warmup", type=int, default=1, help="tours non comptés (défaut : 1)")
+    parser.add_argument("--seed", type=int, default=0, help="graine des bases synthétiques")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="bases synthétiques générées")
+    parser.add_argument("-o", "--output", help="fichier JSON (défaut : bench-<commit>.json, - : stdout)")
+    parser.add_argument("--list", action="store_true", help="liste les bancs et paliers")
+    args = parser.parse_args(argv)
+    if args.list:
+        print("bancs   : " + ", ".join(BENCHMARKS))
+        for tier, params in TIERS.items():
+            print(f"{tier:<8}: " + ", ".join(f"{k}={v}" for k, v in params.items()))
+        return 0
+    tiers = [t for t in args.tiers.split(",") if t]
+    names = [n for n in args.only.split(",") if n] if args.only else list(BENCHMARKS)
+    unknown = [t for t in tiers if t not in TIERS] + [n for n in names if n not in BENCHMARKS]
+    if unknown or args.repeat < 1:
+        parser.error(f"inconnu(s) : {', '.join(unknown)}" if unknown else "--repeat doit être ≥ 1")
+
+    def log(line):
+        print(line, file=sys.stderr)
+    env = environment()
+    report = {"environment": env, "repeat": args.repeat, "warmup": args.warmup, "tiers": {}}
+    try:
+        for tier in tiers:
+            report["tiers"][tier] = run_tier(tier, names, args.repeat, args.warmup, args.seed,
+                                             args.cache_dir, log)
+    except KeyboardInterrupt:
+        return 130
+    output = args.output or f"bench-{(env['commit'] or 'local')[:10]}.json"
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if output == "-":
+        print(text)
+    else:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        log(f"→ {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""SQLRift en ligne de commande : la couche base de données (core.py) sans
+interface graphique, pour les scripts, cron et serveurs sans affichage.
+
+    python3 cli.py query  ma.db "SELECT * FROM t" -o t.csv.gz
+    python3 cli.py schema ma.db -o schema.sql
+    python3 cli.py drawio ma.db -o schema.drawio
+    python3 cli.py export ma.db clients -o clients.jsonl
+    python3 cli.py import ma.db clients.csv --table clients
+    python3 cli.py dump   ma.db -o ma.sql.gz
+    python3 cli.py shards "SELECT count(*) FROM ev" jours/*.db
+
+"-" désigne la sortie standard (ou l'entrée standard pour le SQL)."""
+import argparse
+import os
+import signal
+import sqlite3
+import sys
+import time
+
+import core
+
+
+def _progress(args, unit=""):
+    """Avancement sur stderr (terminal uniquement), au plus 5 fois par seconde."""
+    if args.quiet or not sys.stderr.isatty():
+        return None
+    last = [0.0]
+
+    def _show(done, total=None, *_):
+        now = time.perf_counter()
+        if now - last[0] < 0.2:
+            return
+        last[0] = now
+        pct = f" ({done / total:.0%})" if total else ""
+        sys.stderr.write(f"\r… {done:,}{unit}{pct}   ")
+        sys.stderr.flush()
+    return _show
+
+def _done(args, result):
+    """Affiche le message d'une fonction (ok, msg, ...) et renvoie le code de sortie."""
+    ok, msg = result[0], result[1]
+    if not args.quiet or not ok:
+        if sys.stderr.isatty() and not args.quiet:
+            sys.stderr.write("\r")
+        print(("" if ok else "✗ ") + msg, file=sys.stderr)
+    return 0 if ok else 1
+
+def _open(args, must_exist=True, read_only=False):
+    """Ouvre la base. En lecture seule (mode=ro), le fichier reste intact : ni
+    profil par défaut ni passage en WAL, seuls les réglages de connexion
+    d'un --profile explicite s'appliquent."""
+    if must_exist and not os.path.exists(args.db):
+        print(f"✗ {args.db} : fichier introuvable.", file=sys.stderr)
+        return False
+    core.load_database(args.db, args.profile, read_only=read_only)
+    return True
+
+def _format(args):
+    """Format demandé, sinon d'après l'extension ; TSV sur la sortie standard."""
+    if args.format:
+        return args.format
+    return core.export_format(args.output) if args.output != "-" else "tsv"
+
+def _read_sql(text):
+    if text == "-":
+        return sys.stdin.read()
+    if text.startswith("@"):
+        with open(text[1:], encoding="utf-8") as f:
+            return f.read()
+    return text
+
+# ─── Commandes ────────────────────────────────────────────────────────────
+def cmd_query(args):
+    sql = _read_sql(args.sql)
+    if not _open(args, must_exist=False,
+                 read_only=os.path.exists(args.db) and core.is_read_only_sql(sql)):
+        return 1
+    ok, msg, results = core.execute_sql(sql, batch=args.batch, cache=False, history=args.history)
+    if not ok:
+        return _done(args, (ok, msg))
+    grids = [r for r in results if r.columns]
+    if args.output != "-":
+        grids = grids[-1:]  # dans un fichier : le dernier résultat du script
+    for i, r in enumerate(grids):
+        if i:
+            sys.stdout.write("\n")
+        written = core.write_rows(args.output, r.columns, r.rows, fmt=_format(args),
+                                  progress=_progress(args, " ligne(s)"))
+        if not written[0]:
+            return _done(args, written)
+    return _done(args, (ok, msg))
+
+def cmd_schema(args):
+    if not _open(args, read_only=True):
+        return 1
+    with core.open_text(args.output, "w") as f:
+        f.write(core.generate_sql_schema() + "\n")
+    return 0
+
+def cmd_drawio(args):
+    if not _open(args, read_only=True):
+        return 1
+    return _done(args, core.write_drawio(args.output, args.layout, progress=_progress(args, " table(s)")))
+
+def cmd_export(args):
+    if not _open(args, read_only=True):
+        return 1
+    if args.table not in core.get_tables():
+        return _done(args, (False, f"Table « {args.table} » introuvable."))
+    return _done(args, core.export_table(args.table, args.output, fmt=args.format,
+                                         progress=_progress(args, " ligne(s)")))
+
+def cmd_import(args):
+    if not _open(args, must_exist=False):
+        return 1
+    table = args.table or os.path.splitext(os.path.basename(args.csv))[0]
+    return _done(args, core.import_csv(args.csv, table, delimiter=args.delimiter,
+                                       encoding=args.encoding, header=not args.no_header,
+                                       progress=_progress(args, " ligne(s)")))
+
+def cmd_dump(args):
+    if not _open(args, read_only=True):
+        return 1
+    return _done(args, core.dump_database(args.output, progress=_progress(args, " ligne(s)")))
+
+def cmd_restore(args):
+    if not _open(args, must_exist=False):
+        return 1
+    return _done(args, core.restore_database(args.file, progress=_progress(args, " instruction(s)")))
+
+def cmd_backup(args):
+    if not _open(args, read_only=True):
+        return 1
+    return _done(args, core.backup_database(args.file, progress=_progress(args, " octet(s)")))
+
+def cmd_shards(args):
+    ok, msg, results = core.shard_query(args.files, _read_sql(args.sql), workers=args.workers,
+                                        progress=_progress(args, " ligne(s)"), history=args.history)
+    if not ok:
+        return _done(args, (ok, msg))
+    r = results[0]
+    written = core.write_rows(args.output, r.columns, r.rows, fmt=_format(args))
+    return _done(args, (ok, msg) if written[0] else written)
+
+# ─── Analyse des arguments ────────────────────────────────────────────────
+def build_parser():
+    parser = argparse.ArgumentParser(prog="sqlrift", description="SQLRift sans interface graphique.")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-q", "--quiet", action="store_true", help="ni avancement ni message final")
+    common.add_argument("--profile", choices=list(core.PRAGMA_PROFILES),
+                        help="profil PRAGMA (par défaut : celui mémorisé pour le fichier ; "
+                             "en lecture seule, aucun)")
+    formats = ["csv", "tsv", "jsonl"]
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("query", parents=[common], help="exécute un script SQL, résultats en TSV/CSV/JSONL")
+    p.add_argument("db")
+    p.add_argument("sql", help='SQL, @fichier.sql, ou "-" pour stdin')
+    p.add_argument("-o", "--output", default="-", help="fichier de sortie (.csv, .tsv, .jsonl, +.gz/.xz)")
+    p.add_argument("-f", "--format", choices=formats)
+    p.add_argument("--batch", action="store_true", help="tout le script dans une transaction")
+    p.add_argument("--history", action="store_true", help="ajoute le script à l'historique (~/.sqlrift)")
+    p.set_defaults(func=cmd_query)
+
+    p = sub.add_parser("schema", parents=[common], help="schéma SQL (tables, index, vues, triggers)")
+    p.add_argument("db")
+    p.add_argument("-o", "--output", default="-")
+    p.set_defaults(func=cmd_schema)
+
+    p = sub.add_parser("drawio", parents=[common], help="diagramme .drawio du schéma")
+    p.add_argument("db")
+    p.add_argument("-o", "--output", default="-")
+    p.add_argument("--layout", choices=["auto", "layered", "force"], default="auto")
+    p.set_defaults(func=cmd_drawio)
+
+    p = sub.add_parser("export", parents=[common], help="exporte une table")
+    p.add_argument("db")
+    p.add_argument("table")
+    p.add_argument("-o", "--output", required=True)
+    p.add_argument("-f", "--format", choices=formats)
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("import", parents=[common], help="importe un CSV dans une table")
+    p.add_argument("db")
+    p.add_argument("csv")
+    p.add_argument("--table", help="table cible (par défaut : nom du fichier)")
+    p.add_argument("--delimiter", help="séparateur (détecté par défaut)")
+    p.add_argument("--encoding", default="utf-8-sig")
+    p.add_argument("--no-header", action="store_true")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("dump", parents=[common], help="dump SQL complet (.sql, .sql.gz, .sql.xz)")
+    p.add_argument("db")
+    p.add_argument("-o", "--output", default="-")
+    p.set_defaults(func=cmd_dump)
+
+    p = sub.add_parser("restore", parents=[common], help="rejoue un dump SQL dans la base")
+    p.add_argument("db")
+    p.add_argument("file")
+    p.set_defaults(func=cmd_restore)
+
+    p = sub.add_parser("backup", parents=[common], help="sauvegarde à chaud vers un autre fichier")
+    p.add_argument("db")
+    p.add_argument("file")
+    p.set_defaults(func=cmd_backup)
+
+    p = sub.add_parser("shards", parents=[common], help="un SELECT sur plusieurs fichiers, résultats fusionnés")
+    p.add_argument("sql", help='SQL, @fichier.sql, ou "-" pour stdin')
+    p.add_argument("files", nargs="+")
+    p.add_argument("-o", "--output", default="-")
+    p.add_argument("-f", "--format", choices=formats)
+    p.add_argument("--workers", type=int, default=core.SHARD_WORKERS)
+    p.add_argument("--history", action="store_true", help="ajoute la requête à l'historique (~/.sqlrift)")
+    p.set_defaults(func=cmd_shards)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if hasattr(signal, "SIGPIPE"):
+        # Sortie coupée (| head) : arrêt silencieux, comme les outils Unix.
+        signal.signal(signal.SIGPIPE, signal.SIG_DFL)
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        return 130
+    except (OSError, sqlite3.Error) as e:
+        return _done(args, (False, str(e)))
+    finally:
+        while core.WORKSPACE.sessions:
+            core.close_database()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3041 @@
+"""SQLRift — couche base de données, sans dépendance graphique.
+
+Importable seule (scripts, cron, serveur sans affichage) : l'interface
+(main.py) et la ligne de commande (cli.py) s'appuient dessus."""
+import sqlite3
+import csv
+import heapq
+import io
+import itertools
+import math
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+
+np = None  # numpy (optionnel), importé à la première mise en page par forces
+
+def _numpy():
+    """numpy si disponible ; sans lui, la mise en page par forces est indisponible."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return None
+        np = numpy
+    return np
+
+# ─── ÉTAT GLOBAL ──────────────────────────────────────────────────────────
+# Base active de l'espace de travail (WORKSPACE) : ces variables sont mises à
+# jour à chaque changement de base, les autres restent ouvertes.
+current_db_path = None
+current_conn = None
+current_pool = None
+selected_table = None
+
+# Mémoire max d'un résultat de requête avant débordement sur disque (octets)
+RESULT_MEMORY_BUDGET = 64 * 1024 * 1024
+# Threads de lecture parallèles (une connexion WAL lecture seule chacun)
+READ_THREADS = 4
+# Réglages persistants (profil PRAGMA par fichier, ...)
+SETTINGS_DIR = os.path.join(os.path.expanduser("~"), ".sqlrift")
+
+# ─── PROFILS PRAGMA ───────────────────────────────────────────────────────
+PRAGMA_PROFILES = {
+    "interactive browse": {
+        "journal_mode": "WAL", "synchronous": "NORMAL", "cache_size": -65536,
+        "mmap_size": 256 * 1024 * 1024, "temp_store": "MEMORY", "busy_timeout": 5000,
+        "query_only": "OFF",
+    },
+    "read-only analytics": {
+        "journal_mode": "WAL", "synchronous": "NORMAL", "cache_size": -262144,
+        "mmap_size": 1024 * 1024 * 1024, "temp_store": "MEMORY", "busy_timeout": 30000,
+        "query_only": "ON",
+    },
+    "bulk load": {
+        "journal_mode": "MEMORY", "synchronous": "OFF", "cache_size": -262144,
+        "mmap_size": 0, "temp_store": "MEMORY", "busy_timeout": 30000,
+        "query_only": "OFF",
+    },
+    "safe": {
+        "journal_mode": "DELETE", "synchronous": "FULL", "cache_size": -2000,
+        "mmap_size": 0, "temp_store": "DEFAULT", "busy_timeout": 5000,
+        "query_only": "OFF",
+    },
+}
+DEFAULT_PROFILE = "interactive browse"
+# PRAGMA propres à chaque connexion, appliqués aussi aux lecteurs
+_CONNECTION_PRAGMAS = ("busy_timeout", "cache_size", "mmap_size", "temp_store")
+
+# ═══════════════════════════════════════════════════════════════════════════
+# DATABASE FUNCTIONS
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _quote_ident(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+class SchemaCache:
+    """Cache de réflexion (tables, colonnes, index, clés étrangères).
+    Invalidé uniquement quand PRAGMA schema_version change : une lecture d'en-tête
+    par appel au lieu de requêtes sqlite_master / PRAGMA table_info répétées."""
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._version = None
+        self._data = {}
+
+    def get(self, key, loader):
+        with self._lock:
+            version = _read_conn().execute("PRAGMA schema_version;").fetchone()[0]
+            if version != self._version:
+                self._version = version
+                self._data = {}
+            if key not in self._data:
+                self._data[key] = loader()
+            return self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._version = None
+            self._data = {}
+
+
+SCHEMA_CACHE = SchemaCache()
+
+
+_connection_serials = itertools.count()
+
+class ConnectionManager:
+    """Une connexion d'écriture + des connexions en lecture seule (URI mode=ro),
+    prêtées par acquire() / release() : une tâche de lecture ou un flux de
+    résultat garde la sienne tant qu'il en a besoin, puis la rend (jusqu'à
+    `readers` restent ouvertes en attente). Les profils en WAL permettent aux
+    lectures (navigation, exports, requêtes longues) de ne pas bloquer les
+    écritures, et inversement. Sans WAL (profil "safe", :memory:...), tout
+    passe par l'écrivain.
+
+    `read_only` : l'« écrivain » lui-même est ouvert en mode=ro et le fichier
+    n'est jamais modifié, pas même son journal_mode ; sans `profile`, aucun
+    PRAGMA n'est appliqué."""
+    def __init__(self, path, profile=DEFAULT_PROFILE, readers=READ_THREADS + 2, read_only=False):
+        self.path = path
+        self.max_readers = readers
+        self.read_only = read_only
+        if read_only:
+            self.writer = sqlite3.connect(self._ro_uri(path), uri=True, check_same_thread=False)
+        else:
+            self.writer = sqlite3.connect(path, check_same_thread=False)
+        self.writer.row_factory = sqlite3.Row
+        self.wal = False
+        self._idle = queue.LifoQueue()
+        self._readers = []
+        self._retired = set()  # prêtées pendant une fermeture : fermées à leur retour
+        self._lock = threading.Lock()
+        self._serials = {self.writer: next(_connection_serials)}  # connexion → n° unique
+        self.attached = {}     # alias → fichier des bases attachées (ATTACH)
+        self.private = False   # base attachée en mémoire : invisible des lecteurs
+        self.profile = None
+        if profile:
+            self.apply_profile(profile)
+        else:
+            self.wal = self.writer.execute("PRAGMA journal_mode;").fetchone()[0].lower() == "wal"
+
+    def apply_profile(self, name):
+        """Applique un profil de PRAGMA_PROFILES ; renvoie les valeurs effectives.
+        En lecture seule, seuls les réglages propres à la connexion s'appliquent."""
+        profile = PRAGMA_PROFILES[name]
+        applied = {}
+        mode = self.writer.execute("PRAGMA journal_mode;").fetchone()[0]
+        if self.read_only:
+            profile = {pragma: profile[pragma] for pragma in _CONNECTION_PRAGMAS}
+        elif mode.lower() != profile["journal_mode"].lower():
+            # Quitter le WAL exige qu'aucune autre connexion ne soit ouverte.
+            self._close_readers()
+        for pragma, value in profile.items():
+            if pragma == "journal_mode" and self.path == ":memory:":
+                continue
+            try:
+                row = self.writer.execute(f"PRAGMA {pragma}={value};").fetchone()
+                applied[pragma] = row[0] if row else value
+            except sqlite3.DatabaseError as e:
+                applied[pragma] = f"✗ {e}"
+        self.wal = self.writer.execute("PRAGMA journal_mode;").fetchone()[0].lower() == "wal"
+        with self._lock:
+            self.profile = name
+            for conn in self._readers:
+                self._apply_connection_pragmas(conn)
+        return applied
+
+    def _apply_connection_pragmas(self, conn):
+        if not self.profile:
+            return
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(f"PRAGMA {pragma}={PRAGMA_PROFILES[self.profile][pragma]};")
+
+    @staticmethod
+    def _ro_uri(path):
+        return "file:" + urllib.parse.quote(os.path.abspath(path)) + "?mode=ro"
+
+    def _open_reader(self):
+        conn = sqlite3.connect(self._ro_uri(self.path), uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        self._serials[conn] = next(_connection_serials)
+        self._apply_connection_pragmas(conn)
+        for alias, path in self.attached.items():
+            conn.execute(f"ATTACH DATABASE ? AS {_quote_ident(alias)};", (self._ro_uri(path),))
+        return conn
+
+    def sync_attached(self):
+        """Relit les bases attachées à l'écrivain (après ATTACH / DETACH) ; les
+        lecteurs sont rouverts avec les mêmes attachements."""
+        attached = {row[1]: row[2] for row in self.writer.execute("PRAGMA database_list;")
+                    if row[1] not in ("main", "temp")}
+        self.private = not all(attached.values())
+        attached = {alias: path for alias, path in attached.items() if path}
+        if attached != self.attached:
+            self.attached = attached
+            self._close_readers()
+
+    @property
+    def pooled(self):
+        """Les lectures ont leurs propres connexions (sinon : l'écrivain)."""
+        return self.wal and not self.private
+
+    def acquire(self):
+        """Prête une connexion de lecture, à rendre par release(). Jamais
+        bloquant : au-delà des connexions en attente, on en ouvre une de plus."""
+        if not self.pooled:
+            return self.writer
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            conn = self._open_reader()
+            self._readers.append(conn)
+            return conn
+
+    def release(self, conn):
+        """Rend une connexion prêtée ; sa transaction de lecture (instantané) se
+        termine ici, la prochaine tâche voit donc les dernières écritures."""
+        if conn is self.writer:
+            return
+        with self._lock:
+            keep = (conn in self._readers and conn not in self._retired
+                    and self._idle.qsize() < self.max_readers)
+            if not keep:
+                self._retired.discard(conn)
+                self._serials.pop(conn, None)
+                if conn in self._readers:
+                    self._readers.remove(conn)
+        if not keep:
+            conn.close()
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def reader(self):
+        """Prête une connexion lecture seule le temps d'un bloc `with`."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def data_version(self, conn):
+        """Version des données vue par `conn`, à lire dans la transaction de la
+        requête dont on veut mettre le résultat en cache : (n° de connexion,
+        data_version, schema_version, data_version des bases attachées...).
+        data_version est propre à chaque connexion (il change quand une autre
+        connexion valide une écriture) : la clé contient donc la connexion, et,
+        pour l'écrivain, total_changes qui compte ses propres écritures."""
+        schema = conn.execute("PRAGMA schema_version;").fetchone()[0]  # ouvre l'instantané
+        return (self._serials[conn], conn.execute("PRAGMA data_version;").fetchone()[0], schema,
+                *(conn.execute(f"PRAGMA {_quote_ident(alias)}.data_version;").fetchone()[0]
+                  for alias in self.attached),
+                conn.total_changes if conn is self.writer else 0)
+
+    def interrupt(self):
+        for conn in [self.writer, *self._readers]:
+            conn.interrupt()
+
+    def _close_readers(self, force=False):
+        """Ferme les lecteurs en attente ; ceux qui sont prêtés (flux, tâche en
+        cours) seront fermés à leur retour, sauf `force` (fermeture de la base)."""
+        with self._lock:
+            idle = []
+            while not self._idle.empty():
+                idle.append(self._idle.get_nowait())
+            busy = [conn for conn in self._readers if conn not in idle]
+            for conn in idle + (busy if force else []):
+                conn.close()
+                self._serials.pop(conn, None)
+            self._readers = [] if force else busy
+            self._retired = set() if force else self._retired | set(busy)
+
+    def close(self):
+        self._close_readers(force=True)
+        self.writer.close()
+
+
+_thread_state = threading.local()
+
+def _read_conn():
+    """Connexion à utiliser pour lire : dans une tâche de lecture de DBExecutor,
+    un lecteur WAL prêté pour la durée de la tâche ; ailleurs l'écrivain."""
+    if current_pool is not None and getattr(_thread_state, "reader", False):
+        leases = _thread_state.leases
+        if current_pool not in leases:
+            leases[current_pool] = current_pool.acquire()
+        return leases[current_pool]
+    return current_conn
+
+def _reading_thread():
+    """Vrai dans une tâche de lecture, sur une base à lecteurs séparés."""
+    return current_pool is not None and current_pool.pooled and getattr(_thread_state, "reader", False)
+
+def _sharing_writer():
+    """Vrai dans une tâche de lecture quand _read_conn() est l'écrivain (pas de
+    WAL) : une transaction ouverte ici croiserait celles du thread d'écriture."""
+    return current_pool is not None and not current_pool.pooled and getattr(_thread_state, "reader", False)
+
+def _settings_path():
+    return os.path.join(SETTINGS_DIR, "settings.json")
+
+def load_settings():
+    try:
+        with open(_settings_path(), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_settings(settings):
+    os.makedirs(SETTINGS_DIR, exist_ok=True)
+    with open(_settings_path(), "w", encoding="utf-8") as f:
+        json.dump(settings, f, indent=2)
+
+def get_file_profile(path):
+    """Profil PRAGMA mémorisé pour ce fichier (None si aucun)."""
+    name = load_settings().get("profiles", {}).get(os.path.abspath(path))
+    return name if name in PRAGMA_PROFILES else None
+
+def get_conn():
+    return current_conn
+
+def get_profile():
+    return current_pool.profile if current_pool else None
+
+def set_profile(name):
+    """Change le profil de la base ouverte et le mémorise pour ce fichier."""
+    if not current_pool:
+        return False, "Aucune base de données ouverte."
+    applied = current_pool.apply_profile(name)
+    if current_db_path != ":memory:":
+        settings = load_settings()
+        settings.setdefault("profiles", {})[os.path.abspath(current_db_path)] = name
+        save_settings(settings)
+    errors = [f"{k}: {v}" for k, v in applied.items() if str(v).startswith("✗")]
+    if errors:
+        return False, "Profil partiellement appliqué — " + ", ".join(errors)
+    return True, f"Profil « {name} » appliqué."
+
+class DatabaseSession:
+    """Une base ouverte de l'espace de travail : ses connexions, son cache de
+    schéma et la table sélectionnée, conservés quand une autre base est active."""
+    def __init__(self, path, profile, read_only=False):
+        self.path = path
+        self.pool = ConnectionManager(path, profile, read_only=read_only)
+        self.schema_cache = SchemaCache()
+        self.selected_table = None
+
+
+class Workspace:
+    """Bases ouvertes simultanément. Changer de base active ne ferme rien :
+    les variables globales (current_conn, SCHEMA_CACHE, ...) pointent
+    simplement sur une autre session."""
+    def __init__(self):
+        self.sessions = OrderedDict()  # chemin absolu (ou ":memory:") → DatabaseSession
+        self.active = None
+
+    @staticmethod
+    def key(path):
+        return path if path == ":memory:" else os.path.abspath(path)
+
+    def __contains__(self, path):
+        return self.key(path) in self.sessions
+
+    def labels(self):
+        """{libellé unique : clé}, le nom du fichier suffit sauf homonymes."""
+        names = [os.path.basename(k) for k in self.sessions]
+        return {(name if names.count(name) == 1 else
+                 os.path.join(os.path.basename(os.path.dirname(k)), name)): k
+                for name, k in zip(names, self.sessions)}
+
+    def open(self, path, profile=None, read_only=False):
+        key = self.key(path)
+        session = self.sessions.get(key)
+        if session is None:
+            if not read_only:
+                profile = profile or get_file_profile(path) or DEFAULT_PROFILE
+            session = self.sessions[key] = DatabaseSession(path, profile, read_only)
+        elif profile and profile != session.pool.profile:
+            session.pool.apply_profile(profile)
+        return self.activate(key)
+
+    def activate(self, key):
+        global current_db_path, current_conn, current_pool, selected_table, SCHEMA_CACHE
+        if self.active is not None:
+            self.active.selected_table = selected_table
+        session = self.active = self.sessions[key]
+        current_db_path, current_pool = session.path, session.pool
+        current_conn = session.pool.writer
+        selected_table = session.selected_table
+        SCHEMA_CACHE = session.schema_cache
+        return session
+
+    def close(self, key):
+        global current_db_path, current_conn, current_pool, selected_table, SCHEMA_CACHE
+        session = self.sessions.pop(key)
+        session.pool.close()
+        if session is self.active:
+            self.active = None
+            if self.sessions:
+                return self.activate(next(reversed(self.sessions)))
+            current_db_path = current_conn = current_pool = selected_table = None
+            SCHEMA_CACHE = SchemaCache()
+        return self.active
+
+
+WORKSPACE = Workspace()
+
+def load_database(path, profile=None, read_only=False):
+    """Ouvre `path` dans l'espace de travail (ou y revient s'il est déjà ouvert)
+    et en fait la base active ; `profile`, sinon le profil mémorisé pour ce fichier.
+    `read_only` : ouverture en mode=ro, sans autre profil que `profile`."""
+    WORKSPACE.open(path, profile, read_only)
+    return current_conn
+
+def switch_database(key):
+    """Rend active une base déjà ouverte : connexions et caches restent chauds."""
+    return WORKSPACE.activate(key)
+
+def close_database(key=None):
+    """Ferme une base de l'espace de travail (la base active par défaut)."""
+    if not WORKSPACE.sessions:
+        return False, "Aucune base de données ouverte."
+    key = key or WORKSPACE.key(current_db_path)
+    WORKSPACE.close(key)
+    return True, f"{os.path.basename(key)} fermée."
+
+def attach_database(path, alias=None):
+    """ATTACH `path` à la base active sous `alias` (nom du fichier par défaut),
+    pour les requêtes croisées : SELECT ... FROM alias.table."""
+    if not current_pool:
+        return False, "Aucune base de données ouverte.", None
+    alias = alias or re.sub(r"\W", "_", os.path.splitext(os.path.basename(path))[0]) or "db"
+    try:
+        current_conn.execute(f"ATTACH DATABASE ? AS {_quote_ident(alias)};", (path,))
+    except sqlite3.Error as e:
+        return False, str(e), None
+    current_pool.sync_attached()
+    return True, f"{os.path.basename(path)} attachée sous « {alias} ».", alias
+
+def detach_database(alias):
+    if not current_pool:
+        return False, "Aucune base de données ouverte."
+    try:
+        current_conn.execute(f"DETACH DATABASE {_quote_ident(alias)};")
+    except sqlite3.Error as e:
+        return False, str(e)
+    current_pool.sync_attached()
+    return True, f"« {alias} » détachée."
+
+def get_tables():
+    if not current_conn:
+        return []
+    def _load():
+        cur = _read_conn().cursor()
+        cur.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name;")
+        return [r[0] for r in cur.fetchall()]
+    return SCHEMA_CACHE.get(("tables",), _load)
+
+def get_table_info(table_name):
+    if not current_conn:
+        return []
+    def _load():
+        cur = _read_conn().cursor()
+        cur.execute(f"PRAGMA table_info('{table_name}');")
+        return cur.fetchall()
+    return SCHEMA_CACHE.get(("columns", table_name), _load)
+
+def get_indexes(table_name):
+    """[(nom, unique, [colonnes], partiel)] des index de la table."""
+    if not current_conn:
+        return []
+    def _load():
+        conn = _read_conn()
+        out = []
+        for idx in conn.execute(f"PRAGMA index_list({_quote_ident(table_name)});").fetchall():
+            cols = [r[2] for r in conn.execute(f"PRAGMA index_info({_quote_ident(idx[1])});")]
+            out.append((idx[1], bool(idx[2]), cols, bool(idx[4])))
+        return out
+    return SCHEMA_CACHE.get(("indexes", table_name), _load)
+
+def get_foreign_keys(table_name):
+    """[(colonne, table cible, colonne cible)] des clés étrangères de la table."""
+    if not current_conn:
+        return []
+    def _load():
+        rows = _read_conn().execute(f"PRAGMA foreign_key_list({_quote_ident(table_name)});").fetchall()
+        return [(r[3], r[2], r[4]) for r in rows]
+    return SCHEMA_CACHE.get(("foreign_keys", table_name), _load)
+
+def get_table_rows(table_name, limit=200):
+    if not current_conn:
+        return [], []
+    cur = _read_conn().cursor()
+    info = get_table_info(table_name)
+    columns = [col[1] for col in info]
+    cur.execute(f"SELECT * FROM '{table_name}' LIMIT {limit};")
+    rows = cur.fetchall()
+    return columns, [list(r) for r in rows]
+
+def get_row_key(table_name):
+    """Colonnes de la clé de pagination : rowid, ou la PK des tables WITHOUT ROWID."""
+    if not current_conn:
+        return []
+    def _load():
+        try:
+            _read_conn().execute(f"SELECT rowid FROM {_quote_ident(table_name)} LIMIT 0;")
+            return ["rowid"]
+        except sqlite3.OperationalError:
+            pk = sorted((col[5], col[1]) for col in get_table_info(table_name) if col[5])
+            return [name for _, name in pk]
+    return SCHEMA_CACHE.get(("row_key", table_name), _load)
+
+def _key_cols(key):
+    return [k if k == "rowid" else _quote_ident(k) for k in key]
+
+def estimate_table_rows(table_name):
+    """Nombre de lignes : estimé via min/max(rowid) (O(log n)), exact sinon."""
+    if not current_conn:
+        return 0
+    conn = _read_conn()
+    t = _quote_ident(table_name)
+    if get_row_key(table_name) == ["rowid"]:
+        lo, hi = conn.execute(f"SELECT min(rowid), max(rowid) FROM {t};").fetchone()
+        return 0 if lo is None else hi - lo + 1
+    return conn.execute(f"SELECT COUNT(*) FROM {t};").fetchone()[0]
+
+def get_table_page(table_name, after=None, before=None, limit=200):
+    """Page de lignes triées par clé, sans OFFSET (pagination keyset).
+    `after` / `before` sont des tuples de clé exclus ; renvoie [(clé, valeurs), ...]."""
+    if not current_conn:
+        return []
+    key = get_row_key(table_name)
+    if not key:
+        return []
+    cols = _key_cols(key)
+    k = ", ".join(cols)
+    marks = ", ".join("?" for _ in key)
+    sql = f"SELECT {k}, * FROM {_quote_ident(table_name)}"
+    params = []
+    if after is not None:
+        sql += f" WHERE ({k}) > ({marks})"
+        params = list(after)
+    elif before is not None:
+        sql += f" WHERE ({k}) < ({marks})"
+        params = list(before)
+    desc = " DESC" if before is not None else ""
+    sql += " ORDER BY " + ", ".join(f"{c}{desc}" for c in cols) + f" LIMIT {int(limit)};"
+    n = len(key)
+    page = [(tuple(r[:n]), list(r[n:])) for r in _read_conn().execute(sql, params)]
+    if before is not None:
+        page.reverse()
+    return page
+
+def seek_table_key(table_name, fraction):
+    """Clé `after` approchant la position `fraction` (0..1) de la table.
+    rowid : interpolation entre min et max (coût constant) ; PK : OFFSET sur l'index."""
+    if not current_conn or fraction <= 0:
+        return None
+    conn = _read_conn()
+    key = get_row_key(table_name)
+    t = _quote_ident(table_name)
+    if key == ["rowid"]:
+        lo, hi = conn.execute(f"SELECT min(rowid), max(rowid) FROM {t};").fetchone()
+        if lo is None:
+            return None
+        # Position p ↔ rowid lo + p : la clé `after` est celle de la ligne p - 1.
+        return (lo + int((hi - lo + 1) * min(fraction, 1.0)) - 1,)
+    k = ", ".join(_key_cols(key))
+    offset = int(estimate_table_rows(table_name) * min(fraction, 1.0)) - 1
+    if offset < 0:
+        return None
+    row = conn.execute(f"SELECT {k} FROM {t} ORDER BY {k} LIMIT 1 OFFSET {offset};").fetchone()
+    return tuple(row) if row else None
+
+
+class TableWindow:
+    """Fenêtre glissante sur une table : garde uniquement les lignes visibles
+    plus une marge, et se déplace par pagination keyset.
+    Les positions sont estimées (interpolation) après un saut de la scrollbar."""
+
+    def __init__(self, table_name, margin=100):
+        self.table_name = table_name
+        self.columns = [col[1] for col in get_table_info(table_name)]
+        self.margin = margin
+        self.total = estimate_table_rows(table_name)
+        self.top = 0
+        self._start = 0
+        self._keys = []
+        self._rows = []
+
+    def _set(self, start, page):
+        self._start = start
+        self._keys = [k for k, _ in page]
+        self._rows = [v for _, v in page]
+
+    def _extend_forward(self, need):
+        after = self._keys[-1] if self._keys else None
+        page = get_table_page(self.table_name, after=after, limit=need)
+        self._keys += [k for k, _ in page]
+        self._rows += [v for _, v in page]
+        if len(page) < need:
+            self.total = self._start + len(self._rows)
+
+    def _extend_backward(self, need):
+        """Renvoie le décalage appliqué aux positions (non nul au début de table)."""
+        page = get_table_page(self.table_name, before=self._keys[0], limit=need)
+        self._keys[:0] = [k for k, _ in page]
+        self._rows[:0] = [v for _, v in page]
+        self._start -= len(page)
+        if len(page) < need or self._start < 0:
+            # Début de table atteint : toutes les positions estimées (buffer, top,
+            # total) sont recalées du même écart.
+            shift, self._start = -self._start, 0
+            self.total += shift
+            return shift
+        return 0
+
+    def fetch(self, top, count):
+        """Lignes [top, top + count) ; ne lit en base que ce qui manque au buffer."""
+        at_end = top >= self.total - count
+        top = max(0, min(top, max(0, self.total - count)))
+        end = self._start + len(self._rows)
+        if not self._rows or top + count < self._start - self.margin or top > end + self.margin:
+            # Saut : repositionnement direct par clé, sans parcourir les lignes sautées.
+            after = seek_table_key(self.table_name, top / self.total) if self.total else None
+            self._set(top, get_table_page(self.table_name, after=after, limit=count + self.margin))
+            if len(self._rows) < count + self.margin:
+                self.total = self._start + len(self._rows)
+        if top + count > self._start + len(self._rows) and self._start + len(self._rows) < self.total:
+            self._extend_forward(top + count + self.margin - self._start - len(self._rows))
+        top = max(0, self.total - count) if at_end else max(0, min(top, max(0, self.total - count)))
+        if top < self._start and self._keys:
+            top += self._extend_backward(self._start - top + self.margin)
+            top = max(top, self._start)
+        # Élagage : le buffer reste borné à count + 2 * margin lignes, sans
+        # jamais retirer les lignes de la page demandée.
+        lo = max(0, min(top - self.margin - self._start, len(self._rows) - count))
+        hi = top + count + self.margin - self._start
+        self._keys, self._rows = self._keys[lo:hi], self._rows[lo:hi]
+        self._start += lo
+        i = top - self._start
+        self.top = top
+        return self._rows[i:i + count]
+
+def create_table(name, columns):
+    """columns: list of (col_name, col_type, primary_key, not_null, default)"""
+    if not current_conn:
+        return False, "Aucune base de données ouverte."
+    col_defs = []
+    for col_name, col_type, pk, nn, default in columns:
+        d = f'"{col_name}" {col_type}'
+        if pk:
+            d += " PRIMARY KEY"
+        if nn:
+            d += " NOT NULL"
+        if default.strip():
+            d += f" DEFAULT {default.strip()}"
+        col_defs.append(d)
+    sql = f'CREATE TABLE IF NOT EXISTS "{name}" ({", ".join(col_defs)});'
+    try:
+        current_conn.execute(sql)
+        current_conn.commit()
+        return True, sql
+    except Exception as e:
+        return False, str(e)
+
+def drop_table(name):
+    if not current_conn:
+        return False, "Aucune base de données ouverte."
+    try:
+        current_conn.execute(f'DROP TABLE IF EXISTS "{name}";')
+        current_conn.commit()
+        return True, f'Table "{name}" supprimée.'
+    except Exception as e:
+        return False, str(e)
+
+def insert_row(table_name, values_dict):
+    if not current_conn:
+        return False, "Aucune base de données ouverte."
+    cols = ", ".join(f'"{k}"' for k in values_dict)
+    placeholders = ", ".join("?" for _ in values_dict)
+    sql = f'INSERT INTO "{table_name}" ({cols}) VALUES ({placeholders});'
+    try:
+        current_conn.execute(sql, list(values_dict.values()))
+        current_conn.commit()
+        return True, "Ligne insérée."
+    except Exception as e:
+        return False, str(e)
+
+def _affinity(col_type):
+    """Affinité SQLite d'un type déclaré (règles de la doc « Datatypes »)."""
+    t = (col_type or "").upper()
+    if "INT" in t:
+        return "INTEGER"
+    if any(k in t for k in ("CHAR", "CLOB", "TEXT")):
+        return "TEXT"
+    if not t or "BLOB" in t:
+        return "BLOB"
+    if any(k in t for k in ("REAL", "FLOA", "DOUB")):
+        return "REAL"
+    return "NUMERIC"
+
+_BOOLEANS = {"1": 1, "0": 0, "true": 1, "false": 0, "vrai": 1, "faux": 0,
+             "yes": 1, "no": 0, "oui": 1, "non": 0}
+
+def coerce_value(text, col_type):
+    """Convertit une saisie texte pour une colonne ; lève ValueError si invalide.
+    Une saisie vide donne NULL."""
+    if text is None or text == "":
+        return None
+    affinity = _affinity(col_type)
+    if "BOOL" in (col_type or "").upper():
+        try:
+            return _BOOLEANS[text.strip().lower()]
+        except KeyError:
+            raise ValueError(f"booléen attendu, reçu {text!r}")
+    if affinity == "INTEGER":
+        try:
+            return int(text)
+        except ValueError:
+            raise ValueError(f"entier attendu, reçu {text!r}")
+    if affinity == "REAL":
+        try:
+            return float(text)
+        except ValueError:
+            raise ValueError(f"réel attendu, reçu {text!r}")
+    if affinity == "NUMERIC":
+        for conv in (int, float):
+            try:
+                return conv(text)
+            except ValueError:
+                pass
+    return text
+
+def insert_rows(table_name, columns, rows, progress=None, chunk_size=1000):
+    """Insertion en masse : chaque ligne est validée contre get_table_info, puis
+    écrite par executemany dans une seule transaction (un seul commit).
+    Une ligne refusée par SQLite n'annule que son paquet, rejoué ligne à ligne.
+    Renvoie (ok, msg, erreurs) avec erreurs = [(n° de ligne, message)]."""
+    if not current_conn:
+        return False, "Aucune base de données ouverte.", []
+    info = {col[1]: col for col in get_table_info(table_name)}
+    unknown = [c for c in columns if c not in info]
+    if unknown:
+        return False, f"Colonne(s) inconnue(s) : {', '.join(unknown)}", []
+    errors = []
+    valid = []
+    for i, row in enumerate(rows, 1):
+        if len(row) != len(columns):
+            errors.append((i, f"{len(row)} valeur(s) pour {len(columns)} colonne(s)"))
+            continue
+        try:
+            values = []
+            for name, text in zip(columns, row):
+                _, _, ctype, notnull, dflt, pk = info[name]
+                value = coerce_value(text, ctype)
+                if value is None and notnull and dflt is None:
+                    raise ValueError(f"{name} : valeur requise (NOT NULL)")
+                values.append(value)
+            valid.append((i, values))
+        except ValueError as e:
+            errors.append((i, str(e)))
+    cols = ", ".join(_quote_ident(c) for c in columns)
+    sql = (f"INSERT INTO {_quote_ident(table_name)} ({cols}) "
+           f"VALUES ({', '.join('?' for _ in columns)});")
+    inserted = 0
+    try:
+        if not current_conn.in_transaction:
+            current_conn.execute("BEGIN;")
+        for start in range(0, len(valid), chunk_size):
+            chunk = valid[start:start + chunk_size]
+            current_conn.execute("SAVEPOINT sqlrift_bulk;")
+            try:
+                current_conn.executemany(sql, (v for _, v in chunk))
+                inserted += len(chunk)
+            except sqlite3.DatabaseError:
+                current_conn.execute("ROLLBACK TO sqlrift_bulk;")
+                for i, values in chunk:
+                    try:
+                        current_conn.execute(sql, values)
+                        inserted += 1
+                    except sqlite3.DatabaseError as e:
+                        errors.append((i, str(e)))
+            current_conn.execute("RELEASE sqlrift_bulk;")
+            if progress:
+                progress(min(start + chunk_size, len(valid)), len(valid))
+        current_conn.commit()
+    except Exception as e:
+        current_conn.rollback()
+        return False, str(e), errors
+    errors.sort()
+    msg = f"{inserted} ligne(s) insérée(s)"
+    if errors:
+        msg += f", {len(errors)} ligne(s) rejetée(s)"
+    return not errors, msg + ".", errors
+
+def parse_tsv(text, table_columns):
+    """Lignes collées depuis un tableur (tabulations). Si la première ligne ne
+    contient que des noms de colonnes, elle sert d'en-tête."""
+    lines = [l.rstrip("\r") for l in text.splitlines() if l.strip()]
+    if not lines:
+        return [], []
+    first = [c.strip() for c in lines[0].split("\t")]
+    if all(c in table_columns for c in first):
+        return first, [l.split("\t") for l in lines[1:]]
+    return list(table_columns), [l.split("\t") for l in lines]
+
+# PRAGMA appliqués le temps d'un chargement (pragma_profile) : propres à la
+# connexion d'écriture, ils ne touchent ni au journal ni aux lecteurs.
+_TEMPORARY_PRAGMAS = ("synchronous", "cache_size", "temp_store")
+
+@contextmanager
+def pragma_profile(name):
+    """Applique temporairement à l'écrivain les PRAGMA de connexion d'un profil
+    (synchronous, cache_size, temp_store), puis rétablit les valeurs d'avant.
+    journal_mode reste tel quel : en changer fermerait les lecteurs, y compris
+    ceux d'un export ou d'une requête en cours."""
+    if not current_pool:
+        yield
+        return
+    conn = current_pool.writer
+    previous = {p: conn.execute(f"PRAGMA {p};").fetchone()[0] for p in _TEMPORARY_PRAGMAS}
+    for pragma in _TEMPORARY_PRAGMAS:
+        conn.execute(f"PRAGMA {pragma}={PRAGMA_PROFILES[name][pragma]};")
+    try:
+        yield
+    finally:
+        for pragma, value in previous.items():
+            conn.execute(f"PRAGMA {pragma}={value};")
+
+def _csv_names(header):
+    names, seen = [], set()
+    for i, name in enumerate(header, 1):
+        name = name.strip() or f"col_{i}"
+        base, n = name, 2
+        while name.lower() in seen:
+            name, n = f"{base}_{n}", n + 1
+        seen.add(name.lower())
+        names.append(name)
+    return names
+
+def infer_column_types(sample, n_cols):
+    """INTEGER, REAL ou TEXT par colonne d'après un échantillon (les vides sont ignorés)."""
+    types = []
+    for i in range(n_cols):
+        values = [r[i] for r in sample if i < len(r) and r[i] != ""]
+        kind = "INTEGER" if values else "TEXT"
+        for v in values:
+            try:
+                int(v)
+                continue
+            except ValueError:
+                pass
+            try:
+                float(v)
+                kind = "REAL"
+            except ValueError:
+                kind = "TEXT"
+                break
+        types.append(kind)
+    return types
+
+def _csv_converter(col_type):
+    """Conversion tolérante (import) : une valeur non convertible reste du texte,
+    comme le ferait SQLite avec son typage flexible."""
+    affinity = _affinity(col_type)
+    if affinity in ("INTEGER", "REAL", "NUMERIC"):
+        def _conv(v):
+            if v == "":
+                return None
+            try:
+                return int(v)
+            except ValueError:
+                try:
+                    return float(v)
+                except ValueError:
+                    return v
+        return _conv
+    return lambda v: None if v == "" else v
+
+def _blank_csv_row(row):
+    """Ligne vide ou faite d'espaces. Des champs vides (",,", '""') restent une
+    ligne de NULL, comme à l'export."""
+    text = "".join(row)
+    return not text.strip() and (text != "" or not row)
+
+def import_csv(path, table_name, delimiter=None, encoding="utf-8-sig", header=True,
+               sample_size=1000, chunk_size=5000, commit_every=100_000,
+               progress=None, cancel=None):
+    """Import CSV en streaming, utilisable sans GUI.
+
+    Crée la table (types inférés sur `sample_size` lignes, via create_table) ou
+    ajoute à une table existante en faisant correspondre les colonnes par nom.
+    Les lignes vides ou faites d'espaces sont ignorées. Insertion par executemany de `chunk_size` lignes, commit toutes les
+    `commit_every` lignes, avec les PRAGMA de connexion du profil "bulk load".
+    `progress(lignes, octets_lus, octets_total, lignes_par_s)` ; `cancel` est un
+    threading.Event : les lignes déjà validées restent, le lot en cours est annulé.
+    Renvoie (ok, msg, lignes_importées)."""
+    if not current_conn:
+        return False, "Aucune base de données ouverte.", 0
+    total_bytes = os.path.getsize(path)
+    raw = open(path, "rb")
+    try:
+        text = io.TextIOWrapper(raw, encoding=encoding, newline="")
+        if delimiter is None:
+            head = text.read(64 * 1024)
+            try:
+                delimiter = csv.Sniffer().sniff(head, delimiters=",;\t|").delimiter
+            except csv.Error:
+                delimiter = ","
+            text.seek(0)
+        reader = (row for row in csv.reader(text, delimiter=delimiter) if not _blank_csv_row(row))
+        first = next(reader, None)
+        if first is None:
+            return False, "Fichier CSV vide.", 0
+        sample = [] if header else [first]
+        names = _csv_names(first if header else [f"col_{i}" for i in range(1, len(first) + 1)])
+        for row in reader:
+            sample.append(row)
+            if len(sample) >= sample_size:
+                break
+
+        if table_name not in get_tables():
+            types = infer_column_types(sample, len(names))
+            ok, msg = create_table(table_name, [(n, t, False, False, "") for n, t in zip(names, types)])
+            if not ok:
+                return False, msg, 0
+        info = {col[1].lower(): col for col in get_table_info(table_name)}
+        unknown = [n for n in names if n.lower() not in info]
+        if unknown:
+            return False, f"Colonne(s) absente(s) de {table_name} : {', '.join(unknown)}", 0
+        converters = [_csv_converter(info[n.lower()][2]) for n in names]
+        width = len(names)
+        cols = ", ".join(_quote_ident(info[n.lower()][1]) for n in names)
+        sql = (f"INSERT INTO {_quote_ident(table_name)} ({cols}) "
+               f"VALUES ({', '.join('?' for _ in names)});")
+
+        def _convert(rows):
+            out = []
+            for r in rows:
+                if len(r) != width:
+                    r = (r + [""] * width)[:width]
+                out.append([conv(v) for conv, v in zip(converters, r)])
+            return out
+
+        imported = pending = 0
+        started = time.perf_counter()
+        with pragma_profile("bulk load"):
+            try:
+                chunk = sample
+                while chunk:
+                    if cancel is not None and cancel.is_set():
+                        current_conn.rollback()
+                        return False, f"Import annulé — {imported - pending} ligne(s) validée(s).", imported - pending
+                    current_conn.executemany(sql, _convert(chunk))
+                    imported += len(chunk)
+                    pending += len(chunk)
+                    if pending >= commit_every:
+                        current_conn.commit()
+                        pending = 0
+                    if progress:
+                        rate = imported / max(time.perf_counter() - started, 1e-6)
+                        progress(imported, raw.tell(), total_bytes, rate)
+                    chunk = [row for _, row in zip(range(chunk_size), reader)]
+                current_conn.commit()
+            except Exception as e:
+                current_conn.rollback()
+                return False, f"{e} (après {imported - pending} ligne(s) validée(s))", imported - pending
+        elapsed = time.perf_counter() - started
+        return True, (f"{imported} ligne(s) importée(s) dans {table_name} en {elapsed:.1f}s "
+                      f"({imported / max(elapsed, 1e-6):,.0f} lignes/s)."), imported
+    finally:
+        raw.close()
+
+
+def _row_bytes(row):
+    return 64 + sum(len(v) if isinstance(v, (str, bytes)) else 8 for v in row)
+
+
+class ResultStream:
+    """Résultat de requête paresseux, adossé au curseur (lecture par fetchmany).
+    Les lignes lues restent en mémoire jusqu'à `memory_budget` octets, la suite
+    déborde dans un fichier SQLite temporaire : la mémoire reste bornée mais tout
+    le résultat reste accessible (slices, itération, len).
+    `release()` est appelé une fois le curseur épuisé ou fermé : le flux rend
+    alors la connexion de lecture qui lui était prêtée. `head` : premières
+    lignes déjà lues sur le curseur. Un flux partagé (grille + exports) est
+    réservé par retain() et n'est fermé qu'au dernier close()."""
+    CHUNK = 1000
+
+    def __init__(self, cursor, columns, memory_budget=None, progress=None, on_complete=None,
+                 release=None, head=None):
+        self.columns = columns
+        self.memory_budget = memory_budget or RESULT_MEMORY_BUDGET
+        self.exhausted = cursor is None
+        self._cursor = cursor
+        self._progress = progress
+        self._on_complete = on_complete
+        self._release = release
+        self._users = 1
+        self._lock = threading.Lock()
+        self._head = [tuple(r) for r in head or ()]
+        self._bytes = sum(_row_bytes(r) for r in self._head)
+        self._spill = None
+        self._spill_path = None
+        self._spilled = 0
+
+    @classmethod
+    def from_rows(cls, columns, rows):
+        """Flux déjà complet (résultat servi par le cache)."""
+        stream = cls(None, columns)
+        stream._head = rows
+        return stream
+
+    @property
+    def fetched(self):
+        return len(self._head) + self._spilled
+
+    @property
+    def spilled(self):
+        return self._spill is not None
+
+    def _open_spill(self):
+        import tempfile
+        fd, self._spill_path = tempfile.mkstemp(prefix="sqlrift_", suffix=".sqlite")
+        os.close(fd)
+        self._spill = sqlite3.connect(self._spill_path, isolation_level=None, check_same_thread=False)
+        self._spill.execute("PRAGMA journal_mode=OFF;")
+        self._spill.execute("PRAGMA synchronous=OFF;")
+        cols = ", ".join(f"c{i}" for i in range(len(self.columns)))
+        self._spill.execute(f"CREATE TABLE r ({cols});")
+        self._spill_insert = f"INSERT INTO r VALUES ({', '.join('?' for _ in self.columns)});"
+
+    def _fetch_chunk(self):
+        # Un même flux peut être lu par la grille et par un export en parallèle.
+        with self._lock:
+            return 0 if self.exhausted else self._fetch_chunk_locked()
+
+    def _fetch_chunk_locked(self):
+        rows = [tuple(r) for r in self._cursor.fetchmany(self.CHUNK)]
+        if rows:
+            if self._spill is None:
+                self._head.extend(rows)
+                self._bytes += sum(_row_bytes(r) for r in rows)
+                if self._bytes > self.memory_budget:
+                    self._open_spill()
+            else:
+                self._spill.executemany(self._spill_insert, rows)
+                self._spilled += len(rows)
+            if self._progress:
+                self._progress(self.fetched)
+        if len(rows) < self.CHUNK:
+            # Lot incomplet : le curseur est épuisé, inutile d'attendre un lot vide.
+            self.exhausted = True
+            self._cursor = None
+            self._release_conn()
+            if self._on_complete and self._spill is None:
+                self._on_complete(self.columns, self._head)
+        return len(rows)
+
+    def fetch_until(self, n):
+        """Lit le curseur jusqu'à avoir au moins `n` lignes (ou la fin)."""
+        while not self.exhausted and self.fetched < n:
+            self._fetch_chunk()
+
+    def fetch_all(self):
+        while not self.exhausted:
+            self._fetch_chunk()
+
+    def rows(self, start, stop):
+        self.fetch_until(stop)
+        out = self._head[start:stop]
+        head = len(self._head)
+        if stop > head and self._spill is not None:
+            lo = max(start, head) - head
+            cur = self._spill.execute("SELECT * FROM r WHERE rowid > ? AND rowid <= ? ORDER BY rowid;",
+                                      (lo, stop - head))
+            out.extend(cur.fetchall())
+        return out
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(1 << 62)
+            if index.stop is None or stop > self.fetched:
+                self.fetch_until(stop)
+            start, stop, step = index.indices(self.fetched)
+            return self.rows(start, stop)[::step]
+        if index < 0:
+            self.fetch_all()
+            index += self.fetched
+        rows = self.rows(index, index + 1)
+        if not rows:
+            raise IndexError(index)
+        return rows[0]
+
+    def __len__(self):
+        self.fetch_all()
+        return self.fetched
+
+    def __bool__(self):
+        return True
+
+    def __iter__(self):
+        """Itération complète à mémoire constante (export, affichage)."""
+        yield from self._head[:]
+        pos = len(self._head)
+        while True:
+            if self._spill is not None:
+                done = pos - len(self._head)
+                while done < self._spilled:
+                    chunk = self._spill.execute(
+                        "SELECT * FROM r WHERE rowid > ? ORDER BY rowid LIMIT ?;",
+                        (done, self.CHUNK)).fetchall()
+                    yield from chunk
+                    done += len(chunk)
+                pos = len(self._head) + done
+            elif pos < len(self._head):
+                yield from self._head[pos:]
+                pos = len(self._head)
+            if self.exhausted:
+                return
+            self._fetch_chunk()
+
+    def _release_conn(self):
+        release, self._release = self._release, None
+        if release:
+            release()
+
+    def retain(self):
+        """Un utilisateur de plus (export en cours...) ; renvoie le flux."""
+        with self._lock:
+            self._users += 1
+        return self
+
+    def close(self):
+        """Rend une réservation ; le dernier close() ferme curseur et débordement."""
+        with self._lock:
+            self._users -= 1
+            if self._users > 0:
+                return
+        self._close()
+
+    def _close(self):
+        with self._lock:
+            if self._cursor is not None:
+                self._cursor.close()
+                self._cursor = None
+                self.exhausted = True
+            self._release_conn()
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+            os.remove(self._spill_path)
+
+    def __del__(self):
+        try:
+            self._close()
+        except Exception:
+            pass
+
+
+class ResultWindow:
+    """Source de VirtualTreeview sur un ResultStream : les lignes sont tirées du
+    curseur au fil du défilement. Tant que le flux n'est pas épuisé, `total`
+    annonce un lot de plus pour que la scrollbar permette d'avancer."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.columns = stream.columns
+        self.top = 0
+
+    @property
+    def total(self):
+        stream = self.stream
+        return stream.fetched if stream.exhausted else stream.fetched + stream.CHUNK
+
+    def fetch(self, top, count):
+        self.stream.fetch_until(top + count)
+        self.top = max(0, min(top, self.stream.fetched - count))
+        return self.stream.rows(self.top, self.top + count)
+
+
+_LEADING_COMMENTS = re.compile(r"^(?:\s+|--[^\n]*(?:\n|$)|/\*.*?\*/)*", re.S)
+
+def _strip_comments(stmt):
+    return _LEADING_COMMENTS.sub("", stmt, count=1)
+
+def split_sql(sql_text):
+    """Découpe un script en instructions. Un `;` ne termine une instruction que si
+    sqlite3.complete_statement le confirme : les `;` dans les chaînes, les
+    commentaires et les blocs BEGIN...END des triggers sont respectés."""
+    statements = []
+    start = 0
+    pos = sql_text.find(";")
+    while pos != -1:
+        chunk = sql_text[start:pos + 1]
+        if sqlite3.complete_statement(chunk):
+            stmt = chunk.strip()
+            if _strip_comments(stmt).strip("; \t\n"):
+                statements.append(stmt)
+            start = pos + 1
+        pos = sql_text.find(";", pos + 1)
+    tail = sql_text[start:].strip()
+    if _strip_comments(tail).strip():
+        statements.append(tail)
+    return statements
+
+
+_READ_VERBS = ("SELECT", "VALUES", "EXPLAIN")
+_WRITE_VERBS = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+def _statement_verb(stmt):
+    """Mot-clé principal d'une instruction : le premier, ou pour un WITH celui
+    qui suit la liste des CTE (leurs corps, entre parenthèses, sont ignorés)."""
+    tokens = (tok for tok, _, _ in _top_level_tokens(stmt))
+    first = next(tokens, "")
+    if first != "WITH":
+        return first
+    return next((tok for tok in tokens if tok in _READ_VERBS + _WRITE_VERBS), "")
+
+def is_read_only_sql(sql_text):
+    """Le script ne contient que des lectures : chaque instruction commence par
+    SELECT, VALUES ou EXPLAIN, ou par un WITH suivi d'un SELECT. Les PRAGMA
+    restent sur l'écrivain car ils peuvent modifier la connexion."""
+    return all(_statement_verb(stmt) in _READ_VERBS for stmt in split_sql(sql_text))
+
+
+def explain_query_plan(stmt, conn=None):
+    """Arbre EXPLAIN QUERY PLAN : [{"detail", "flag", "children"}].
+    `flag` vaut "scan" (parcours complet de table), "temp" (B-tree temporaire
+    pour ORDER BY / GROUP BY / DISTINCT) ou None."""
+    conn = conn or _read_conn()
+    try:
+        rows = conn.execute("EXPLAIN QUERY PLAN " + stmt.rstrip().rstrip(";")).fetchall()
+    except sqlite3.Error:
+        return []
+    nodes = {0: {"detail": "", "flag": None, "children": []}}
+    for node_id, parent, _, detail in rows:
+        flag = None
+        if re.match(r"^SCAN (TABLE )?\S+( AS \S+)?$", detail):
+            flag = "scan"
+        elif "TEMP B-TREE" in detail:
+            flag = "temp"
+        node = nodes[node_id] = {"detail": detail, "flag": flag, "children": []}
+        nodes.get(parent, nodes[0])["children"].append(node)
+    return nodes[0]["children"]
+
+
+class StatementResult:
+    """Résultat d'une instruction. Se dépaquette en (colonnes, lignes) comme les
+    tuples historiques ; porte en plus le SQL, la durée, l'erreur éventuelle et,
+    en mode profilage, les mesures (`profile`)."""
+    __slots__ = ("sql", "columns", "rows", "elapsed", "rowcount", "error", "profile", "cached")
+
+    def __init__(self, sql, columns=(), rows=(), elapsed=0.0, rowcount=-1, error=None):
+        self.sql = sql
+        self.columns = list(columns)
+        self.rows = rows if columns else []
+        self.elapsed = elapsed
+        self.rowcount = rowcount
+        self.error = error
+        self.profile = None
+        self.cached = False
+
+    def __iter__(self):
+        return iter((self.columns, self.rows))
+
+
+# ─── Historique et cache de résultats ─────────────────────────────────────
+HISTORY_PATH = os.path.join(SETTINGS_DIR, "history.db")
+HISTORY_LIMIT = 5000                    # scripts conservés dans l'historique
+RESULT_CACHE_BUDGET = 32 * 1024 * 1024  # octets de résultats gardés en cache
+
+_SQL_SPACES = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")|\s+")
+
+def normalize_sql(sql):
+    """SQL sans commentaire de tête ni `;` final, blancs réduits hors chaînes."""
+    text = _SQL_SPACES.sub(lambda m: m.group(1) or " ", _strip_comments(sql))
+    return text.strip().rstrip(";").rstrip()
+
+
+class QueryHistory:
+    """Historique persistant des scripts exécutés (base SQLite locale)."""
+    def __init__(self, path=HISTORY_PATH, limit=HISTORY_LIMIT):
+        self.path = path
+        self.limit = limit
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL;")
+            self._conn.execute("PRAGMA synchronous=NORMAL;")
+            self._conn.execute("PRAGMA busy_timeout=2000;")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS history (id INTEGER PRIMARY KEY, ts REAL NOT NULL, "
+                "db TEXT, sql TEXT NOT NULL, statements INTEGER, elapsed REAL, rows INTEGER, "
+                "cached INTEGER, error TEXT);")
+        return self._conn
+
+    def add(self, db, sql, statements, elapsed, rows=0, cached=0, error=None):
+        """Ne fait jamais échouer la requête : une erreur d'écriture est ignorée."""
+        try:
+            with self._lock:
+                conn = self._db()
+                cur = conn.execute(
+                    "INSERT INTO history (ts, db, sql, statements, elapsed, rows, cached, error) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?);",
+                    (time.time(), db, sql.strip(), statements, elapsed, rows, cached, error))
+                if cur.lastrowid % 100 == 0:
+                    conn.execute("DELETE FROM history WHERE id <= ?;", (cur.lastrowid - self.limit,))
+        except (sqlite3.Error, OSError):
+            pass
+
+    def search(self, text="", limit=200):
+        """Entrées les plus récentes dont le SQL contient `text`."""
+        pattern = "%" + re.sub(r"([\\%_])", r"\\\1", text) + "%"
+        with self._lock:
+            return self._db().execute(
+                "SELECT id, ts, db, sql, statements, elapsed, rows, cached, error FROM history "
+                "WHERE sql LIKE ? ESCAPE '\\' ORDER BY id DESC LIMIT ?;", (pattern, limit)).fetchall()
+
+    def clear(self):
+        with self._lock:
+            self._db().execute("DELETE FROM history;")
+
+
+class ResultCache:
+    """Cache LRU des résultats de lecture, borné en octets. La clé contient la
+    version des données vue par la connexion de la requête (voir
+    ConnectionManager.data_version) : après toute écriture validée, les entrées
+    précédentes ne sont plus jamais servies et sortent par l'ordre LRU."""
+    def __init__(self, budget=RESULT_CACHE_BUDGET):
+        self.budget = budget
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            self._data.move_to_end(key)
+            return entry[0], entry[1]
+
+    def put(self, key, columns, rows):
+        size = sum(_row_bytes(r) for r in rows)
+        if size > self.budget // 4:
+            return
+        with self._lock:
+            if key in self._data:
+                self._bytes -= self._data.pop(key)[2]
+            self._data[key] = (columns, rows, size)
+            self._bytes += size
+            while self._bytes > self.budget:
+                _, (_, _, freed) = self._data.popitem(last=False)
+                self._bytes -= freed
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+
+QUERY_HISTORY = QueryHistory()
+RESULT_CACHE = ResultCache()
+
+
+# Fonctions dont le résultat change d'un appel à l'autre : jamais servies par le cache.
+_VOLATILE_SQL = re.compile(
+    r"\b(?:random|randomblob|changes|total_changes|last_insert_rowid)\s*\("
+    r"|\b(?:date|time|datetime|julianday|unixepoch|strftime|timediff)\s*\([^)]*'now'"
+    r"|\b(?:date|time|datetime|julianday|unixepoch)\s*\(\s*\)"
+    r"|\bcurrent_(?:date|time|timestamp)\b", re.I)
+
+PROFILE_STEP = 1000  # granularité du compteur d'instructions VM (set_progress_handler)
+
+def execute_sql(sql_text, progress=None, memory_budget=None, batch=False, savepoints=False,
+                profile=False, cache=True, conn=None, history=True):
+    """Chaque SELECT renvoie un ResultStream. Seul le dernier reste adossé à son
+    curseur, les précédents sont lus entièrement (avec débordement disque)
+    avant l'instruction suivante. `progress(n)` reçoit le nombre de lignes lues.
+
+    `batch` : tout le script tourne dans une seule transaction explicite, annulée
+    en entier à la première erreur ; avec `savepoints`, seule l'instruction
+    fautive est annulée (SAVEPOINT / ROLLBACK TO) et le script continue. Sans
+    `batch`, une erreur annule aussi la transaction implicite ouverte par les
+    écritures précédentes du script : rien ne reste en suspens sur l'écrivain.
+
+    `profile` : pour chaque instruction, durée totale, délai jusqu'à la première
+    ligne, lignes renvoyées (le résultat est lu en entier), instructions VM
+    SQLite et arbre EXPLAIN QUERY PLAN, dans StatementResult.profile.
+
+    `cache` : les lectures hors transaction sont servies par RESULT_CACHE tant que
+    la base n'a pas changé, sauf appels non déterministes (random(), 'now', ...) ;
+    un résultat y entre une fois lu en entier. Avec `history`, le script est
+    ajouté à QUERY_HISTORY avec sa durée.
+
+    `conn` : exécute sur cette connexion (un shard de shard_query) plutôt que sur
+    la base active, sans cache, historique ni journal du conseiller d'index."""
+    external = conn is not None
+    pool, pooled = current_pool, False
+    if not external:
+        if not current_conn:
+            return False, "Aucune base de données ouverte.", []
+        # Tâche de lecture : chaque flux emprunte sa propre connexion et ne la rend
+        # qu'une fois lu ou fermé ; son instantané ne fige pas les lectures suivantes.
+        pooled = _reading_thread()
+        conn = pool.acquire() if pooled else current_conn
+    statements = split_sql(sql_text)
+    results = []
+    handed = False  # `conn` appartient au dernier flux (qui la rendra)
+    changes_before = conn.total_changes
+    t_start = time.perf_counter()
+    try:
+        if batch and not conn.in_transaction:
+            conn.execute("BEGIN;")
+        done = 0  # lignes des résultats précédents, déjà lus entièrement
+        for i, stmt in enumerate(statements):
+            if results and results[-1].columns:
+                results[-1].rows.fetch_all()
+                done += results[-1].rows.fetched
+            if handed:
+                conn, handed = pool.acquire(), False
+            if not external:
+                record_query(stmt)
+            key = None
+            if (cache and not profile and not external and not conn.in_transaction
+                    and is_read_only_sql(stmt) and not _VOLATILE_SQL.search(stmt)):
+                if conn is not pool.writer:
+                    # La version est lue dans l'instantané où la requête s'exécutera.
+                    conn.execute("BEGIN;")
+                key = (current_db_path, normalize_sql(stmt), pool.data_version(conn))
+                hit = RESULT_CACHE.get(key)
+                if hit:
+                    if conn is not pool.writer:
+                        conn.rollback()
+                    cols, rows = hit
+                    results.append(StatementResult(stmt, cols, ResultStream.from_rows(cols, rows)))
+                    results[-1].cached = True
+                    if progress:
+                        progress(done + len(rows))
+                    continue
+            plan = explain_query_plan(stmt, conn) if profile else None
+            steps = [0]
+
+            def _count_steps():
+                steps[0] += 1
+                return 0  # 0 = ne pas interrompre
+
+            if profile:
+                conn.set_progress_handler(_count_steps, PROFILE_STEP)
+            t0 = time.perf_counter()
+            cur = conn.cursor()
+            if batch and savepoints:
+                conn.execute("SAVEPOINT sqlrift_stmt;")
+                try:
+                    cur.execute(stmt)
+                except sqlite3.Error as e:
+                    conn.execute("ROLLBACK TO sqlrift_stmt;")
+                    conn.execute("RELEASE sqlrift_stmt;")
+                    results.append(StatementResult(stmt, elapsed=time.perf_counter() - t0, error=str(e)))
+                    continue
+            else:
+                cur.execute(stmt)
+            if cur.description:
+                cols = [d[0] for d in cur.description]
+                report = (lambda n, base=done: progress(base + n)) if progress else None
+                store = (lambda c, r, k=key: RESULT_CACHE.put(k, c, r)) if key else None
+                # En batch, la transaction couvre tout le script : seul le dernier flux
+                # garde la connexion. Profilé, le flux est lu en entier ici même.
+                handed = pooled and not profile and (not batch or i == len(statements) - 1)
+                release = (lambda c=conn: pool.release(c)) if handed else None
+                # Délai jusqu'à la première ligne : un fetchone, pas un lot entier.
+                head = [row for row in [cur.fetchone()] if row is not None] if profile else None
+                first_row = time.perf_counter() - t0
+                stream = ResultStream(cur, cols, memory_budget, progress=report, on_complete=store,
+                                      release=release, head=head)
+                stream.fetch_until(1)
+                if profile:
+                    stream.fetch_all()
+                results.append(StatementResult(stmt, cols, stream, time.perf_counter() - t0))
+            else:
+                first_row = None
+                results.append(StatementResult(stmt, elapsed=time.perf_counter() - t0,
+                                               rowcount=cur.rowcount))
+            if profile:
+                conn.set_progress_handler(None, 0)
+                results[-1].profile = {
+                    "first_row": first_row,
+                    "rows": results[-1].rows.fetched if results[-1].columns else cur.rowcount,
+                    "vm_steps": steps[0] * PROFILE_STEP,
+                    "plan": plan,
+                }
+            if batch and savepoints and not handed:
+                conn.execute("RELEASE sqlrift_stmt;")
+        if not handed:
+            conn.commit()
+            if pooled:
+                pool.release(conn)
+        if not external and any(_strip_comments(stmt)[:6].upper() in ("ATTACH", "DETACH")
+                                for stmt in statements):
+            current_pool.sync_attached()
+    except Exception as e:
+        msg = str(e)
+        if not handed:
+            if conn.in_transaction:
+                changes = conn.total_changes
+                conn.rollback()
+                if not batch and changes > changes_before:
+                    msg += " — modifications non validées du script annulées."
+            if pooled:
+                pool.release(conn)
+        if history and not external:
+            QUERY_HISTORY.add(current_db_path, sql_text, len(statements),
+                              time.perf_counter() - t_start, error=msg)
+        return False, msg, []
+    finally:
+        if profile and not handed:
+            conn.set_progress_handler(None, 0)
+    elapsed = time.perf_counter() - t_start
+    msg = f"{len(statements)} requête(s) exécutée(s) en {elapsed:.3f}s."
+    errors = sum(1 for r in results if r.error)
+    if errors:
+        msg += f" {errors} instruction(s) annulée(s) (savepoint)."
+    cached = sum(1 for r in results if r.cached)
+    if cached:
+        msg += f" {cached} résultat(s) servi(s) par le cache."
+    if history and not external:
+        QUERY_HISTORY.add(current_db_path, sql_text, len(statements), elapsed,
+                          rows=sum(r.rows.fetched for r in results if r.columns), cached=cached)
+    return True, msg, results
+
+# ─── Requêtes réparties (shards) ──────────────────────────────────────────
+SHARD_WORKERS = os.cpu_count() or 4  # shards interrogés en parallèle
+
+_SQL_TOKEN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\[[^\]]*\]|`[^`]*`|--[^\n]*|/\*.*?\*/|\w+|\S", re.S)
+_AGGREGATE_RE = re.compile(r"(COUNT|SUM|TOTAL|MIN|MAX|AVG)\s*\((.*)\)", re.I | re.S)
+_LIMIT_RE = re.compile(r"\s*(-?\d+)\s*(?:(OFFSET|,)\s*(\d+))?\s*;?\s*", re.I)
+_ORDER_TERM_RE = re.compile(r"^(.*?)(?:\s+COLLATE\s+(\w+))?(?:\s+(ASC|DESC))?(?:\s+NULLS\s+(FIRST|LAST))?$", re.I | re.S)
+_shard_conns = set()
+_shard_lock = threading.Lock()
+
+def _top_level_tokens(sql):
+    """(JETON, début, fin) hors parenthèses ; chaînes et identifiants entre
+    guillemets restent d'un seul tenant, les commentaires sont ignorés."""
+    depth = 0
+    for m in _SQL_TOKEN.finditer(sql):
+        tok = m.group()
+        if tok == "(":
+            depth += 1
+        elif tok == ")":
+            depth -= 1
+        elif depth == 0 and not tok.startswith(("--", "/*")):
+            yield tok.upper(), m.start(), m.end()
+
+def _split_top(text):
+    """Découpe `text` sur ses virgules de premier niveau."""
+    parts, start = [], 0
+    for tok, a, b in _top_level_tokens(text):
+        if tok == ",":
+            parts.append(text[start:a].strip())
+            start = b
+    parts.append(text[start:].strip())
+    return parts
+
+def _aggregate(item):
+    """(FONCTION, argument, expression, alias) si `item` est un agrégat
+    recombinable seul (COUNT(x) AS n), None sinon ; ValueError si l'agrégat
+    est pris dans une expression ou ne se recombine pas (DISTINCT)."""
+    toks = list(_top_level_tokens(item))
+    if not any(t in ("COUNT", "SUM", "TOTAL", "MIN", "MAX", "AVG") for t, _, _ in toks):
+        return None
+    expr, alias = item, None
+    if len(toks) == 3 and toks[1][0] == "AS" or len(toks) == 2:
+        expr, alias = item[:toks[1][1]].strip(), _unquote(item[toks[-1][1]:].strip())
+    m = _AGGREGATE_RE.fullmatch(expr)
+    if not m or len(list(_top_level_tokens(expr))) != 1:
+        raise ValueError(f"agrégat pris dans une expression : {item}")
+    func, arg = m.group(1).upper(), m.group(2).strip()
+    if func in ("MIN", "MAX") and len(_split_top(arg)) > 1:
+        return None  # MIN(a, b) / MAX(a, b) : fonctions scalaires
+    if arg.upper().startswith("DISTINCT"):
+        raise ValueError(f"{func}(DISTINCT ...) ne se recombine pas entre shards")
+    return func, arg, expr, alias
+
+def _value_key(v, nulls_high=False):
+    """Ordre des valeurs SQLite : NULL < nombres < texte < BLOB."""
+    if v is None:
+        return (4 if nulls_high else 0, 0)
+    return (1 if isinstance(v, (int, float)) else 2 if isinstance(v, str) else 3, v)
+
+def _sort_key(terms):
+    """Clé de tri pour des termes [(index de colonne, desc, nulls_hauts)]."""
+    def _key(row):
+        return [_Descending(_value_key(row[i], nulls_high)) if desc else _value_key(row[i], nulls_high)
+                for i, desc, nulls_high in terms]
+    return _key
+
+class _Descending:
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+
+class _IteratorCursor:
+    """fetchmany / close sur un itérateur : adosse un ResultStream à une fusion."""
+    def __init__(self, rows):
+        self._rows = iter(rows)
+
+    def fetchmany(self, n):
+        return list(itertools.islice(self._rows, n))
+
+    def close(self):
+        self._rows = iter(())
+
+
+def _shard_plan(sql):
+    """Analyse un SELECT pour l'exécuter sur chaque shard puis fusionner :
+    requête par shard, mode de fusion (concaténation, fusion triée, ou
+    regroupement : agrégats COUNT / SUM / TOTAL / MIN / MAX / AVG recombinés
+    par clés du GROUP BY, qui sans agrégat dédoublonne les groupes),
+    ORDER BY, LIMIT et OFFSET appliqués au résultat global."""
+    sql = sql.strip().rstrip(";").strip()
+    toks = list(_top_level_tokens(sql))
+    words = [t for t, _, _ in toks]
+    if "SELECT" not in words:
+        raise ValueError("seule une requête SELECT peut être répartie")
+    compound = any(w in ("UNION", "INTERSECT", "EXCEPT") for w in words)
+
+    def _last(word, follow=None):
+        for i in range(len(toks) - 1, -1, -1):
+            if words[i] == word and (follow is None or words[i + 1:i + 2] == [follow]):
+                return i
+        return None
+
+    end = len(sql)
+    limit = offset = None
+    i_limit = _last("LIMIT")
+    if i_limit is not None:
+        m = _LIMIT_RE.fullmatch(sql, toks[i_limit][2])
+        if not m:
+            raise ValueError("LIMIT / OFFSET doivent être des entiers")
+        first, sep, second = m.groups()
+        limit, offset = (int(second), int(first)) if sep == "," else (int(first), int(second or 0))
+        limit = None if limit < 0 else limit
+        end = toks[i_limit][1]
+    order = []
+    i_order = _last("ORDER", "BY")
+    if i_order is not None and toks[i_order][1] < end:
+        order = _split_top(sql[toks[i_order + 1][2]:end])
+        end = toks[i_order][1]
+    body = sql[:end].rstrip()
+
+    i_select = words.index("SELECT")
+    start = toks[i_select][2]
+    distinct = words[i_select + 1:i_select + 2] == ["DISTINCT"]
+    if words[i_select + 1:i_select + 2] in (["DISTINCT"], ["ALL"]):
+        start = toks[i_select + 1][2]
+    i_from = next((i for i in range(i_select, len(toks)) if words[i] == "FROM"), None)
+    stop = toks[i_from][1] if i_from is not None else end
+    items = _split_top(sql[start:stop])
+    aggregates = [] if compound else [_aggregate(item) for item in items]
+    group = []
+    i_group = None if compound else _last("GROUP", "BY")
+    if i_group is not None and toks[i_group][1] < end:
+        group_end = min((toks[i][1] for i in range(i_group, len(toks))
+                         if words[i] in ("HAVING", "WINDOW") and toks[i][1] < end), default=end)
+        group = _split_top(sql[toks[i_group + 1][2]:group_end])
+    plan = {"order": order, "limit": limit, "offset": offset or 0, "distinct": distinct,
+            "aggregates": None, "group": [], "names": {}}
+    if any(aggregates) or group:
+        if "HAVING" in words:
+            raise ValueError("HAVING ne se recombine pas entre shards")
+        select, combine, positions = [], [], {}
+        for n, (item, agg) in enumerate(zip(items, aggregates)):
+            if agg is None:
+                positions[n] = len(select)
+                combine.append(("KEY", len(select)))
+                select.append(item)
+            elif agg[0] == "AVG":
+                # AVG = SUM / COUNT recombinés : deux colonnes par shard.
+                combine.append(("AVG", len(select)))
+                plan["names"][len(combine) - 1] = agg[3] or agg[2]
+                select += [f"SUM({agg[1]})", f"COUNT({agg[1]})"]
+            else:
+                combine.append((agg[0], len(select)))
+                select.append(item)
+        # Clés de regroupement : colonne sélectionnée (position, alias ou même
+        # expression), sinon colonne cachée ajoutée à la requête des shards.
+        for term in group:
+            n = _select_item(term, items)
+            if n in positions:
+                plan["group"].append(positions[n])
+            else:
+                plan["group"].append(len(select))
+                select.append(term)
+        plan["aggregates"] = combine
+        plan["shard_sql"] = sql[:start] + " " + ", ".join(select) + " " + sql[stop:end]
+        return plan
+    suffix = ""
+    if order:
+        suffix += " ORDER BY " + ", ".join(order)
+    if limit is not None:
+        # Chaque shard fournit au plus LIMIT + OFFSET lignes, découpées après la fusion.
+        suffix += f" LIMIT {limit + (offset or 0)}"
+    plan["shard_sql"] = body + suffix
+    return plan
+
+def _select_item(term, items):
+    """Indice de l'élément du SELECT désigné par un terme de GROUP BY (numéro,
+    alias ou expression identique), None sinon."""
+    term = term.strip()
+    if term.isdigit():
+        return int(term) - 1 if 1 <= int(term) <= len(items) else None
+    wanted = {" ".join(term.split()).lower(), _unquote(term).lower()}
+    for n, item in enumerate(items):
+        toks = list(_top_level_tokens(item))
+        names = set()
+        if len(toks) >= 3 and toks[-2][0] == "AS" or len(toks) == 2:
+            names.add(_unquote(item[toks[-1][1]:].strip()).lower())
+            item = item[:toks[-2][1]]
+        names.add(" ".join(item.split()).lower())
+        if wanted & names:
+            return n
+    return None
+
+def _order_terms(order, columns):
+    """ORDER BY → [(index, desc, nulls_hauts)] sur les colonnes du résultat."""
+    names = [c.lower() for c in columns]
+    terms = []
+    for term in order:
+        expr, collate, direction, nulls = _ORDER_TERM_RE.match(term.strip()).groups()
+        if collate and collate.upper() != "BINARY":
+            raise ValueError(f"COLLATE {collate} non pris en charge pour la fusion")
+        expr = expr.strip()
+        if expr.isdigit() and 1 <= int(expr) <= len(columns):
+            index = int(expr) - 1
+        else:
+            candidates = [_unquote(expr).lower(), _unquote(expr.split(".")[-1]).lower(), expr.lower()]
+            index = next((names.index(c) for c in candidates if c in names), None)
+            if index is None:
+                raise ValueError(f"ORDER BY {expr} : trier sur une colonne du résultat")
+        desc = (direction or "").upper() == "DESC"
+        nulls_high = (nulls or "").upper() == ("FIRST" if desc else "LAST")
+        terms.append((index, desc, nulls_high))
+    return terms
+
+def _combine_aggregates(combine, keys, shard_rows):
+    """Recombine les lignes agrégées des shards, groupées par les colonnes
+    `keys` (celles du GROUP BY ; aucune : un seul groupe). Les autres colonnes
+    hors agrégat sont prises dans la première ligne du groupe."""
+    groups = {}
+    for row in shard_rows:
+        key = tuple(row[i] for i in keys)
+        acc = groups.get(key)
+        if acc is None:
+            groups[key] = list(row)
+            continue
+        for op, i in combine:
+            a, b = acc[i], row[i]
+            if op in ("COUNT", "SUM", "TOTAL", "AVG"):
+                acc[i] = b if a is None else a if b is None else a + b
+                if op == "AVG":
+                    acc[i + 1] += row[i + 1]
+            elif op in ("MIN", "MAX") and b is not None:
+                lo, hi = (b, a) if op == "MIN" else (a, b)
+                if a is None or _value_key(lo) < _value_key(hi):
+                    acc[i] = b
+    out = []
+    for acc in groups.values():
+        row = []
+        for op, i in combine:
+            if op == "AVG":
+                row.append(acc[i] / acc[i + 1] if acc[i + 1] else None)
+            else:
+                row.append(acc[i])
+        out.append(tuple(row))
+    return out
+
+def _run_shard(path, sql, budget, progress):
+    try:
+        conn = sqlite3.connect(ConnectionManager._ro_uri(path), uri=True, check_same_thread=False)
+    except sqlite3.Error as e:
+        raise sqlite3.OperationalError(f"{os.path.basename(path)} : {e}") from e
+    with _shard_lock:
+        _shard_conns.add(conn)
+    try:
+        ok, msg, results = execute_sql(sql, conn=conn, memory_budget=budget, progress=progress)
+        if not ok:
+            raise sqlite3.OperationalError(f"{os.path.basename(path)} : {msg}")
+        # Lecture complète dans le thread du shard : tous les cœurs travaillent.
+        results[-1].rows.fetch_all()
+        return results[-1]
+    finally:
+        with _shard_lock:
+            _shard_conns.discard(conn)
+        conn.close()
+
+def interrupt_shards():
+    with _shard_lock:
+        for conn in _shard_conns:
+            conn.interrupt()
+
+def shard_query(paths, sql, workers=SHARD_WORKERS, progress=None, memory_budget=None, history=True):
+    """Exécute un même SELECT sur plusieurs fichiers de même schéma (une
+    connexion lecture seule par shard, `workers` en parallèle, chacun via
+    execute_sql) et fusionne les résultats en un seul flux : concaténation dans
+    l'ordre des fichiers, fusion k-voies (heapq.merge) pour ORDER BY, agrégats
+    recombinés, puis LIMIT / OFFSET et DISTINCT globaux. `progress(n)` reçoit
+    le nombre de lignes lues sur l'ensemble des shards ; avec `history`, la
+    requête est ajoutée à QUERY_HISTORY.
+    Renvoie (ok, msg, [StatementResult]) comme execute_sql."""
+    if not paths:
+        return False, "Aucun shard sélectionné.", []
+    if len(split_sql(sql)) != 1 or not is_read_only_sql(sql):
+        return False, "Une seule requête de lecture peut être répartie sur des shards.", []
+    try:
+        plan = _shard_plan(sql)
+    except ValueError as e:
+        return False, f"Requête non répartissable : {e}", []
+    t_start = time.perf_counter()
+    budget = max((memory_budget or RESULT_MEMORY_BUDGET) // len(paths), 1 << 20)
+    counts = [0] * len(paths)
+    total = [0]
+    lock = threading.Lock()
+
+    def _count(i, n):
+        with lock:
+            total[0] += n - counts[i]
+            counts[i] = n
+            if progress:
+                progress(total[0])
+
+    from concurrent.futures import ThreadPoolExecutor
+    pool = ThreadPoolExecutor(max_workers=max(1, min(workers, len(paths))),
+                              thread_name_prefix="sqlrift-shard")
+    try:
+        futures = [pool.submit(_run_shard, p, plan["shard_sql"], budget,
+                               lambda n, i=i: _count(i, n)) for i, p in enumerate(paths)]
+        shards = [f.result() for f in futures]
+    except Exception as e:
+        interrupt_shards()
+        if history:
+            QUERY_HISTORY.add(f"{len(paths)} shard(s)", sql, 1, time.perf_counter() - t_start, error=str(e))
+        return False, str(e), []
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    columns = list(shards[0].columns)
+    try:
+        if plan["aggregates"] is not None:
+            for index, name in plan["names"].items():
+                columns[plan["aggregates"][index][1]] = name
+            columns = [columns[i] for _, i in plan["aggregates"]]
+            rows = _combine_aggregates(plan["aggregates"], plan["group"],
+                                       itertools.chain(*(s.rows for s in shards)))
+            if plan["order"]:
+                rows.sort(key=_sort_key(_order_terms(plan["order"], columns)))
+        elif plan["order"]:
+            rows = heapq.merge(*(s.rows for s in shards), key=_sort_key(_order_terms(plan["order"], columns)))
+        else:
+            rows = itertools.chain(*(s.rows for s in shards))
+    except ValueError as e:
+        return False, f"Requête non répartissable : {e}", []
+    if plan["distinct"]:
+        seen = set()
+        rows = (r for r in rows if not (r in seen or seen.add(r)))
+    stop = None if plan["limit"] is None else plan["offset"] + plan["limit"]
+    rows = itertools.islice(rows, plan["offset"], stop)
+    stream = ResultStream(_IteratorCursor(rows), columns, memory_budget)
+    stream.fetch_until(1)
+    elapsed = time.perf_counter() - t_start
+    scanned = sum(s.rows.fetched for s in shards)
+    if history:
+        QUERY_HISTORY.add(f"{len(paths)} shard(s)", sql, 1, elapsed, rows=scanned)
+    return True, (f"{len(paths)} shard(s) interrogé(s) en {elapsed:.3f}s — "
+                  f"{scanned:,} ligne(s) lue(s), {min(workers, len(paths))} en parallèle."), \
+        [StatementResult(sql, columns, stream, elapsed)]
+
+# ─── Conseiller d'index ───────────────────────────────────────────────────
+QUERY_LOG_SIZE = 500
+_query_log = OrderedDict()  # SQL normalisé → nombre d'exécutions
+_query_log_lock = threading.Lock()
+
+def record_query(sql):
+    """Historise une requête pour le conseiller d'index (SELECT / UPDATE / DELETE)."""
+    text = normalize_sql(sql)
+    if not text.upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE")):
+        return
+    with _query_log_lock:
+        _query_log[text] = _query_log.pop(text, 0) + 1
+        while len(_query_log) > QUERY_LOG_SIZE:
+            _query_log.popitem(last=False)
+
+def logged_queries():
+    with _query_log_lock:
+        return list(_query_log.items())
+
+
+_IDENT = r'(?:"[^"]+"|\[[^\]]+\]|`[^`]+`|\w+)'
+_FROM_RE = re.compile(rf"\b(?:FROM|JOIN|UPDATE)\s+({_IDENT})(?:\s+(?:AS\s+)?(?!(?:WHERE|ON|JOIN|INNER|LEFT|CROSS|NATURAL|ORDER|GROUP|LIMIT|SET|USING)\b)(\w+))?", re.I)
+_COND_RE = re.compile(rf"^(?:({_IDENT})\.)?({_IDENT})\s*(==|=|<=|>=|<>|!=|<|>|\bIN\b|\bIS\s+NOT\b|\bIS\b|\bBETWEEN\b|\bLIKE\b|\bGLOB\b)\s*(.*)$", re.I | re.S)
+_LITERAL_RE = re.compile(r"^(?:'(?:[^']|'')*'|-?\d+(?:\.\d+)?|NULL)$", re.I)
+
+def _unquote(name):
+    return name[1:-1] if name[:1] in "\"[`" else name
+
+def _clause(sql, start, stops):
+    m = re.search(rf"\b{start}\b(.*?)(?:\b(?:{'|'.join(stops)})\b|$)", sql, re.I | re.S)
+    return m.group(1) if m else ""
+
+def _conditions(sql):
+    """Conditions élémentaires des clauses WHERE et ON, découpées sur AND."""
+    text = " ".join(_clause(sql, kw, ["GROUP BY", "ORDER BY", "LIMIT", "HAVING", "WINDOW"])
+                    for kw in ("WHERE",))
+    text += " AND " + " AND ".join(m.group(1) for m in re.finditer(
+        r"\bON\b(.*?)(?=\b(?:JOIN|INNER|LEFT|CROSS|WHERE|GROUP|ORDER|LIMIT)\b|$)", sql, re.I | re.S))
+    parts = re.split(r"\bAND\b", text, flags=re.I)
+    return [p.strip().strip("()").strip() for p in parts if p.strip()]
+
+def _table_columns_used(sql, table, alias):
+    """(égalités, intervalles, conditions partielles, ORDER BY, colonnes SELECT) pour une table."""
+    names = {c[1].lower(): c[1] for c in get_table_info(table)}
+    refs = {alias.lower(), table.lower()}
+    single = len(_FROM_RE.findall(sql)) == 1
+
+    def _col(qual, name):
+        name = _unquote(name)
+        if name.lower() not in names:
+            return None
+        if qual and _unquote(qual).lower() not in refs:
+            return None
+        if not qual and not single:
+            return None
+        return names[name.lower()]
+
+    eq, rng, partial = [], [], []
+    for cond in _conditions(sql):
+        m = _COND_RE.match(cond)
+        if not m:
+            continue
+        qual, name, op, rhs = m.groups()
+        col = _col(qual, name)
+        if col is None:
+            # Jointure écrite dans l'autre sens : autre.col = table.col
+            m2 = re.match(rf"^.*?(?:==|=)\s*(?:({_IDENT})\.)?({_IDENT})$", cond, re.S)
+            if m2 and op in ("=", "=="):
+                col = _col(*m2.groups())
+                if col and col not in eq:
+                    eq.append(col)
+            continue
+        op = " ".join(op.upper().split())
+        if op in ("=", "==", "IN", "IS"):
+            if col not in eq:
+                eq.append(col)
+            if op in ("=", "==", "IS") and _LITERAL_RE.match(rhs.strip()):
+                partial.append((col, f"{_quote_ident(col)} {op} {rhs.strip()}"))
+        elif op == "IS NOT" and rhs.strip().upper() == "NULL":
+            partial.append((col, f"{_quote_ident(col)} IS NOT NULL"))
+        elif op not in ("<>", "!=") and col not in rng:
+            rng.append(col)
+    order = []
+    for term in _clause(sql, "ORDER BY", ["LIMIT"]).split(","):
+        m = re.match(rf"^\s*(?:({_IDENT})\.)?({_IDENT})\s*(?:ASC|DESC)?\s*$", term, re.I)
+        col = m and _col(*m.groups())
+        if col:
+            order.append(col)
+    select = []
+    sel = _clause(sql, "SELECT", ["FROM"])
+    if sel and "*" not in sel:
+        for term in sel.split(","):
+            m = re.match(rf"^\s*(?:({_IDENT})\.)?({_IDENT})\s*$", term, re.I)
+            col = m and _col(*m.groups())
+            if not col:
+                select = None
+                break
+            select.append(col)
+    return eq, rng, partial, order, select
+
+def _distinct_ratio(table, column, sample=10000):
+    conn = _read_conn()
+    n, d = conn.execute(
+        f"SELECT COUNT(*), COUNT(DISTINCT {_quote_ident(column)}) "
+        f"FROM (SELECT {_quote_ident(column)} FROM {_quote_ident(table)} LIMIT {sample});").fetchone()
+    return max(d, 1), n
+
+def advise_indexes(queries=None, min_rows=1000):
+    """Propositions d'index pour les requêtes historisées (ou `queries`).
+
+    Chaque requête passe par EXPLAIN QUERY PLAN ; pour chaque SCAN d'une table
+    d'au moins `min_rows` lignes, on propose un index : colonnes d'égalité, puis
+    une colonne d'intervalle, puis l'ORDER BY ; couvrant si la requête ne lit que
+    peu de colonnes, partiel si une condition compare une colonne peu sélective à
+    une constante. Le gain estimé compare les lignes visitées (échantillonnage
+    de la sélectivité) avant / après. Renvoie une liste de dicts triée par gain."""
+    if not current_conn:
+        return []
+    proposals = {}
+    for sql, count in (queries if queries is not None else logged_queries()):
+        plan = explain_query_plan(sql)
+        stack = list(plan)
+        scans = []
+        while stack:
+            node = stack.pop()
+            stack.extend(node["children"])
+            if node["flag"] == "scan":
+                scans.append(node["detail"].split()[-1])
+        if not scans:
+            continue
+        aliases = {}
+        for name, alias in _FROM_RE.findall(sql):
+            aliases[(alias or _unquote(name)).lower()] = _unquote(name)
+            aliases.setdefault(_unquote(name).lower(), _unquote(name))
+        tables = {t.lower(): t for t in get_tables()}
+        for scanned in scans:
+            table = tables.get(aliases.get(scanned.lower(), scanned).lower())
+            if not table:
+                continue
+            total = estimate_table_rows(table)
+            if total < min_rows:
+                continue
+            eq, rng, partial, order, select = _table_columns_used(sql, table, scanned)
+            where = None
+            for col, cond in partial:
+                distinct, _ = _distinct_ratio(table, col)
+                if distinct <= 10 and (len(eq) > 1 or rng or order):
+                    # Colonne peu sélective comparée à une constante : index partiel.
+                    where = cond
+                    eq = [c for c in eq if c != col]
+                    break
+            keys = eq + rng[:1]
+            if not rng:
+                keys += [c for c in order if c not in keys]
+            if not keys:
+                continue
+            covering = False
+            if select and len(set(select) | set(keys)) <= 6:
+                # L'alias de rowid (INTEGER PRIMARY KEY) est déjà dans chaque index.
+                pk = [c for c in get_table_info(table) if c[5]]
+                rowid = pk[0][1] if len(pk) == 1 and pk[0][2].upper() == "INTEGER" else None
+                extra = [c for c in select if c not in keys and c != rowid]
+                covering = True
+                keys += extra
+            if any(idx_cols[:len(keys)] == keys for _, _, idx_cols, _ in get_indexes(table)):
+                continue
+            selectivity = 1.0
+            for col in eq:
+                selectivity /= _distinct_ratio(table, col)[0]
+            if rng:
+                selectivity *= 0.25
+            if where:
+                distinct, _ = _distinct_ratio(table, where.split()[0].strip('"'))
+                selectivity /= distinct
+            visited = max(1.0, total * selectivity)
+            after = math.log2(max(total, 2)) + visited * (1 if covering else 2)
+            name = "idx_" + re.sub(r"\W+", "_", f"{table}_{'_'.join(keys)}").strip("_").lower()
+            ddl = (f"CREATE INDEX IF NOT EXISTS {_quote_ident(name)} ON {_quote_ident(table)} "
+                   f"({', '.join(_quote_ident(k) for k in keys)})")
+            if where:
+                ddl += f" WHERE {where}"
+            key = ddl
+            if key in proposals:
+                proposals[key]["queries"].append(sql)
+                proposals[key]["count"] += count
+                continue
+            proposals[key] = {
+                "table": table, "columns": keys, "where": where, "covering": covering,
+                "sql": ddl + ";", "rows": total, "estimated_gain": total / after,
+                "queries": [sql], "count": count,
+            }
+    return sorted(proposals.values(), key=lambda p: p["estimated_gain"] * p["count"], reverse=True)
+
+def time_query(sql, repeat=1):
+    """Durée (s) de la meilleure de `repeat` exécutions, résultat lu en entier."""
+    conn = _read_conn()
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        cur = conn.execute(sql)
+        while cur.fetchmany(5000):
+            pass
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def build_index(proposal):
+    """Crée l'index proposé (connexion d'écriture) et remesure la requête
+    principale avant / après. Renvoie (ok, msg, avant_s, après_s)."""
+    if not current_conn:
+        return False, "Aucune base de données ouverte.", None, None
+    query = proposal["queries"][0]
+    try:
+        before = time_query(query)
+        current_conn.execute(proposal["sql"])
+        current_conn.commit()
+        after = time_query(query)
+    except sqlite3.Error as e:
+        return False, str(e), None, None
+    return True, f"Index créé : {before * 1000:.1f} ms → {after * 1000:.1f} ms.", before, after
+
+
+# ─── Export ───────────────────────────────────────────────────────────────
+_COMPRESSED_OPENERS = {".gz": "gzip", ".xz": "lzma"}
+
+def open_text(path, mode="r"):
+    """Ouvre un fichier texte UTF-8, (dé)compressé selon l'extension (.gz, .xz).
+    "-" désigne l'entrée ou la sortie standard (ligne de commande)."""
+    if path == "-":
+        return nullcontext(sys.stdout if "w" in mode else sys.stdin)
+    module = _COMPRESSED_OPENERS.get(os.path.splitext(path)[1].lower())
+    if module:
+        return __import__(module).open(path, mode + "t", encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+def export_format(path):
+    """"csv", "tsv" ou "jsonl" d'après l'extension (hors .gz / .xz)."""
+    base = path[:-3] if path.lower().endswith((".gz", ".xz")) else path
+    ext = os.path.splitext(base)[1].lower()
+    return {".tsv": "tsv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "jsonl"}.get(ext, "csv")
+
+def _json_value(v):
+    return v.hex() if isinstance(v, bytes) else v
+
+def write_rows(path, columns, rows, fmt=None, progress=None, cancel=None, chunk_size=5000, total=None):
+    """Écrit un itérable de lignes en CSV / TSV / JSON Lines, par paquets de
+    `chunk_size` : la mémoire ne dépend pas du nombre de lignes.
+    `progress(lignes, total)` ; `cancel` est un threading.Event.
+    Renvoie (ok, msg, lignes_écrites)."""
+    fmt = fmt or export_format(path)
+    written = 0
+    rows = iter(rows)
+    with open_text(path, "w") as f:
+        if fmt == "jsonl":
+            dumps = json.JSONEncoder(ensure_ascii=False, default=_json_value).encode
+            def _write(chunk):
+                f.write("".join(dumps(dict(zip(columns, r))) + "\n" for r in chunk))
+        else:
+            writer = csv.writer(f, delimiter="\t" if fmt == "tsv" else ",")
+            writer.writerow(columns)
+            def _write(chunk):
+                writer.writerows([v.hex() if isinstance(v, bytes) else v for v in r] for r in chunk)
+        while True:
+            if cancel is not None and cancel.is_set():
+                return False, f"Export annulé après {written} ligne(s).", written
+            chunk = [r for _, r in zip(range(chunk_size), rows)]
+            if not chunk:
+                break
+            _write(chunk)
+            written += len(chunk)
+            if progress:
+                progress(written, total)
+    return True, f"{written} ligne(s) exportée(s) → {os.path.basename(path)}", written
+
+def export_query(sql, path, params=(), **kwargs):
+    """Exporte le résultat d'une requête en flux direct curseur → fichier."""
+    if not current_conn:
+        return False, "Aucune base de données ouverte.", 0
+    cur = _read_conn().execute(sql, params)
+    columns = [d[0] for d in cur.description or []]
+    chunk_size = kwargs.get("chunk_size", 5000)
+    rows = (r for chunk in iter(lambda: cur.fetchmany(chunk_size), []) for r in chunk)
+    try:
+        return write_rows(path, columns, rows, **kwargs)
+    finally:
+        cur.close()
+
+def export_table(table_name, path, **kwargs):
+    kwargs.setdefault("total", estimate_table_rows(table_name))
+    return export_query(f"SELECT * FROM {_quote_ident(table_name)};", path, **kwargs)
+
+def export_result(stream, path, **kwargs):
+    """Exporte un ResultStream (le même flux que celui affiché dans l'UI), puis
+    le rend par close() : un flux encore affiché est passé par stream.retain()."""
+    try:
+        return write_rows(path, stream.columns, stream, **kwargs)
+    finally:
+        stream.close()
+
+# ─── Dump / restauration ──────────────────────────────────────────────────
+DUMP_ROWS_PER_INSERT = 500       # lignes par INSERT multi-lignes
+DUMP_STATEMENT_BYTES = 1 << 20   # ... ou moins si l'instruction dépasse cette taille
+RESTORE_COMMIT_BYTES = 64 << 20  # SQL exécuté entre deux COMMIT à la restauration
+
+def _sql_literal(v):
+    if v is None:
+        return "NULL"
+    if isinstance(v, bytes):
+        return f"X'{v.hex()}'"
+    if isinstance(v, float):
+        if v != v:
+            return "NULL"
+        if v in (float("inf"), float("-inf")):
+            return "1e999" if v > 0 else "-1e999"
+        return repr(v)
+    if isinstance(v, int):
+        return str(v)
+    # Sauts de ligne hors des littéraux : une ligne du dump ne se termine par « ; »
+    # qu'en fin d'instruction, la restauration n'a pas à re-tester les lignes.
+    text = str(v).replace("'", "''").replace("\r", "'||char(13)||'").replace("\n", "'||char(10)||'")
+    return "'" + text + "'"
+
+# Suffixes des tables internes de FTS3/4/5 et R-Tree, si PRAGMA table_list
+# (SQLite ≥ 3.37) n'est pas disponible.
+_SHADOW_SUFFIXES = ("_content", "_segments", "_segdir", "_docsize", "_stat", "_data",
+                    "_idx", "_config", "_node", "_parent", "_rowid")
+
+def _shadow_tables(conn, objects):
+    """Noms des tables internes (« shadow ») des tables virtuelles."""
+    try:
+        return {row[1] for row in conn.execute("PRAGMA main.table_list;") if row[2] == "shadow"}
+    except sqlite3.Error:
+        virtual = [name for kind, name, sql in objects
+                   if kind == "table" and sql.upper().startswith("CREATE VIRTUAL")]
+        return {v + suffix for v in virtual for suffix in _SHADOW_SUFFIXES}
+
+def iter_dump(data=True, progress=None, rows_per_insert=DUMP_ROWS_PER_INSERT):
+    """Dump SQL de la base, produit morceau par morceau : tables, données en
+    INSERT multi-lignes (table par table), puis index, vues et triggers (après
+    les données : index construits une seule fois, triggers inactifs pendant la
+    restauration). `progress(lignes, total estimé)`."""
+    conn = _read_conn()
+    objects = conn.execute(
+        "SELECT type, name, sql FROM sqlite_master WHERE sql IS NOT NULL "
+        "AND substr(name, 1, 7) <> 'sqlite_' ORDER BY rowid;").fetchall()
+    # Tables internes des tables virtuelles (FTS...) : recréées par CREATE VIRTUAL TABLE.
+    shadow = _shadow_tables(conn, objects)
+    tables = [name for kind, name, _ in objects if kind == "table" and name not in shadow]
+    total = sum(estimate_table_rows(t) for t in tables) if data else 0
+    done = 0
+    yield "PRAGMA foreign_keys=OFF;\n"
+    for kind, name, sql in objects:
+        if kind == "table" and name in tables:
+            yield sql + ";\n"
+    for name in tables if data else ():
+        cols = [c[1] for c in conn.execute(f"PRAGMA table_xinfo({_quote_ident(name)});")
+                if c[6] == 0]  # ni colonnes générées, ni colonnes cachées de table virtuelle
+        col_list = ", ".join(_quote_ident(c) for c in cols)
+        prefix = f"INSERT INTO {_quote_ident(name)} ({col_list}) VALUES\n"
+        cur = conn.execute(f"SELECT {col_list} FROM {_quote_ident(name)};")
+        try:
+            while True:
+                rows = cur.fetchmany(rows_per_insert)
+                if not rows:
+                    break
+                values, size = [], 0
+                for r in rows:
+                    values.append("(" + ",".join(_sql_literal(v) for v in r) + ")")
+                    size += len(values[-1])
+                    if size >= DUMP_STATEMENT_BYTES:
+                        yield prefix + ",\n".join(values) + ";\n"
+                        values, size = [], 0
+                if values:
+                    yield prefix + ",\n".join(values) + ";\n"
+                done += len(rows)
+                if progress:
+                    progress(done, total)
+        finally:
+            cur.close()
+    if data and conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_sequence';").fetchone():
+        yield "DELETE FROM sqlite_sequence;\n"
+        for seq_name, seq in conn.execute("SELECT name, seq FROM sqlite_sequence;"):
+            yield f"INSERT INTO sqlite_sequence VALUES ({_sql_literal(seq_name)}, {seq});\n"
+    for wanted in ("index", "view", "trigger"):
+        for kind, name, sql in objects:
+            if kind == wanted:
+                yield sql + ";\n"
+
+def generate_sql_schema():
+    """Schéma complet (tables, index, vues, triggers), sans les données."""
+    if not current_conn:
+        return ""
+    lines = [
+        "-- ════════════════════════════════════════",
+        f"-- SCHEMA SQL GÉNÉRÉ — {os.path.basename(current_db_path or 'database.db')}",
+        "-- ════════════════════════════════════════",
+        ""
+    ]
+    for stmt in iter_dump(data=False):
+        if not stmt.startswith("PRAGMA"):
+            lines.append(stmt.rstrip("\n"))
+            lines.append("")
+    return "\n".join(lines)
+
+def dump_database(path, progress=None, cancel=None, rows_per_insert=DUMP_ROWS_PER_INSERT):
+    """Écrit le dump complet (schéma + données) dans `path`, compressé si .gz /
+    .xz, dans une seule transaction de lecture : instantané cohérent même si la
+    base est modifiée pendant le dump. Sans WAL, le dump passe par le thread
+    d'écriture (les écritures attendent sa fin). Renvoie (ok, msg, lignes)."""
+    if not current_conn:
+        return False, "Aucune base de données ouverte.", 0
+    if _sharing_writer():
+        return DB_EXECUTOR.submit(dump_database, path, progress, cancel, rows_per_insert).result()
+    conn = _read_conn()
+    rows = [0]
+
+    def _progress(done, total):
+        rows[0] = done
+        if progress:
+            progress(done, total)
+
+    own_txn = not conn.in_transaction
+    if own_txn:
+        conn.execute("BEGIN;")
+    try:
+        with open_text(path, "w") as f:
+            f.write(f"-- SQLRift dump — {os.path.basename(current_db_path or 'database.db')}\n")
+            for chunk in iter_dump(progress=_progress, rows_per_insert=rows_per_insert):
+                if cancel is not None and cancel.is_set():
+                    return False, f"Dump annulé après {rows[0]} ligne(s).", rows[0]
+                f.write(chunk)
+    except (OSError, sqlite3.Error) as e:
+        return False, str(e), rows[0]
+    finally:
+        if own_txn:
+            conn.rollback()
+    return True, f"Dump de {rows[0]:,} ligne(s) → {os.path.basename(path)}", rows[0]
+
+_TRANSACTION_WORDS = {"BEGIN", "COMMIT", "END", "ROLLBACK"}
+
+def restore_database(path, progress=None, cancel=None, commit_bytes=RESTORE_COMMIT_BYTES):
+    """Rejoue un fichier .sql (éventuellement .gz / .xz) dans la base ouverte,
+    instruction par instruction sans le charger en mémoire. Les instructions sont
+    reconnues par sqlite3.complete_statement et groupées en grandes transactions
+    (COMMIT tous les `commit_bytes` de SQL) avec les PRAGMA de connexion du
+    profil "bulk load" ; les BEGIN / COMMIT du fichier sont ignorés. `progress(octets lus, taille)`.
+    `cancel` est consulté avant chaque instruction : la transaction en cours est
+    annulée, les COMMIT précédents restent acquis. Renvoie (ok, msg, instructions)."""
+    if not current_conn:
+        return False, "Aucune base de données ouverte.", 0
+    if current_conn.in_transaction:
+        return False, "Une transaction est en cours : validez-la ou annulez-la avant de restaurer.", 0
+    total = os.path.getsize(path)
+    raw = open(path, "rb")
+    module = _COMPRESSED_OPENERS.get(os.path.splitext(path)[1].lower())
+    stream = __import__(module).open(raw) if module else raw
+    executed, committed, pending, buffer = 0, 0, 0, []
+    try:
+        text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+        with pragma_profile("bulk load"):
+            foreign_keys = current_conn.execute("PRAGMA foreign_keys;").fetchone()[0]
+            current_conn.execute("PRAGMA foreign_keys=OFF;")
+            current_conn.execute("BEGIN;")
+            try:
+                for line in text:
+                    buffer.append(line)
+                    if not line.rstrip().endswith(";"):
+                        continue
+                    stmt = "".join(buffer)
+                    if not sqlite3.complete_statement(stmt):
+                        continue
+                    buffer = []
+                    words = _strip_comments(stmt).split(None, 1)
+                    keyword = words[0].rstrip(";").upper() if words else ""
+                    if keyword in _TRANSACTION_WORDS or stmt.lstrip().upper().startswith("PRAGMA FOREIGN_KEYS"):
+                        continue
+                    if cancel is not None and cancel.is_set():
+                        current_conn.rollback()
+                        return False, (f"Restauration interrompue : {committed} instruction(s) validée(s), "
+                                       f"{executed - committed} annulée(s)."), committed
+                    current_conn.execute(stmt)
+                    executed += 1
+                    pending += len(stmt)
+                    if progress and executed % 1000 == 0:
+                        progress(raw.tell(), total)
+                    if pending >= commit_bytes:
+                        current_conn.commit()
+                        committed, pending = executed, 0
+                        current_conn.execute("BEGIN;")
+                current_conn.commit()
+            except Exception as e:
+                current_conn.rollback()
+                return False, f"{e} (instruction {executed + 1}, dernier COMMIT conservé)", executed
+            finally:
+                # Sur toute sortie, l'écrivain partagé retrouve son état : pas de
+                # transaction pendante (foreign_keys et synchronous y seraient ignorés).
+                if current_conn.in_transaction:
+                    current_conn.rollback()
+                current_conn.execute(f"PRAGMA foreign_keys={foreign_keys};")
+    finally:
+        raw.close()
+    if progress:
+        progress(total, total)
+    return True, f"{executed:,} instruction(s) restaurée(s) depuis {os.path.basename(path)}.", executed
+
+
+# ─── Sauvegarde à chaud ───────────────────────────────────────────────────
+BACKUP_PAGES_PER_STEP = 1024  # pages copiées par étape de l'API backup
+BACKUP_SLEEP = 0.01           # pause (s) entre deux étapes, pour laisser passer les écritures
+
+def backup_database(path, pages=BACKUP_PAGES_PER_STEP, sleep=BACKUP_SLEEP, progress=None, cancel=None):
+    """Copie à chaud de la base ouverte vers `path` avec Connection.backup,
+    `pages` pages par étape et une pause de `sleep` s entre les étapes.
+    En WAL, une connexion dédiée garde une transaction de lecture ouverte : la
+    copie est l'instantané du début, sans bloquer les écritures. Sans WAL, la
+    copie part de l'écrivain lui-même, sur le thread d'écriture : aucune
+    écriture de l'application ne s'intercale, et SQLite n'a pas à tout
+    recommencer à chaque commit (ce qui, sous écriture continue, ne finirait
+    jamais). `progress(octets copiés, total)`. Renvoie (ok, msg, octets)."""
+    if not current_conn:
+        return False, "Aucune base de données ouverte.", 0
+    if _sharing_writer():
+        return DB_EXECUTOR.submit(backup_database, path, pages, sleep, progress, cancel).result()
+    if os.path.abspath(path) == os.path.abspath(current_db_path):
+        return False, "La sauvegarde doit viser un autre fichier.", 0
+    snapshot = current_db_path != ":memory:" and current_pool is not None and current_pool.wal
+    src = (sqlite3.connect(ConnectionManager._ro_uri(current_db_path), uri=True, check_same_thread=False)
+           if snapshot else current_conn)
+    dst = sqlite3.connect(path)
+    page_size = src.execute("PRAGMA page_size;").fetchone()[0]
+    copied = [0]
+    started = time.perf_counter()
+
+    def _step(status, remaining, total):
+        copied[0] = (total - remaining) * page_size
+        if progress:
+            progress(copied[0], total * page_size)
+        if cancel is not None and cancel.is_set():
+            raise InterruptedError("Sauvegarde annulée.")
+        if remaining:
+            time.sleep(sleep)
+
+    try:
+        if snapshot:
+            src.execute("BEGIN;")
+            src.execute("SELECT 1 FROM sqlite_master LIMIT 1;").fetchall()
+        src.backup(dst, pages=pages, progress=_step)
+    except (sqlite3.Error, InterruptedError) as e:
+        dst.close()
+        if snapshot:
+            src.close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return False, str(e), copied[0]
+    dst.close()
+    if snapshot:
+        src.close()
+    elapsed = time.perf_counter() - started
+    size = os.path.getsize(path)
+    return True, (f"Sauvegarde → {os.path.basename(path)} : {size / 1e6:,.1f} Mo en {elapsed:.1f}s "
+                  f"({size / 1e6 / max(elapsed, 1e-6):,.1f} Mo/s)."), size
+
+
+# ─── Mise en page du schéma ───────────────────────────────────────────────
+TABLE_WIDTH = 220
+TABLE_HEADER = 30
+ROW_HEIGHT = 24
+LAYOUT_GAP_X = 60
+LAYOUT_GAP_Y = 90
+
+def schema_graph():
+    """Tables {nom: (largeur, hauteur)} et clés étrangères
+    [(table, colonne, table cible, colonne cible)] vers des tables existantes."""
+    tables = get_tables()
+    nodes = {t: (TABLE_WIDTH, TABLE_HEADER + ROW_HEIGHT * len(get_table_info(t))) for t in tables}
+    by_name = {t.lower(): t for t in tables}
+    edges = []
+    for t in tables:
+        for col, target, target_col in get_foreign_keys(t):
+            if target.lower() in by_name:
+                edges.append((t, col, by_name[target.lower()], target_col))
+    return nodes, edges
+
+def _components(names, pairs):
+    parent = {n: n for n in names}
+
+    def _find(n):
+        while parent[n] != n:
+            parent[n] = parent[parent[n]]
+            n = parent[n]
+        return n
+
+    for a, b in pairs:
+        parent[_find(a)] = _find(b)
+    groups = {}
+    for n in names:
+        groups.setdefault(_find(n), []).append(n)
+    return list(groups.values())
+
+def _back_edges(names, succ):
+    """Arcs retour d'un parcours en profondeur itératif : les inverser donne un DAG."""
+    state, back = {}, set()
+    for root in names:
+        if root in state:
+            continue
+        state[root] = 1
+        stack = [(root, iter(succ[root]))]
+        while stack:
+            node, it = stack[-1]
+            for nxt in it:
+                seen = state.get(nxt)
+                if seen is None:
+                    state[nxt] = 1
+                    stack.append((nxt, iter(succ[nxt])))
+                    break
+                if seen == 1:
+                    back.add((node, nxt))
+            else:
+                state[node] = 2
+                stack.pop()
+    return back
+
+def _crossings(upper, lower_pos, down):
+    """Croisements entre deux couches : inversions des positions basses une fois
+    les arcs triés par position haute (arbre de Fenwick, O(E log V))."""
+    seq = [lower_pos[w] for v in upper for w in sorted(down[v], key=lower_pos.__getitem__)]
+    tree = [0] * (len(lower_pos) + 1)
+    count = 0
+    for i, p in enumerate(seq):
+        j, seen = p + 1, 0
+        while j > 0:
+            seen += tree[j]
+            j -= j & -j
+        count += i - seen
+        j = p + 1
+        while j < len(tree):
+            tree[j] += 1
+            j += j & -j
+    return count
+
+def _layering(names, pairs):
+    """(arcs du DAG, {table: couche}) : cycles cassés, couches par plus long
+    chemin, une table référencée au-dessus de celles qui la référencent."""
+    succ = {n: [] for n in names}
+    for a, b in pairs:
+        succ[a].append(b)
+    back = _back_edges(names, succ)
+    dag = {(b, a) if (a, b) in back else (a, b) for a, b in pairs}
+    out = {n: [] for n in names}
+    inc = {n: [] for n in names}
+    for a, b in dag:
+        out[a].append(b)
+        inc[b].append(a)
+
+    # Couches : plus long chemin depuis les tables qui ne référencent rien...
+    pending = {n: len(out[n]) for n in names}
+    ready = [n for n in names if not pending[n]]
+    layer = {}
+    while ready:
+        n = ready.pop()
+        layer[n] = 1 + max((layer[m] for m in out[n]), default=-1)
+        for m in inc[n]:
+            pending[m] -= 1
+            if not pending[m]:
+                ready.append(m)
+    # ... puis chaque table descend juste au-dessus de ses référents (arcs plus courts).
+    for n in sorted(names, key=layer.__getitem__, reverse=True):
+        if inc[n]:
+            layer[n] = min(layer[m] for m in inc[n]) - 1
+    return dag, layer
+
+def layered_layout(nodes, pairs, sweeps=24, patience=4, layering=None):
+    """Mise en page en couches (Sugiyama) : couches de _layering, nœuds fictifs
+    sur les arcs longs, croisements réduits par barycentres en balayages
+    alternés, puis abscisses alignées sur les voisins. Renvoie {table: (x, y)}
+    (coin haut-gauche)."""
+    names = list(nodes)
+    dag, layer = layering or _layering(names, pairs)
+
+    # Graphe propre : entiers, nœuds fictifs sur les arcs de plus d'une couche.
+    ids = {n: i for i, n in enumerate(names)}
+    width = [nodes[n][0] for n in names]
+    height = [nodes[n][1] for n in names]
+    node_layer = [layer[n] for n in names]
+    up = [[] for _ in names]
+    down = [[] for _ in names]
+    for a, b in dag:
+        chain = [ids[b]]
+        for lvl in range(layer[b] + 1, layer[a]):
+            node_layer.append(lvl)
+            width.append(0)
+            height.append(0)
+            up.append([])
+            down.append([])
+            chain.append(len(node_layer) - 1)
+        chain.append(ids[a])
+        for hi, lo in zip(chain, chain[1:]):
+            down[hi].append(lo)
+            up[lo].append(hi)
+    levels = [[] for _ in range(max(node_layer, default=-1) + 1)]
+    for v, lvl in enumerate(node_layer):
+        levels[lvl].append(v)
+
+    # Réduction des croisements : barycentres, meilleur ordre conservé.
+    pos = [0] * len(node_layer)
+    for level in levels:
+        for i, v in enumerate(level):
+            pos[v] = i
+
+    def _reorder(level, neighbors):
+        keyed = sorted((sum(pos[u] for u in neighbors[v]) / len(neighbors[v]) if neighbors[v] else pos[v], i, v)
+                       for i, v in enumerate(level))
+        level[:] = [v for _, _, v in keyed]
+        for i, v in enumerate(level):
+            pos[v] = i
+
+    def _total():
+        return sum(_crossings(levels[i], {v: pos[v] for v in levels[i + 1]}, down)
+                   for i in range(len(levels) - 1))
+
+    best, best_levels = _total(), [list(level) for level in levels]
+    stale = 0
+    for sweep in range(sweeps):
+        if not best or stale >= patience:
+            break
+        if sweep % 2 == 0:
+            for level in levels[1:]:
+                _reorder(level, up)
+        else:
+            for level in reversed(levels[:-1]):
+                _reorder(level, down)
+        crossings = _total()
+        if crossings < best:
+            best, best_levels, stale = crossings, [list(level) for level in levels], 0
+        else:
+            stale += 1
+    levels = best_levels
+
+    # Abscisses (centres) : chaque nœud tiré vers la moyenne de ses voisins,
+    # puis écartements rétablis dans les deux sens et moyennés.
+    x = [0.0] * len(node_layer)
+
+    def _sep(a, b):
+        gap = LAYOUT_GAP_X if width[a] and width[b] else 20
+        return (width[a] + width[b]) / 2 + gap
+
+    for level in levels:
+        cursor = 0.0
+        for i, v in enumerate(level):
+            cursor += _sep(level[i - 1], v) if i else width[v] / 2
+            x[v] = cursor
+    for sweep in range(4):
+        order = levels[1:] if sweep % 2 == 0 else list(reversed(levels[:-1]))
+        neighbors = up if sweep % 2 == 0 else down
+        for level in order:
+            want = [sum(x[u] for u in neighbors[v]) / len(neighbors[v]) if neighbors[v] else x[v]
+                    for v in level]
+            left = list(want)
+            for i in range(1, len(level)):
+                left[i] = max(want[i], left[i - 1] + _sep(level[i - 1], level[i]))
+            right = list(want)
+            for i in range(len(level) - 2, -1, -1):
+                right[i] = min(want[i], right[i + 1] - _sep(level[i], level[i + 1]))
+            for i, v in enumerate(level):
+                x[v] = (left[i] + right[i]) / 2
+                if i:
+                    x[v] = max(x[v], x[level[i - 1]] + _sep(level[i - 1], v))
+
+    positions, top = {}, 0.0
+    for level in levels:
+        for v in level:
+            if v < len(names):
+                positions[names[v]] = (x[v] - width[v] / 2, top)
+        top += max((height[v] for v in level), default=0) + LAYOUT_GAP_Y
+    return _normalized(positions)
+
+def force_layout(nodes, pairs, iterations=80, seed=0):
+    """Mise en page par forces (Fruchterman-Reingold) vectorisée avec numpy :
+    répulsion entre toutes les paires en O(n²) par produits matriciels,
+    attraction le long des clés étrangères, puis chevauchements supprimés."""
+    names = list(nodes)
+    n = len(names)
+    ids = {t: i for i, t in enumerate(names)}
+    size = np.array([nodes[t] for t in names], dtype=np.float32)
+    k = float(np.hypot(size[:, 0], size[:, 1]).mean()) * 1.5  # distance idéale
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(0, k * np.sqrt(n), (n, 2)).astype(np.float32)
+    src = np.array([ids[a] for a, _ in pairs], dtype=np.intp)
+    dst = np.array([ids[b] for _, b in pairs], dtype=np.intp)
+    temp = k * np.sqrt(n) / 8
+    for _ in range(iterations):
+        # Σ_j (p_i - p_j)·w_ij = p_i·Σ_j w_ij - (W @ p)_i, avec w_ij = k² / d_ij²
+        sq = (pos ** 2).sum(1)
+        w = sq[:, None] + sq[None, :]
+        w -= 2 * pos @ pos.T
+        np.maximum(w, 1.0, out=w)
+        np.divide(k * k, w, out=w)
+        np.fill_diagonal(w, 0.0)
+        disp = pos * w.sum(1)[:, None] - w @ pos
+        if len(src):
+            d = pos[src] - pos[dst]
+            pull = d * (np.linalg.norm(d, axis=1)[:, None] / k)
+            np.add.at(disp, src, -pull)
+            np.add.at(disp, dst, pull)
+        length = np.linalg.norm(disp, axis=1)[:, None] + 1e-9
+        pos += disp / length * np.minimum(length, temp)
+        temp *= 0.94
+    return _normalized(_remove_overlaps(names, size, pos))
+
+def _remove_overlaps(names, size, pos, rounds=60):
+    """Écarte les tables qui se recouvrent. Les paires candidates sont les
+    voisines dans l'ordre des x (à moins d'une largeur), traitées par décalage
+    d'indice pour rester vectorisé ; chaque table recule de la moitié du
+    recouvrement sur l'axe le moins engagé. Une passe finale descend les
+    derniers recouvrements sous les tables déjà placées."""
+    half = (size + LAYOUT_GAP_X / 2) / 2
+    reach = float(half[:, 0].max()) * 2
+    pos = pos.astype(np.float64)
+    n = len(names)
+    # Dilatation préalable si les tables ne tiennent pas dans l'emprise actuelle.
+    need = float((4 * half[:, 0] * half[:, 1]).sum()) * 2
+    extent = pos.max(0) - pos.min(0) + 1
+    if extent[0] * extent[1] < need:
+        center = pos.mean(0)
+        pos = center + (pos - center) * (need / (extent[0] * extent[1])) ** 0.5
+    for _ in range(rounds):
+        order = np.argsort(pos[:, 0], kind="stable")
+        xs = pos[order, 0]
+        window = int((np.searchsorted(xs, xs + reach, side="right") - np.arange(n)).max())
+        shift = np.zeros_like(pos)
+        moved = False
+        for off in range(1, window):
+            a, b = order[:-off], order[off:]
+            dx = pos[b, 0] - pos[a, 0]
+            dy = pos[b, 1] - pos[a, 1]
+            ox = half[a, 0] + half[b, 0] - np.abs(dx)
+            oy = half[a, 1] + half[b, 1] - np.abs(dy)
+            hit = (ox > 0) & (oy > 0)
+            if not hit.any():
+                continue
+            moved = True
+            a, b, dx, dy, ox, oy = a[hit], b[hit], dx[hit], dy[hit], ox[hit], oy[hit]
+            on_x = ox <= oy
+            push = np.zeros((len(a), 2))
+            push[on_x, 0] = np.copysign(ox[on_x] / 2 + 1, dx[on_x] + 1e-6)
+            push[~on_x, 1] = np.copysign(oy[~on_x] / 2 + 1, dy[~on_x] + 1e-6)
+            np.add.at(shift, b, push)
+            np.add.at(shift, a, -push)
+        if not moved:
+            break
+        pos += shift * 0.8
+    done = np.zeros(n, dtype=bool)
+    for i in np.argsort(pos[:, 1], kind="stable"):
+        while True:
+            ox = half[i, 0] + half[:, 0] - np.abs(pos[:, 0] - pos[i, 0])
+            oy = half[i, 1] + half[:, 1] - np.abs(pos[:, 1] - pos[i, 1])
+            hit = done & (ox > 0) & (oy > 0)
+            if not hit.any():
+                break
+            pos[i, 1] = (pos[hit, 1] + half[hit, 1]).max() + half[i, 1] + 1
+        done[i] = True
+    return {t: (pos[i, 0] - size[i, 0] / 2, pos[i, 1] - size[i, 1] / 2) for i, t in enumerate(names)}
+
+def grid_layout(nodes, pairs):
+    """Grille dans l'ordre d'un parcours en largeur depuis la table la plus
+    reliée : les voisines restent proches. Repli sans numpy pour les schémas denses."""
+    adj = {t: [] for t in nodes}
+    for a, b in pairs:
+        adj[a].append(b)
+        adj[b].append(a)
+    order, seen = [], set()
+    for root in sorted(nodes, key=lambda t: -len(adj[t])):
+        if root in seen:
+            continue
+        seen.add(root)
+        queue_ = [root]
+        for t in queue_:
+            order.append(t)
+            for u in adj[t]:
+                if u not in seen:
+                    seen.add(u)
+                    queue_.append(u)
+    per_row = max(1, round(len(order) ** 0.5))
+    positions, y = {}, 0
+    for start in range(0, len(order), per_row):
+        row = order[start:start + per_row]
+        for i, t in enumerate(row):
+            positions[t] = (i * (TABLE_WIDTH + LAYOUT_GAP_X), y)
+        y += max(nodes[t][1] for t in row) + LAYOUT_GAP_Y
+    return positions
+
+def _normalized(positions):
+    if not positions:
+        return {}
+    x0 = min(x for x, _ in positions.values())
+    y0 = min(y for _, y in positions.values())
+    return {t: (round(x - x0), round(y - y0)) for t, (x, y) in positions.items()}
+
+def layout_schema(nodes, edges, method="auto"):
+    """Positions {table: (x, y)} pour tout le schéma. Chaque composante connexe
+    est placée séparément : en couches si elle ressemble à un DAG, par forces si
+    elle est dense ou a des arcs très longs (numpy requis ; sinon en grille). Les blocs
+    obtenus, tables isolées comprises, sont ensuite rangés en étagères."""
+    pairs = {(a, b) for a, _, b, _ in edges if a != b}
+    blocks = []
+    for group in _components(list(nodes), pairs):
+        members = set(group)
+        sub = {t: nodes[t] for t in group}
+        sub_pairs = [(a, b) for a, b in pairs if a in members]
+        if len(group) == 1:
+            blocks.append({group[0]: (0, 0)})
+            continue
+        layering = _layering(group, sub_pairs)
+        use = method
+        if use == "auto":
+            # Dense, ou arcs trop longs (beaucoup de nœuds fictifs) : pas un DAG lisible.
+            dag, layer = layering
+            span = sum(layer[a] - layer[b] - 1 for a, b in dag)
+            use = "force" if len(sub_pairs) > 2.5 * len(group) or span > 3 * len(group) else "layered"
+        if use == "force":
+            blocks.append(force_layout(sub, sub_pairs) if _numpy() is not None else grid_layout(sub, sub_pairs))
+        else:
+            blocks.append(layered_layout(sub, sub_pairs, layering=layering))
+
+    def _extent(block):
+        return (max(x + nodes[t][0] for t, (x, _) in block.items()),
+                max(y + nodes[t][1] for t, (_, y) in block.items()))
+
+    sized = sorted(((block, _extent(block)) for block in blocks), key=lambda b: -b[1][1])
+    area = sum((w + LAYOUT_GAP_X) * (h + LAYOUT_GAP_Y) for _, (w, h) in sized)
+    shelf_width = max([w for _, (w, _) in sized] + [int(area ** 0.5 * 1.3)])
+    positions, x, y, shelf_h = {}, 0, 0, 0
+    for block, (w, h) in sized:
+        if x and x + w > shelf_width:
+            x, y, shelf_h = 0, y + shelf_h + LAYOUT_GAP_Y, 0
+        for t, (bx, by) in block.items():
+            positions[t] = (bx + x + 80, by + y + 80)
+        x += w + LAYOUT_GAP_X
+        shelf_h = max(shelf_h, h)
+    return positions
+
+DRAWIO_PREVIEW_CHARS = 20000  # taille de l'aperçu affiché dans l'onglet Drawio
+
+def schema_layout(layout="auto"):
+    """(tables, clés étrangères, positions), calculés une fois par version du schéma."""
+    def _load():
+        nodes, edges = schema_graph()
+        return nodes, edges, layout_schema(nodes, edges, layout)
+    return SCHEMA_CACHE.get(("layout", layout), _load)
+
+_DRAWIO_HEAD = """<?xml version="1.0" encoding="UTF-8"?>
+<mxfile host="Electron" modified="2024-01-01T00:00:00.000Z">
+  <diagram name="Schema UML" id="schema">
+    <mxGraphModel dx="1422" dy="762" grid="1" gridSize="10" guides="1" tooltips="1" connect="1" arrows="1" fold="1" page="1" pageScale="1" pageWidth="1169" pageHeight="827" math="0" shadow="0">
+      <root>
+        <mxCell id="0"/>
+        <mxCell id="1" parent="0"/>
+"""
+_DRAWIO_TAIL = """      </root>
+    </mxGraphModel>
+  </diagram>
+</mxfile>
+"""
+
+def iter_drawio_xml(layout="auto", progress=None):
+    """Document draw.io du schéma, produit morceau par morceau (une table et ses
+    colonnes par morceau, puis les arêtes) : une table par conteneur, une ligne
+    par colonne, une arête par clé étrangère. Les noms sont échappés pour XML.
+    `layout` : "auto", "layered" ou "force" (voir layout_schema) ;
+    `progress(tables, total)`."""
+    # Import différé : xml.sax tire urllib.request / email (~20 ms au démarrage).
+    from xml.sax.saxutils import quoteattr
+    if not current_conn:
+        return
+    nodes, edges, positions = schema_layout(layout)
+    table_ids = {}
+    column_ids = {}
+    cell_id = 2
+    yield _DRAWIO_HEAD
+    for n, t in enumerate(nodes, 1):
+        x, y = positions[t]
+        table_ids[t] = cell_id
+        # Table container
+        cells = [
+            f'<mxCell id="{cell_id}" value={quoteattr(t)} style="shape=table;startSize=30;container=1;collapsible=1;childLayout=tableLayout;fixedRows=1;rowLines=0;fontStyle=1;align=center;resizeLast=1;fontSize=13;fillColor=#0d0d1f;strokeColor=#00f5ff;fontColor=#00f5ff;" vertex="1" parent="1"><mxGeometry x="{x}" y="{y}" width="{TABLE_WIDTH}" height="{nodes[t][1]}" as="geometry"/></mxCell>'
+        ]
+        cell_id += 1
+        for col in get_table_info(t):
+            cid, cname, ctype, notnull, dflt, pk = col
+            column_ids[(t, cname.lower())] = cell_id
+            if pk:
+                column_ids.setdefault((t, None), cell_id)
+            pk_str = " 🔑" if pk else ""
+            nn_str = " NN" if notnull else ""
+            cells.append(
+                f'<mxCell id="{cell_id}" value={quoteattr(f"{cname}{pk_str} [{ctype}{nn_str}]")} style="shape=tableRow;startSize=0;swimlaneHead=0;swimlaneBody=0;fillColor=none;collapsible=0;dropTarget=0;points=[[0,0.5],[1,0.5]];portConstraint=eastwest;fontSize=11;fontColor=#c8d8ff;strokeColor=#1a1a3a;" vertex="1" parent="{table_ids[t]}"><mxGeometry y="{TABLE_HEADER + cid * ROW_HEIGHT}" width="{TABLE_WIDTH}" height="{ROW_HEIGHT}" as="geometry"/></mxCell>'
+            )
+            cell_id += 1
+        yield "        " + "\n        ".join(cells) + "\n"
+        if progress:
+            progress(n, len(nodes))
+
+    for t, col, target, target_col in edges:
+        source = column_ids.get((t, col.lower()), table_ids[t])
+        # Colonne cible absente (référence implicite) : clé primaire, sinon la table.
+        dest = column_ids.get((target, target_col.lower() if target_col else None),
+                              column_ids.get((target, None), table_ids[target]))
+        yield f'        <mxCell id="{cell_id}" style="edgeStyle=entityRelationEdgeStyle;endArrow=ERmandOne;startArrow=ERmany;endFill=0;startFill=0;rounded=0;fontSize=11;strokeColor=#ff00aa;" edge="1" parent="1" source="{source}" target="{dest}"><mxGeometry relative="1" as="geometry"/></mxCell>\n'
+        cell_id += 1
+    yield _DRAWIO_TAIL
+
+def generate_drawio_xml(layout="auto"):
+    return "".join(iter_drawio_xml(layout))
+
+def drawio_preview(layout="auto", max_chars=DRAWIO_PREVIEW_CHARS):
+    """(début du document, tronqué ?, nombre de tables) sans produire le reste."""
+    head, size = [], 0
+    for chunk in iter_drawio_xml(layout):
+        head.append(chunk)
+        size += len(chunk)
+        if size >= max_chars:
+            return "".join(head)[:max_chars], True, len(get_tables())
+    return "".join(head), False, len(get_tables())
+
+def write_drawio(path, layout="auto", progress=None):
+    """Écrit le document draw.io directement dans le fichier (compressé si .gz /
+    .xz), sans le construire en mémoire. Renvoie (ok, msg, tables)."""
+    if not current_conn:
+        return False, "Aucune base de données ouverte.", 0
+    tables = [0]
+
+    def _progress(n, total):
+        tables[0] = n
+        if progress:
+            progress(n, total)
+
+    try:
+        with open_text(path, "w") as f:
+            for chunk in iter_drawio_xml(layout, progress=_progress):
+                f.write(chunk)
+    except OSError as e:
+        return False, str(e), tables[0]
+    return True, f"Fichier .drawio exporté ({tables[0]} table(s)) → {os.path.basename(path)}", tables[0]
+
+def schema_canvas_data(layout="auto"):
+    """Schéma prêt à dessiner : [(table, x, y, l, h, [libellés colonnes])] et
+    [(i_source, ligne_source, i_cible, ligne_cible)] (indices de tables, ligne
+    de colonne ou None)."""
+    if not current_conn:
+        return [], []
+    nodes, edges, positions = schema_layout(layout)
+    tables, index, rows = [], {}, {}
+    for t in nodes:
+        labels = []
+        for cid, cname, ctype, notnull, _, pk in get_table_info(t):
+            rows[(t, cname.lower())] = cid
+            if pk:
+                rows.setdefault((t, None), cid)
+            labels.append(f"{cname}{' 🔑' if pk else ''} [{ctype}{' NN' if notnull else ''}]")
+        index[t] = len(tables)
+        tables.append((t, *positions[t], *nodes[t], labels))
+    links = [(index[t], rows.get((t, col.lower())), index[target],
+              rows.get((target, target_col.lower() if target_col else None), rows.get((target, None))))
+             for t, col, target, target_col in edges]
+    return tables, links
+
+
+# ─── Exécution en arrière-plan ────────────────────────────────────────────
+class DBExecutor:
+    """Thread d'écriture dédié aux appels base de données (exécutés dans l'ordre
+    de soumission) + pool de threads de lecture, qui empruntent au
+    ConnectionManager une connexion WAL en lecture seule par tâche. Le résultat est rendu via un Future. Threads et
+    concurrent.futures ne sont créés qu'au premier appel : importer core ne
+    coûte rien au démarrage de l'interface ou de la ligne de commande."""
+    def __init__(self, readers=READ_THREADS):
+        self.readers = readers
+        self._queue = queue.Queue()
+        self._thread = None
+        self._read_pool = None
+        self._start_lock = threading.Lock()
+
+    def _start(self):
+        from concurrent.futures import ThreadPoolExecutor
+        with self._start_lock:
+            if self._thread is None:
+                self._read_pool = ThreadPoolExecutor(max_workers=self.readers,
+                                                     thread_name_prefix="sqlrift-read",
+                                                     initializer=self._init_reader)
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    @staticmethod
+    def _init_reader():
+        _thread_state.reader = True
+        _thread_state.leases = {}
+
+    @staticmethod
+    def _read_task(fn, args, kwargs):
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            leases, _thread_state.leases = _thread_state.leases, {}
+            for pool, conn in leases.items():
+                pool.release(conn)
+
+    def submit_read(self, fn, *args, **kwargs):
+        """Lecture parallèle : `fn` voit `_read_conn()` = un lecteur prêté pour
+        la durée de la tâche (un flux de résultat garde le sien plus longtemps)."""
+        if self._read_pool is None:
+            self._start()
+        return self._read_pool.submit(self._read_task, fn, args, kwargs)
+
+    def submit(self, fn, *args, **kwargs):
+        from concurrent.futures import Future
+        if self._thread is None:
+            self._start()
+        future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def _run(self):
+        while True:
+            future, fn, args, kwargs = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def cancel(self):
+        """Interrompt les requêtes SQLite en cours (lève "interrupted" dans les workers)."""
+        if current_pool:
+            current_pool.interrupt()
+        interrupt_shards()
+
+
+DB_EXECUTOR = DBExecutor()